@@ -0,0 +1,112 @@
+"""Show, export and merge the answer totals of each term.
+
+Every node's scoreboard keeps its own totals. Export them from each node,
+merge the files and show the result with --file.
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional
+
+from config import DATASET, SCOREBOARD
+from models import get_table
+from storage import AccuracyStats
+from storage.analytics import DISTANCE_LABELS
+
+
+def read_stats(path: str) -> AccuracyStats:
+    with open(path, encoding="utf-8") as file:
+        return AccuracyStats.from_dict(json.load(file))
+
+
+def write_stats(stats: AccuracyStats, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(stats.to_dict(), file, indent=2)
+        file.write("\n")
+
+
+def print_stats(stats: AccuracyStats, dataset: str, limit: Optional[int]) -> None:
+    """Print the most missed terms first"""
+    table = get_table(dataset)
+    answered = stats.rows(dataset)
+    # Totals merged from another node can count terms this table lacks
+    rows = [term for term in answered if 0 <= term.row < len(table)]
+    skipped = len(answered) - len(rows)
+    rows.sort(key=lambda term: (term.accuracy, -term.answered))
+    if limit is not None:
+        rows = rows[:limit]
+
+    print(
+        f"{'#':>4}  {'name':<26}{'answered':>9}{'accuracy':>9}{'off by':>8}  "
+        + " ".join(f"{label:>5}" for label in DISTANCE_LABELS)
+    )
+    for term in rows:
+        print(
+            f"{table.ordinals[term.row]:>4}  {table.names[term.row][:25]:<26}"
+            f"{term.answered:>9}{term.accuracy:>9.0%}{term.mean_distance:>8.1f}  "
+            + " ".join(f"{count:>5}" for count in term.distances)
+        )
+
+    if skipped:
+        print(
+            f"Skipped {skipped} terms outside the {len(table)} rows of {dataset}",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python analytics.py",
+        description="Show, export and merge the answer totals of each term",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("show", help="Print the most missed terms first")
+    show.add_argument("--dataset", help="Dataset to show, the game's by default")
+    show.add_argument("--limit", type=int, help="Show at most this many terms")
+    show.add_argument("--file", help="Read exported totals rather than the scoreboard")
+
+    export = commands.add_parser("export", help="Write the scoreboard's totals as JSON")
+    export.add_argument("destination")
+
+    merge = commands.add_parser(
+        "merge", help="Add up totals exported by several scoreboards"
+    )
+    merge.add_argument("sources", nargs="+")
+    merge.add_argument("destination")
+
+    commands.add_parser(
+        "rebuild", help="Recount the scoreboard's totals from every recorded game"
+    )
+
+    args = parser.parse_args()
+    match args.command:
+        case "show":
+            if args.file:
+                stats = read_stats(args.file)
+            else:
+                stats = SCOREBOARD.accuracy_stats()
+
+            print_stats(stats, args.dataset or DATASET, args.limit)
+
+        case "export":
+            stats = SCOREBOARD.accuracy_stats()
+            write_stats(stats, args.destination)
+            print(f"Exported the totals of {len(stats)} terms to {args.destination}")
+
+        case "merge":
+            stats = AccuracyStats()
+            for source in args.sources:
+                stats.merge(read_stats(source))
+
+            write_stats(stats, args.destination)
+            print(f"Merged {len(args.sources)} files into {args.destination}")
+
+        case "rebuild":
+            stats = SCOREBOARD.rebuild_accuracy_stats()
+            print(f"Recounted the totals of {len(stats)} terms")
+
+
+if __name__ == "__main__":
+    main()
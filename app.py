@@ -1,6 +1,124 @@
-from screens.main_app_screen import PresidentQuizApp
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
+# Modules that belong to the game rather than its dependencies
+PROJECT_PACKAGES = ("app", "config", "models", "screens", "serving", "storage")
+
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_import_times(report: str) -> List[Tuple[str, int, int]]:
+    """Module, self and cumulative microseconds from -X importtime output"""
+    return [
+        (match[4], int(match[1]), int(match[2]))
+        for match in IMPORT_TIME.finditer(report)
+    ]
+
+
+def profile_startup(top: int = 15) -> None:
+    """Import the app in a fresh interpreter with -X importtime and report
+    where the time went, per package and per module."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import screens.main_app_screen"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = parse_import_times(process.stderr)
+    total = sum(self_time for _, self_time, _ in times)
+
+    packages: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for module, self_time, _ in times:
+        package = packages[module.split(".")[0]]
+        package[0] += 1
+        package[1] += self_time
+
+    print(f"Imported {len(times)} modules in {total / 1000:.1f} ms\n")
+    print(f"{'package':<28}{'modules':>8}{'ms':>9}{'share':>8}")
+    ranked = sorted(packages.items(), key=lambda item: item[1][1], reverse=True)
+    for package, (count, self_time) in ranked[:top]:
+        print(
+            f"{package:<28}{count:>8}{self_time / 1000:>9.1f}"
+            f"{self_time / total:>8.1%}"
+        )
+
+    print(f"\n{'slowest modules':<40}{'self ms':>9}{'total ms':>10}")
+    ranked = sorted(times, key=lambda time: time[1], reverse=True)
+    for module, self_time, cumulative in ranked[:top]:
+        print(f"{module:<40}{self_time / 1000:>9.1f}{cumulative / 1000:>10.1f}")
+
+    print(f"\n{'game modules':<40}{'self ms':>9}{'total ms':>10}")
+    for module, self_time, cumulative in times:
+        if module.split(".")[0] in PROJECT_PACKAGES:
+            print(f"{module:<40}{self_time / 1000:>9.1f}{cumulative / 1000:>10.1f}")
+
+
+async def build_css_cache() -> None:
+    """Show every screen of a headless app so each stylesheet is parsed and
+    cached, then delete cached rules that no screen uses any more."""
+    # Nothing the screens show is saved
+    os.environ["PRESIDENT_QUIZ_SCOREBOARD"] = ":memory:"
+
+    from config import CSS_CACHE_DIR
+    from screens.main_app_screen import PresidentQuizApp
+    from screens.stylesheet import prune_cache, used_cache_files
 
-if __name__ == "__main__":
     app = PresidentQuizApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        # The details screen shares the scoreboard's stylesheet
+        for name in ("game_over", "scoreboard", "accuracy"):
+            await app.push_screen(name)
+            await pilot.pause()
+            await app.pop_screen()
+            await pilot.pause()
+
+    used = used_cache_files()
+    deleted = prune_cache(CSS_CACHE_DIR, used)
+    print(f"Cached {len(used)} stylesheets in {CSS_CACHE_DIR}, deleted {deleted} stale")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="President Term Quiz")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report how long importing the app takes, per package and module",
+    )
+    parser.add_argument(
+        "--build-css-cache",
+        action="store_true",
+        help="Parse and cache every stylesheet ahead of the first player",
+    )
+    parser.add_argument(
+        "--daily",
+        action="store_true",
+        help="Play today's challenge, the same questions for every player",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Ask most about the terms the player misses, set by "
+        "PRESIDENT_QUIZ_PLAYER",
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup()
+        sys.exit()
+
+    if args.build_css_cache:
+        asyncio.run(build_css_cache())
+        sys.exit()
+
+    # Imported here so profiling doesn't pay for the app it measures
+    from screens.main_app_screen import PresidentQuizApp
+
+    app = PresidentQuizApp(daily=args.daily, adaptive=args.adaptive)
     app.run()
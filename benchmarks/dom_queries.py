@@ -0,0 +1,98 @@
+"""Count the DOM queries and style passes QuizScreen makes per answered
+question, as a regression check for the answer handlers.
+
+Run with `python -m benchmarks.dom_queries [--max-queries N]`. Answers every
+question of a headless game, counting only the queries made by this
+project's code once the quiz screen is mounted and stopping short of the
+game over screen. Exits with an error when more than --max-queries are
+made per question.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+from typing import Callable
+
+# Keep the benchmark's games out of the real scoreboard
+os.environ.setdefault("PRESIDENT_QUIZ_SCOREBOARD", ":memory:")
+
+from textual.app import App  # noqa: E402
+from textual.dom import DOMNode  # noqa: E402
+
+from screens import QuizScreen  # noqa: E402
+from screens.main_app_screen import PresidentQuizApp  # noqa: E402
+
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+QUERY_METHODS = ("query", "query_one", "query_exactly_one", "query_children")
+
+counts: Counter = Counter()
+
+
+def counted(name: str, method: Callable, project_only: bool) -> Callable:
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        caller = sys._getframe(1).f_code.co_filename
+        if not project_only or caller.startswith(PROJECT_DIR):
+            counts[name] += 1
+
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def install_counters() -> None:
+    for name in QUERY_METHODS:
+        setattr(DOMNode, name, counted("queries", getattr(DOMNode, name), True))
+
+    App.update_styles = counted("style passes", App.update_styles, False)
+
+
+async def play() -> int:
+    """Answer every question, returning how many were answered"""
+    app = PresidentQuizApp()
+    async with app.run_test(size=(120, 50)) as pilot:
+        screen = app.screen
+        assert isinstance(screen, QuizScreen)
+        await pilot.pause()
+        counts.clear()
+
+        answered = 0
+        while screen.curr_question is not None:
+            last = not screen.curr_question.remaining
+            await pilot.press("a")
+            answered += 1
+            if last:
+                # Moving on would leave for the game over screen
+                break
+
+            await pilot.press("n")
+
+        await pilot.pause()
+        return answered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-queries", type=float, default=0)
+    args = parser.parse_args()
+
+    install_counters()
+    answered = asyncio.run(play())
+
+    per_question = {name: count / answered for name, count in counts.items()}
+    queries = per_question.get("queries", 0.0)
+    print(f"{answered} questions answered")
+    print(f"DOM queries per question:   {queries:.2f}")
+    print(f"Style passes per question:  {per_question.get('style passes', 0.0):.2f}")
+
+    if queries > args.max_queries:
+        print(f"More than {args.max_queries:g} DOM queries per question")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
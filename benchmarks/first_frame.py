@@ -0,0 +1,197 @@
+"""Time from starting `python -m app` until its first question is on screen.
+
+Run with `python -m benchmarks.first_frame [--runs N] [--output FILE]
+[--compare FILE]`. Each run starts the app in a fresh process on a
+pseudo-terminal, as textual-serve does for every connection. It records how
+long the process takes to write anything, and how long until the first
+question's text has been drawn. The app is then stopped. Every run uses a
+temporary scoreboard, and the first run is left out as a warm up.
+
+Percentiles are written as JSON, and --compare prints the change against an
+earlier run's JSON. Linux and macOS only, as the app needs a terminal.
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import platform
+import pty
+import select
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import termios
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+SIZE = (120, 40)
+
+# Drawn as part of the first question, which is the first full frame
+FIRST_FRAME_TEXT = b"When was"
+TIMEOUT = 30.0
+
+
+def start_app(scoreboard: str) -> Tuple[subprocess.Popen, int]:
+    """Start the app on a new pseudo-terminal, returning it and the
+    terminal's controlling end"""
+    controller, terminal = pty.openpty()
+    width, height = SIZE
+    fcntl.ioctl(terminal, termios.TIOCSWINSZ, struct.pack("HHHH", height, width, 0, 0))
+    environment = dict(
+        os.environ,
+        TERM="xterm-256color",
+        COLUMNS=str(width),
+        LINES=str(height),
+        PRESIDENT_QUIZ_SCOREBOARD=scoreboard,
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app"],
+        cwd=PROJECT_DIR,
+        env=environment,
+        stdin=terminal,
+        stdout=terminal,
+        stderr=terminal,
+        start_new_session=True,
+    )
+    os.close(terminal)
+    return process, controller
+
+
+def time_run(scoreboard: str) -> Tuple[float, float]:
+    """Seconds until the first output and until the first frame"""
+    start_time = perf_counter()
+    process, controller = start_app(scoreboard)
+    first_output = None
+    output = b""
+    try:
+        while FIRST_FRAME_TEXT not in output:
+            remaining = TIMEOUT - (perf_counter() - start_time)
+            if remaining <= 0 or process.poll() is not None:
+                raise RuntimeError(
+                    f"No frame from the app, it wrote: {output[-500:]!r}"
+                )
+
+            readable, _, _ = select.select([controller], [], [], remaining)
+            if not readable:
+                continue
+
+            try:
+                chunk = os.read(controller, 65536)
+            except OSError:
+                chunk = b""
+
+            if first_output is None and chunk:
+                first_output = perf_counter() - start_time
+
+            # Keep enough to find the text split across two reads
+            output = output[-len(FIRST_FRAME_TEXT) :] + chunk
+
+        first_frame = perf_counter() - start_time
+
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+        os.close(controller)
+
+    return first_output, first_frame
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Milliseconds at each percentile"""
+    milliseconds = [sample * 1000 for sample in samples]
+    if len(milliseconds) > 1:
+        cuts = quantiles(milliseconds, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = milliseconds[0]
+
+    return {
+        "count": len(milliseconds),
+        "min_ms": round(min(milliseconds), 3),
+        "mean_ms": round(mean(milliseconds), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(max(milliseconds), 3),
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'':<14}{'count':>7}{'min ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+    if baseline is not None:
+        header += f"{'p50 change':>12}{'p95 change':>12}"
+
+    print(header)
+    for name, stats in report["timings"].items():
+        line = (
+            f"{name:<14}{stats['count']:>7}{stats['min_ms']:>10.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+        )
+        before = None if baseline is None else baseline["timings"].get(name)
+        if before is not None:
+            for key in ("p50_ms", "p95_ms"):
+                change = (stats[key] / before[key] - 1) * 100 if before[key] else 0
+                line += f"{change:>+11.1f}%"
+
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    first_outputs = []
+    first_frames = []
+    with tempfile.TemporaryDirectory() as directory:
+        scoreboard = str(Path(directory, "scoreboard.db"))
+        # The warm up fills the OS file cache and Python's bytecode cache
+        time_run(scoreboard)
+        for _ in range(args.runs):
+            first_output, first_frame = time_run(scoreboard)
+            first_outputs.append(first_output)
+            first_frames.append(first_frame)
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "size": list(SIZE),
+        "timings": {
+            "first_output": summarize(first_outputs),
+            "first_frame": summarize(first_frames),
+        },
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Memory used by stored game logs, before and after packing the results.
+
+Run with `python -m benchmarks.game_log_memory [--games N]`. The nested
+pydantic form is measured on a sample and projected to 1M games, building a
+million of them would need tens of gigabytes.
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List
+
+from pydantic import BaseModel
+
+from models import GameLog, President, Result
+from models.presidents import ALL_PRESIDENTS
+
+PROJECTED_GAMES = 1_000_000
+
+
+class NestedResult(BaseModel):
+    """A result as stored before packing, with its own copy of the president"""
+
+    president: President
+    is_correct: bool
+    selected_year: int
+
+
+class NestedGameLog(BaseModel):
+    date: datetime
+    score: int
+    total_questions: int
+    duration: int
+    results: List[NestedResult]
+
+
+def random_answers() -> List[tuple]:
+    presidents = list(ALL_PRESIDENTS)
+    random.shuffle(presidents)
+    return [
+        (president, random.choice(president.generate_choices()))
+        for president in presidents
+    ]
+
+
+def nested_game(answers: List[tuple]) -> NestedGameLog:
+    results = [
+        NestedResult(
+            president=president.model_copy(),
+            is_correct=president.within_term(year),
+            selected_year=year,
+        )
+        for president, year in answers
+    ]
+    return NestedGameLog(
+        date=datetime.now(),
+        score=sum(result.is_correct for result in results),
+        total_questions=len(results),
+        duration=random.randint(30, 600),
+        results=results,
+    )
+
+
+def packed_game(answers: List[tuple]) -> GameLog:
+    results = [
+        Result(
+            president=president,
+            is_correct=president.within_term(year),
+            selected_year=year,
+        )
+        for president, year in answers
+    ]
+    return GameLog(
+        date=datetime.now(),
+        score=sum(result.is_correct for result in results),
+        total_questions=len(results),
+        duration=random.randint(30, 600),
+        results=results,
+    )
+
+
+def bytes_per_game(build: Callable[[List[tuple]], object], games: int) -> float:
+    """Average traced allocation of one stored game"""
+    answers = [random_answers() for _ in range(min(games, 100))]
+    gc.collect()
+    tracemalloc.start()
+    stored = [build(answers[i % len(answers)]) for i in range(games)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del stored
+    return size / games
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10_000)
+    args = parser.parse_args()
+
+    nested = bytes_per_game(nested_game, args.games)
+    packed = bytes_per_game(packed_game, args.games)
+
+    print(f"Measured over {args.games:,} games of {len(ALL_PRESIDENTS)} questions")
+    print(f"{'':<10}{'bytes/game':>12}{'1M games (MiB)':>18}")
+    for label, size in (("nested", nested), ("packed", packed)):
+        projected = size * PROJECTED_GAMES / 2**20
+        print(f"{label:<10}{size:>12,.0f}{projected:>18,.0f}")
+
+    print(f"Packed results use {nested / packed:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
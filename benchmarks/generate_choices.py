@@ -0,0 +1,71 @@
+"""Time generating the choices for every president, with the old rejection
+sampler and the current direct sampler.
+
+Run with `python -m benchmarks.generate_choices [--rounds N]`.
+"""
+
+import argparse
+import random
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from models import President
+from models.presidents import ALL_PRESIDENTS
+
+
+def rejection_choices(president: President, rng: random.Random) -> Tuple[list, int]:
+    """generate_choices as it was before, also counting wasted draws"""
+    choices: List[int] = []
+    rejected = 0
+    while True:
+        year = rng.randint(president.start - 25, president.end + 25)
+        if year in choices or president.within_term(year):
+            rejected += 1
+            continue
+
+        choices.append(year)
+        if 3 == len(choices):
+            break
+
+    choices.append(rng.randint(president.start, president.end))
+    rng.shuffle(choices)
+    return choices, rejected
+
+
+def time_rounds(generate: Callable[[President], object], rounds: int) -> float:
+    """Seconds per call, averaged over every president"""
+    start_time = perf_counter()
+    for _ in range(rounds):
+        for president in ALL_PRESIDENTS:
+            generate(president)
+
+    return (perf_counter() - start_time) / (rounds * len(ALL_PRESIDENTS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rejection = time_rounds(lambda president: rejection_choices(president, rng), args.rounds)
+    direct = time_rounds(lambda president: president.generate_choices(rng=rng), args.rounds)
+
+    print(f"{args.rounds:,} rounds of {len(ALL_PRESIDENTS)} presidents")
+    print(f"{'':<12}{'us/call':>10}")
+    print(f"{'rejection':<12}{rejection * 1e6:>10.2f}")
+    print(f"{'direct':<12}{direct * 1e6:>10.2f}")
+    print(f"Direct sampling is {rejection / direct:.1f}x faster\n")
+
+    print("Most rejected draws per question with the old sampler")
+    rejected = []
+    for president in ALL_PRESIDENTS:
+        wasted = sum(rejection_choices(president, rng)[1] for _ in range(args.rounds))
+        rejected.append((wasted / args.rounds, president.name))
+
+    for wasted, name in sorted(rejected, reverse=True)[:5]:
+        print(f"{name:<28}{wasted:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+"""Load test the served quiz with simulated websocket players.
+
+Run with `python -m benchmarks.load_test [--sessions N] [--keystrokes N]`.
+By default it starts `python server.py` on a free local port, with a
+temporary scoreboard, and stops it afterwards. --serve picks another entry
+point and --serve-args passes it options, for example
+`--serve multi_server.py --serve-args "--workers 4"`. --url points at a
+server that is already running instead, and --server-pid lets its processes
+be measured.
+
+Every session connects to the textual-serve websocket and plays the quiz:
+answering with a to d, moving on with n, giving up with g and restarting
+with r. It waits a think time drawn from a log-normal distribution between
+keys. The harness records:
+
+- connect time, until the websocket handshake completes
+- first frame time, until the app's first output arrives
+- the round trip of every key, until the first output that follows it
+- the server's resident memory per session, from /proc, sampled every second
+- the CPU time used by the server and all of its app processes
+
+Linux only, as the server is measured through /proc.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+# Key round trips slower than this are counted as timeouts
+KEY_TIMEOUT = 10.0
+
+
+@dataclass
+class Results:
+    connect: List[float] = field(default_factory=list)
+    first_frame: List[float] = field(default_factory=list)
+    keystrokes: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    timeouts: int = 0
+    completed_sessions: int = 0
+
+
+def children_of() -> Dict[int, List[int]]:
+    """Child pids of every process"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+
+        try:
+            with open(f"/proc/{entry.name}/stat", "rb") as file:
+                stat = file.read()
+        except OSError:
+            continue
+
+        # The command name is in brackets and may hold spaces
+        ppid = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    return children
+
+
+def process_tree(pid: int) -> List[int]:
+    """A process and all of its descendants"""
+    children = children_of()
+    tree = [pid]
+    for parent in tree:
+        tree.extend(children.get(parent, []))
+
+    return tree
+
+
+def read_stat(pid: int) -> Optional[List[bytes]]:
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as file:
+            stat = file.read()
+    except OSError:
+        return None
+
+    return stat[stat.rindex(b")") + 2 :].split()
+
+
+def rss_bytes(pids: Iterable[int]) -> int:
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as file:
+                total += int(file.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            continue
+
+    return total
+
+
+def cpu_seconds(pid: int) -> float:
+    """CPU time used by a process, its live descendants and the children
+    it has already reaped"""
+    total = 0.0
+    for index, tree_pid in enumerate(process_tree(pid)):
+        fields = read_stat(tree_pid)
+        if fields is None:
+            continue
+
+        # utime and stime, plus cutime and cstime for the server itself
+        ticks = int(fields[11]) + int(fields[12])
+        if 0 == index:
+            ticks += int(fields[13]) + int(fields[14])
+
+        total += ticks / CLOCK_TICKS
+
+    return total
+
+
+class ServerMonitor:
+    """Samples the memory of a server and its app processes"""
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.peak_rss = 0
+        self.peak_sessions_rss: List[int] = []
+        self.active_sessions = 0
+        self.start_cpu = cpu_seconds(pid)
+        self.baseline_rss = rss_bytes(process_tree(pid))
+
+    def sample(self) -> None:
+        rss = rss_bytes(process_tree(self.pid))
+        self.peak_rss = max(self.peak_rss, rss)
+        if self.active_sessions:
+            self.peak_sessions_rss.append(
+                (rss - self.baseline_rss) // self.active_sessions
+            )
+
+    async def run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(1)
+
+
+class Player:
+    """One simulated player on one websocket"""
+
+    def __init__(
+        self,
+        url: str,
+        keystrokes: int,
+        think_median: float,
+        think_sigma: float,
+        rng: random.Random,
+        results: Results,
+        monitor: Optional[ServerMonitor],
+    ) -> None:
+        self.url = url
+        self.keystrokes = keystrokes
+        self.think_median = think_median
+        self.think_sigma = think_sigma
+        self.rng = rng
+        self.results = results
+        self.monitor = monitor
+        self._frame = asyncio.Event()
+
+    def think_time(self) -> float:
+        return self.rng.lognormvariate(0, self.think_sigma) * self.think_median
+
+    def keys(self) -> Iterable[str]:
+        """Answer and move on, now and then giving up and restarting"""
+        keys: List[str] = []
+        while len(keys) < self.keystrokes:
+            for _ in range(self.rng.randint(5, 30)):
+                keys.extend((self.rng.choice("abcd"), "n"))
+
+            keys.extend(("g", "r"))
+
+        return keys[: self.keystrokes]
+
+    async def read(self, websocket: aiohttp.ClientWebSocketResponse) -> None:
+        async for message in websocket:
+            if aiohttp.WSMsgType.BINARY == message.type:
+                self._frame.set()
+
+    async def wait_for_frame(self) -> Optional[float]:
+        """Seconds until the next output, or None on a timeout"""
+        start_time = perf_counter()
+        try:
+            await asyncio.wait_for(self._frame.wait(), KEY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.results.timeouts += 1
+            return None
+
+        return perf_counter() - start_time
+
+    async def play(self, session: aiohttp.ClientSession) -> None:
+        start_time = perf_counter()
+        try:
+            websocket = await session.ws_connect(self.url, heartbeat=15)
+        except (aiohttp.ClientError, OSError) as error:
+            self.results.errors[type(error).__name__] += 1
+            return
+
+        self.results.connect.append(perf_counter() - start_time)
+        if self.monitor is not None:
+            self.monitor.active_sessions += 1
+
+        reader = asyncio.create_task(self.read(websocket))
+        try:
+            first_frame = await self.wait_for_frame()
+            if first_frame is None:
+                return
+
+            self.results.first_frame.append(perf_counter() - start_time)
+            for key in self.keys():
+                await asyncio.sleep(self.think_time())
+                # Only output caused by this key counts
+                self._frame.clear()
+                await websocket.send_json(["stdin", key])
+                round_trip = await self.wait_for_frame()
+                if round_trip is not None:
+                    self.results.keystrokes.append(round_trip)
+
+                if reader.done():
+                    self.results.errors["closed by server"] += 1
+                    return
+
+            self.results.completed_sessions += 1
+
+        except (aiohttp.ClientError, ConnectionError) as error:
+            self.results.errors[type(error).__name__] += 1
+
+        finally:
+            if self.monitor is not None:
+                self.monitor.active_sessions -= 1
+
+            reader.cancel()
+            await websocket.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(url: str, process: subprocess.Popen) -> None:
+    async with aiohttp.ClientSession() as session:
+        for _ in range(300):
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with {process.returncode}")
+
+            try:
+                async with session.get(url):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+
+    raise RuntimeError("Server didn't start")
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+
+    milliseconds = [sample * 1000 for sample in samples]
+    if len(milliseconds) > 1:
+        cuts = quantiles(milliseconds, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = milliseconds[0]
+
+    return {
+        "count": len(milliseconds),
+        "mean_ms": round(mean(milliseconds), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(max(milliseconds), 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    process = None
+    server_pid = args.server_pid
+    url = args.url
+    if url is None:
+        port = free_port()
+        command = [
+            sys.executable,
+            args.serve,
+            "--port",
+            str(port),
+            *shlex.split(args.serve_args),
+        ]
+        scoreboard = tempfile.TemporaryDirectory()
+        environment = dict(
+            os.environ,
+            PRESIDENT_QUIZ_SCOREBOARD=str(Path(scoreboard.name, "scoreboard.db")),
+        )
+        process = subprocess.Popen(
+            command,
+            cwd=PROJECT_DIR,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        server_pid = process.pid
+        await wait_for_server(f"http://localhost:{port}/", process)
+        url = f"ws://localhost:{port}/ws"
+
+    url = f"{url}?width={args.width}&height={args.height}"
+    monitor = None if server_pid is None else ServerMonitor(server_pid)
+    monitor_task = None if monitor is None else asyncio.create_task(monitor.run())
+
+    results = Results()
+    rng = random.Random(args.random_seed)
+    start_time = perf_counter()
+    try:
+        async with aiohttp.ClientSession() as session:
+            tasks = []
+            for index in range(args.sessions):
+                player = Player(
+                    url,
+                    args.keystrokes,
+                    args.think_median,
+                    args.think_sigma,
+                    random.Random(rng.random()),
+                    results,
+                    monitor,
+                )
+                tasks.append(asyncio.create_task(player.play(session)))
+                # Spread the connections over the ramp up
+                await asyncio.sleep(args.ramp / args.sessions)
+
+            await asyncio.gather(*tasks)
+
+    finally:
+        elapsed = perf_counter() - start_time
+        server_cpu = None
+        if monitor is not None:
+            monitor.sample()
+            server_cpu = cpu_seconds(server_pid) - monitor.start_cpu
+            monitor_task.cancel()
+
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report: Dict[str, object] = {
+        "sessions": args.sessions,
+        "completed_sessions": results.completed_sessions,
+        "keystrokes_per_session": args.keystrokes,
+        "think_median_s": args.think_median,
+        "think_sigma": args.think_sigma,
+        "elapsed_s": round(elapsed, 3),
+        "connect": summarize(results.connect),
+        "first_frame": summarize(results.first_frame),
+        "keystroke_round_trip": summarize(results.keystrokes),
+        "timeouts": results.timeouts,
+        "errors": dict(results.errors),
+    }
+    if monitor is not None:
+        per_session = monitor.peak_sessions_rss
+        report["server"] = {
+            "cpu_s": round(server_cpu, 3),
+            "cpu_cores_used": round(server_cpu / elapsed, 3),
+            "baseline_rss_mib": round(monitor.baseline_rss / 2**20, 1),
+            "peak_rss_mib": round(monitor.peak_rss / 2**20, 1),
+            "rss_per_session_mib": round(
+                (max(per_session) if per_session else 0) / 2**20, 1
+            ),
+        }
+
+    return report
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(
+        f"{report['completed_sessions']}/{report['sessions']} sessions completed "
+        f"in {report['elapsed_s']:.1f}s, {report['timeouts']} timeouts, "
+        f"errors: {report['errors'] or 'none'}"
+    )
+    print(f"{'':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in ("connect", "first_frame", "keystroke_round_trip"):
+        stats = report[name]
+        if not stats["count"]:
+            print(f"{name:<22}{0:>7}")
+            continue
+
+        print(
+            f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+    server = report.get("server")
+    if server:
+        print(
+            f"Server: {server['cpu_cores_used']:.2f} cores, "
+            f"peak RSS {server['peak_rss_mib']:.0f} MiB, "
+            f"{server['rss_per_session_mib']:.1f} MiB per session"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--keystrokes", type=int, default=40, help="Keys per session")
+    parser.add_argument(
+        "--ramp", type=float, default=5.0, help="Seconds to open every session over"
+    )
+    parser.add_argument(
+        "--think-median", type=float, default=0.5, help="Median seconds between keys"
+    )
+    parser.add_argument(
+        "--think-sigma", type=float, default=0.6, help="Spread of the think times"
+    )
+    parser.add_argument("--width", type=int, default=120)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument(
+        "--serve", default="server.py", help="Entry point to start the server with"
+    )
+    parser.add_argument("--serve-args", default="", help="Options for --serve")
+    parser.add_argument("--url", help="Websocket URL of a server already running")
+    parser.add_argument(
+        "--server-pid", type=int, help="Process of the server given by --url"
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time moving to the next question, with and without prefetching.
+
+Run with `python -m benchmarks.question_latency [--games N]`. Each game
+answers every question in a headless app, waiting as a player reading the
+feedback would. It times QuizScreen.next_question for each transition,
+and the part of it spent getting the question ready, which prefetching
+moves off the critical path.
+"""
+
+import argparse
+import asyncio
+import os
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+
+# Keep the benchmark's games out of the real scoreboard
+os.environ.setdefault("PRESIDENT_QUIZ_SCOREBOARD", ":memory:")
+
+from textual import events  # noqa: E402
+
+from screens import QuizScreen  # noqa: E402
+from screens.main_app_screen import PresidentQuizApp  # noqa: E402
+
+
+class BenchmarkApp(PresidentQuizApp):
+    def __init__(self, prefetch: bool) -> None:
+        super().__init__()
+        self.prefetch = prefetch
+
+    def on_mount(self, event: events.Mount) -> None:
+        # Instead of the app's own first screen
+        event.prevent_default()
+        self.push_screen(QuizScreen(prefetch=self.prefetch))
+
+
+def timed(function: Callable[[], Any], timings: List[float]) -> Callable[[], Any]:
+    def wrapper() -> Any:
+        start_time = perf_counter()
+        try:
+            return function()
+        finally:
+            timings.append(perf_counter() - start_time)
+
+    return wrapper
+
+
+async def play(prefetch: bool, games: int) -> Tuple[List[float], List[float], int]:
+    """Seconds per transition and per question taken, and how many questions
+    were prefetched"""
+    transitions: List[float] = []
+    takes: List[float] = []
+    prefetched = 0
+    for _ in range(games):
+        app = BenchmarkApp(prefetch)
+        async with app.run_test(size=(120, 50)) as pilot:
+            screen = app.screen
+            screen.next_question = timed(screen.next_question, transitions)
+            screen.prefetcher.take = timed(screen.prefetcher.take, takes)
+            while screen.curr_question is not None and screen.curr_question.remaining:
+                await pilot.press("a")
+                # Give the worker the time a player spends reading
+                await pilot.pause(0.01)
+                await pilot.press("n")
+
+            prefetched += screen.prefetcher.prefetched_total
+
+    return transitions, takes, prefetched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'':<12}{'next p50 us':>13}{'next p95 us':>13}"
+        f"{'take p50 us':>13}{'take p95 us':>13}{'prefetched':>12}"
+    )
+    for label, prefetch in (("on demand", False), ("prefetch", True)):
+        transitions, takes, prefetched = asyncio.run(play(prefetch, args.games))
+        next_cuts = quantiles(transitions, n=20)
+        take_cuts = quantiles(takes, n=20)
+        print(
+            f"{label:<12}{next_cuts[9] * 1e6:>13.0f}{next_cuts[18] * 1e6:>13.0f}"
+            f"{take_cuts[9] * 1e6:>13.1f}{take_cuts[18] * 1e6:>13.1f}"
+            f"{prefetched:>8}/{len(takes)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
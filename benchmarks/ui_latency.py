@@ -0,0 +1,238 @@
+"""Latency of each player action in a headless PresidentQuizApp.
+
+Run with `python -m benchmarks.ui_latency [--rounds N] [--seed-logs N]
+[--output FILE] [--compare FILE]`. Every round plays a full game answering
+every question, views the scoreboard and the details of a game, restarts,
+then gives up part way through a second game. Each action is timed from its
+key press until the app has handled it, the expected screen is shown and
+the screen has repainted.
+
+The scoreboard is a temporary SQLite database seeded with --seed-logs games.
+Percentiles are written as JSON, and --compare prints the change against an
+earlier run's JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Type
+
+# The app reads its scoreboard location when it is imported
+DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["PRESIDENT_QUIZ_SCOREBOARD"] = str(Path(DATABASE_DIR.name, "scoreboard.db"))
+
+from textual import events  # noqa: E402
+from textual.pilot import Pilot  # noqa: E402
+from textual.screen import Screen  # noqa: E402
+
+from config import SCOREBOARD  # noqa: E402
+from models import GameLog, PackedResults  # noqa: E402
+from models.presidents import ALL_PRESIDENTS  # noqa: E402
+from models.results import pack_result  # noqa: E402
+from screens import (  # noqa: E402
+    GameOverScreen,
+    QuizScreen,
+    ResultDetailScreen,
+    ScoreboardScreen,
+)
+from screens.main_app_screen import PresidentQuizApp  # noqa: E402
+
+SIZE = (120, 50)
+
+
+def seed_scoreboard(count: int, rng: random.Random) -> None:
+    """Fill the scoreboard with random finished games."""
+    now = datetime.now()
+    logs = []
+    for _ in range(count):
+        questions = rng.randint(1, len(ALL_PRESIDENTS))
+        packed = []
+        for index in rng.sample(range(len(ALL_PRESIDENTS)), questions):
+            president = ALL_PRESIDENTS[index]
+            year = rng.choice(president.generate_choices(rng=rng))
+            packed.append(pack_result(index, year, president.within_term(year)))
+
+        logs.append(
+            GameLog(
+                date=now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)),
+                score=sum(value & 1 for value in packed),
+                total_questions=questions,
+                duration=rng.randint(20, 900),
+                results=PackedResults(array("I", packed)),
+            )
+        )
+
+    for start in range(0, len(logs), 1000):
+        SCOREBOARD.add_many(logs[start : start + 1000])
+
+
+class Timer:
+    """Collects the seconds taken by each kind of action.
+
+    Keys are sent straight to the driver rather than through Pilot.press,
+    which sleeps until the process looks idle and would swamp the timings."""
+
+    def __init__(self, app: PresidentQuizApp, pilot: Pilot) -> None:
+        self.app = app
+        self.pilot = pilot
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    async def settle(self) -> None:
+        """Wait until the app and its screen have handled every message,
+        including those posted while handling the key, then repaint."""
+        while True:
+            await self.pilot._wait_for_screen()
+            nodes = [self.app, *self.app.screen.walk_children(with_self=True)]
+            if not any(node._message_queue.qsize() for node in nodes):
+                break
+
+        self.app.screen._on_timer_update()
+
+    async def press(
+        self, action: str, key: str, screen: Optional[Type[Screen]] = None
+    ) -> None:
+        """Press a key, waiting until it is handled and, when given, until
+        that screen is showing"""
+        event = events.Key(key, key if 1 == len(key) else None)
+        event.set_sender(self.app)
+
+        start_time = perf_counter()
+        self.app._driver.send_message(event)
+        await self.settle()
+        if screen is not None:
+            while not isinstance(self.app.screen, screen):
+                await asyncio.sleep(0)
+                await self.settle()
+
+        self.samples[action].append(perf_counter() - start_time)
+
+
+async def play_round(timer: Timer, rng: random.Random) -> None:
+    app = timer.app
+    quiz = app.screen
+    assert isinstance(quiz, QuizScreen)
+
+    # A full game, every question answered
+    while quiz.curr_question is not None and quiz.curr_question.remaining:
+        await timer.press("answer", rng.choice("abcd"))
+        await timer.press("next_question", "n")
+
+    await timer.press("answer", rng.choice("abcd"))
+    await timer.press("finish", "n", GameOverScreen)
+
+    await timer.press("scoreboard_open", "s", ScoreboardScreen)
+    await timer.press("scoreboard_move", "down")
+    await timer.press("scoreboard_page", "pagedown")
+    await timer.press("details_open", "enter", ResultDetailScreen)
+    await timer.press("details_close", "escape", ScoreboardScreen)
+    await timer.press("scoreboard_close", "escape", GameOverScreen)
+    await timer.press("restart", "r", QuizScreen)
+
+    # Give up part way through the next game
+    for _ in range(rng.randint(1, 10)):
+        await timer.press("answer", rng.choice("abcd"))
+        await timer.press("next_question", "n")
+
+    await timer.press("give_up", "g", GameOverScreen)
+    await timer.press("restart", "r", QuizScreen)
+
+
+async def run(rounds: int, rng: random.Random) -> Dict[str, List[float]]:
+    app = PresidentQuizApp()
+    async with app.run_test(size=SIZE) as pilot:
+        await pilot.pause()
+        timer = Timer(app, pilot)
+        for _ in range(rounds):
+            await play_round(timer, rng)
+
+    return timer.samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Milliseconds at each percentile"""
+    milliseconds = [sample * 1000 for sample in samples]
+    if len(milliseconds) > 1:
+        cuts = quantiles(milliseconds, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = milliseconds[0]
+
+    return {
+        "count": len(milliseconds),
+        "mean_ms": round(mean(milliseconds), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(max(milliseconds), 3),
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'action':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline is not None:
+        header += f"{'p50 change':>12}{'p95 change':>12}"
+
+    print(header)
+    for action, stats in report["actions"].items():
+        line = (
+            f"{action:<18}{stats['count']:>7}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+        before = None if baseline is None else baseline["actions"].get(action)
+        if before is not None:
+            for key in ("p50_ms", "p95_ms"):
+                change = (stats[key] / before[key] - 1) * 100 if before[key] else 0
+                line += f"{change:>+11.1f}%"
+
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed-logs", type=int, default=10_000)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    rng = random.Random(args.random_seed)
+    seed_scoreboard(args.seed_logs, rng)
+    samples = asyncio.run(run(args.rounds, rng))
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "rounds": args.rounds,
+        "seed_logs": args.seed_logs,
+        "size": list(SIZE),
+        "actions": {action: summarize(times) for action, times in samples.items()},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
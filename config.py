@@ -1,12 +1,81 @@
+import atexit
+import getpass
+import os
+from functools import partial
 from pathlib import Path, PosixPath
-from typing import List
 
-from models import GameLog
+from models import PRESIDENTS
+from models.term_table import set_table_loader
+from storage import (
+    ChallengeCache,
+    GameLogWriter,
+    Leaderboard,
+    MetricsRecorder,
+    ScheduleCache,
+    ScoreboardStore,
+    create_scoreboard_store,
+    load_dataset,
+)
 
 CURRENT_DIR = Path.cwd()
-CSS_DIR = Path.joinpath(CURRENT_DIR, "css")
+# Stylesheets ship with the code, wherever the game is started from
+PROJECT_DIR = Path(__file__).resolve().parent
+CSS_DIR = Path.joinpath(PROJECT_DIR, "css")
+# Parsed stylesheets, shared by every process that starts the app
+CSS_CACHE_DIR = Path(
+    os.environ.get("PRESIDENT_QUIZ_CSS_CACHE", Path.joinpath(CSS_DIR, ".cache"))
+)
 
-SCOREBOARD: List[GameLog] = []
+# Term datasets are CSV or JSON files found by name in the data directory,
+# or given as a path. The built in presidents need no file.
+DATASETS_DIR = Path.joinpath(CURRENT_DIR, "data")
+DATASET = os.environ.get("PRESIDENT_QUIZ_DATASET", PRESIDENTS)
+set_table_loader(partial(load_dataset, directories=[DATASETS_DIR]))
+
+# Either ":memory:" or the path to the SQLite scoreboard database
+SCOREBOARD_LOCATION = os.environ.get(
+    "PRESIDENT_QUIZ_SCOREBOARD", str(Path.joinpath(CURRENT_DIR, "scoreboard.db"))
+)
+SCOREBOARD: ScoreboardStore = create_scoreboard_store(SCOREBOARD_LOCATION)
+SCOREBOARD_PAGE_SIZE = 50
+
+# Daily challenge questions, built once a day for every session
+CHALLENGE_CACHE_DIR = Path(
+    os.environ.get(
+        "PRESIDENT_QUIZ_CHALLENGE_CACHE", Path.joinpath(CURRENT_DIR, "challenges")
+    )
+)
+CHALLENGES = ChallengeCache(CHALLENGE_CACHE_DIR)
+
+# Names whose games these are, and so whose weak terms adaptive games ask
+# about, for a game played in a terminal. Servers name each session's player.
+PLAYER_VARIABLE = "PRESIDENT_QUIZ_PLAYER"
+SCHEDULES = ScheduleCache(SCOREBOARD)
+
+# Game logs reach the scoreboard through a background writer
+SCOREBOARD_WRITER = GameLogWriter(SCOREBOARD)
+atexit.register(SCOREBOARD_WRITER.close)
+
+# Today / this week / all time ranks, asked of the scoreboard
+LEADERBOARD = Leaderboard(SCOREBOARD)
+
+# Where each process writes its counters and timings for the server to add
+# up, or nothing to only count in memory. The server sets it for the games.
+METRICS_DIR_VARIABLE = "PRESIDENT_QUIZ_METRICS_DIR"
+METRICS_DIR = os.environ.get(METRICS_DIR_VARIABLE)
+METRICS = MetricsRecorder(Path(METRICS_DIR) if METRICS_DIR else None)
+# The writer's queue depth, batch sizes and commit times, to tune it by
+METRICS.add_source(
+    "scoreboard_writer",
+    SCOREBOARD_WRITER.metrics.snapshot,
+    SCOREBOARD_WRITER.metrics.HELP,
+)
+
+
+def local_player() -> str:
+    """The player at this terminal, named in the environment or else the
+    user running the game"""
+    return os.environ.get(PLAYER_VARIABLE) or getpass.getuser()
 
 
 def get_css_path(file_name: str) -> PosixPath:
@@ -1,10 +1,24 @@
 from .game_log import GameLog
 from .presidents import President
-from .results import Result
+from .results import PackedResults, Result
+from .scheduler import AdaptiveSchedule
+from .term_index import TermIndex, term_index
+from .term_table import PRESIDENTS, TermTable, TermTableError, get_table
+from .timing import ResponseTimes, TimeHistogram
 
 
 __all__ = [
+    "AdaptiveSchedule",
     "GameLog",
+    "PRESIDENTS",
+    "PackedResults",
     "President",
+    "ResponseTimes",
     "Result",
+    "TermIndex",
+    "TermTable",
+    "TermTableError",
+    "TimeHistogram",
+    "get_table",
+    "term_index",
 ]
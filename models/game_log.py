@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import List
+from typing import Optional
 
 from pydantic import BaseModel
 
-from models.results import Result
+from models.results import PackedResults
+from models.term_table import PRESIDENTS
 
 
 class GameLog(BaseModel):
@@ -12,5 +13,12 @@ class GameLog(BaseModel):
     date: datetime
     score: int
     total_questions: int
-    duration: int
-    results: List[Result]
+    # Seconds, to the millisecond so equal scores rank by time
+    duration: float
+    # Validated before the results, which are rows of this dataset
+    dataset: str = PRESIDENTS
+    # The daily challenge the game was played as, if any
+    challenge_id: Optional[str] = None
+    # Who played it, for the schedules of adaptive games
+    player: Optional[str] = None
+    results: PackedResults
@@ -1,7 +1,49 @@
 import random
+from functools import cache
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+# How many years either side of a term the wrong choices are drawn from
+DISTRACTOR_WINDOW = 25
+
+
+def term_choices(
+    start: int,
+    end: int,
+    distractors: int = 3,
+    window: int = DISTRACTOR_WINDOW,
+    rng: Optional[random.Random] = None,
+) -> list[int]:
+    """Shuffled choices for a term: one year within it and distractors within
+    `window` years either side of it"""
+    rng = random if rng is None else rng
+    if distractors > 2 * window:
+        raise ValueError(f"Can't pick {distractors} distinct years from {2 * window}")
+
+    # Number the years before the term 0 to window - 1 and the years after
+    # it window to 2 * window - 1, then pick distinct offsets with Floyd's
+    # algorithm: one draw per distractor and none thrown away, however long
+    # the term
+    span = 2 * window
+    offsets: list[int] = []
+    for limit in range(span - distractors, span):
+        offset = int(rng.random() * (limit + 1))
+        offsets.append(limit if offset in offsets else offset)
+
+    choices = [
+        start - window + offset if offset < window else end + 1 + offset - window
+        for offset in offsets
+    ]
+
+    # Add year that is within term
+    choices.append(start + int(rng.random() * (end - start + 1)))
+
+    # Shuffle the list of choices
+    rng.shuffle(choices)
+
+    return choices
+
 
 class President(BaseModel):
     start: int = Field(description="Year the president started their term")
@@ -41,37 +83,22 @@ class President(BaseModel):
         """Check if the year is within the presidential term"""
         return self.start <= year <= self.end
 
-    def generate_random_year(self) -> int:
+    def generate_random_year(
+        self, window: int = DISTRACTOR_WINDOW, rng: Optional[random.Random] = None
+    ) -> int:
         """Generate a random year that is around the presidential term"""
-        return random.randint(self.start - 25, self.end + 25)
-
-    def generate_choices(self) -> list[int]:
-        """Generate four random number. Three that are not within the
-        presidential term and one within"""
-        choices = []
-        while True:
-            year = self.generate_random_year()
-            # Don't duplicate years
-            if year in choices:
-                continue
-
-            # Handle year within term later
-            if self.within_term(year):
-                continue
-
-            # Only want 3 choices that are not within term
-            choices.append(year)
-            if 3 == len(choices):
-                break
-
-        # Add year that is within term
-        year = random.randint(self.start, self.end)
-        choices.append(year)
-
-        # Shuffle the list of choices
-        random.shuffle(choices)
-
-        return choices
+        rng = random if rng is None else rng
+        return rng.randint(self.start - window, self.end + window)
+
+    def generate_choices(
+        self,
+        distractors: int = 3,
+        window: int = DISTRACTOR_WINDOW,
+        rng: Optional[random.Random] = None,
+    ) -> list[int]:
+        """Generate random years. The distractors are not within the
+        presidential term but within `window` years of it, and one is within"""
+        return term_choices(self.start, self.end, distractors, window, rng)
 
     def get_correct_year(self, curr_choices) -> int:
         """Given the random generated choices, find the one within the
@@ -79,59 +106,78 @@ class President(BaseModel):
         return next(year for year in curr_choices if self.within_term(year))
 
 
-ALL_PRESIDENTS = [
-    President(name="George Washington", start=1789, end=1797, ordinal_number=1),
-    President(name="John Adams", start=1797, end=1801, ordinal_number=2),
-    President(name="Thomas Jefferson", start=1801, end=1809, ordinal_number=3),
-    President(name="James Madison", start=1809, end=1817, ordinal_number=4),
-    President(name="James Monroe", start=1817, end=1825, ordinal_number=5),
-    President(name="John Quincy Adams", start=1825, end=1829, ordinal_number=6),
-    President(name="Andrew Jackson", start=1829, end=1837, ordinal_number=7),
-    President(name="Martin Van Buren", start=1837, end=1841, ordinal_number=8),
-    President(name="William Henry Harrison", start=1841, end=1841, ordinal_number=9),
-    President(name="John Tyler", start=1841, end=1845, ordinal_number=10),
-    President(name="James K. Polk", start=1845, end=1849, ordinal_number=11),
-    President(name="Zachary Taylor", start=1849, end=1850, ordinal_number=12),
-    President(name="Millard Fillmore", start=1850, end=1853, ordinal_number=13),
-    President(name="Franklin Pierce", start=1853, end=1857, ordinal_number=14),
-    President(name="James Buchanan", start=1857, end=1861, ordinal_number=15),
-    President(name="Abraham Lincoln", start=1861, end=1865, ordinal_number=16),
-    President(name="Andrew Johnson", start=1865, end=1869, ordinal_number=17),
-    President(name="Ulysses S. Grant", start=1869, end=1877, ordinal_number=18),
-    President(name="Rutherford B. Hayes", start=1877, end=1881, ordinal_number=19),
-    President(name="James Garfield", start=1881, end=1881, ordinal_number=20),
-    President(name="Chester Arthur", start=1881, end=1885, ordinal_number=21),
-    President(name="Grover Cleveland", start=1885, end=1889, ordinal_number=22),
-    President(name="Benjamin Harrison", start=1889, end=1893, ordinal_number=23),
-    President(name="Grover Cleveland", start=1893, end=1897, ordinal_number=24),
-    President(name="William McKinley", start=1897, end=1901, ordinal_number=25),
-    President(name="Theodore Roosevelt", start=1901, end=1909, ordinal_number=26),
-    President(name="William Howard Taft", start=1909, end=1913, ordinal_number=27),
-    President(name="Woodrow Wilson", start=1913, end=1921, ordinal_number=28),
-    President(name="Warren G. Harding", start=1921, end=1923, ordinal_number=29),
-    President(name="Calvin Coolidge", start=1923, end=1929, ordinal_number=30),
-    President(name="Herbert Hoover", start=1929, end=1933, ordinal_number=31),
-    President(name="Franklin D. Roosevelt", start=1933, end=1945, ordinal_number=32),
-    President(name="Harry S. Truman", start=1945, end=1953, ordinal_number=33),
-    President(name="Dwight Eisenhower", start=1953, end=1961, ordinal_number=34),
-    President(name="John F. Kennedy", start=1961, end=1963, ordinal_number=35),
-    President(name="Lyndon B. Johnson", start=1963, end=1969, ordinal_number=36),
-    President(name="Richard Nixon", start=1969, end=1974, ordinal_number=37),
-    President(name="Gerald Ford", start=1974, end=1977, ordinal_number=38),
-    President(name="Jimmy Carter", start=1977, end=1981, ordinal_number=39),
-    President(name="Ronald Reagan", start=1981, end=1989, ordinal_number=40),
-    President(name="George Bush", start=1989, end=1993, ordinal_number=41),
-    President(name="Bill Clinton", start=1993, end=2001, ordinal_number=42),
-    President(name="George W. Bush", start=2001, end=2009, ordinal_number=43),
-    President(name="Barack Obama", start=2009, end=2017, ordinal_number=44),
-    President(name="Donald Trump", start=2017, end=2021, ordinal_number=45),
-    President(name="Joe Biden", start=2021, end=2025, ordinal_number=44),
-    President(name="Donald Trump", start=2025, end=2029, ordinal_number=47),
-]
+# Name, start and end of every term in order, the president's ordinal
+# number being its position
+PRESIDENT_TERMS = (
+    ("George Washington", 1789, 1797),
+    ("John Adams", 1797, 1801),
+    ("Thomas Jefferson", 1801, 1809),
+    ("James Madison", 1809, 1817),
+    ("James Monroe", 1817, 1825),
+    ("John Quincy Adams", 1825, 1829),
+    ("Andrew Jackson", 1829, 1837),
+    ("Martin Van Buren", 1837, 1841),
+    ("William Henry Harrison", 1841, 1841),
+    ("John Tyler", 1841, 1845),
+    ("James K. Polk", 1845, 1849),
+    ("Zachary Taylor", 1849, 1850),
+    ("Millard Fillmore", 1850, 1853),
+    ("Franklin Pierce", 1853, 1857),
+    ("James Buchanan", 1857, 1861),
+    ("Abraham Lincoln", 1861, 1865),
+    ("Andrew Johnson", 1865, 1869),
+    ("Ulysses S. Grant", 1869, 1877),
+    ("Rutherford B. Hayes", 1877, 1881),
+    ("James Garfield", 1881, 1881),
+    ("Chester Arthur", 1881, 1885),
+    ("Grover Cleveland", 1885, 1889),
+    ("Benjamin Harrison", 1889, 1893),
+    ("Grover Cleveland", 1893, 1897),
+    ("William McKinley", 1897, 1901),
+    ("Theodore Roosevelt", 1901, 1909),
+    ("William Howard Taft", 1909, 1913),
+    ("Woodrow Wilson", 1913, 1921),
+    ("Warren G. Harding", 1921, 1923),
+    ("Calvin Coolidge", 1923, 1929),
+    ("Herbert Hoover", 1929, 1933),
+    ("Franklin D. Roosevelt", 1933, 1945),
+    ("Harry S. Truman", 1945, 1953),
+    ("Dwight Eisenhower", 1953, 1961),
+    ("John F. Kennedy", 1961, 1963),
+    ("Lyndon B. Johnson", 1963, 1969),
+    ("Richard Nixon", 1969, 1974),
+    ("Gerald Ford", 1974, 1977),
+    ("Jimmy Carter", 1977, 1981),
+    ("Ronald Reagan", 1981, 1989),
+    ("George Bush", 1989, 1993),
+    ("Bill Clinton", 1993, 2001),
+    ("George W. Bush", 2001, 2009),
+    ("Barack Obama", 2009, 2017),
+    ("Donald Trump", 2017, 2021),
+    ("Joe Biden", 2021, 2025),
+    ("Donald Trump", 2025, 2029),
+)
+
+
+@cache
+def all_presidents() -> List[President]:
+    """Every president, built the first time they are needed rather than
+    when the module is imported"""
+    return [
+        President(name=name, start=start, end=end, ordinal_number=number)
+        for number, (name, start, end) in enumerate(PRESIDENT_TERMS, 1)
+    ]
+
+
+def __getattr__(name: str):
+    if "ALL_PRESIDENTS" == name:
+        return all_presidents()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    first_pres = ALL_PRESIDENTS[0]
+    first_pres = all_presidents()[0]
     assert first_pres.within_term(1791)
     assert not first_pres.within_term(1788)
 
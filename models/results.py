@@ -1,15 +1,357 @@
-from pydantic import BaseModel
+import sys
+from array import array
+from itertools import repeat
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+    overload,
+)
 
-from models.presidents import President
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
 
+from models.presidents import President, all_presidents
+from models.term_table import PRESIDENTS, TermTable, TermTableError, get_table
 
-class Result(BaseModel):
-    """Log the result of a question"""
+# A result packs into 32 bits: the president's index in the upper 16, the
+# selected year in the next 15 and whether it was correct in the lowest bit
+INDEX_SHIFT = 16
+YEAR_SHIFT = 1
+YEAR_MASK = 0x7FFF
+MAX_INDEX = 0xFFFF
+# Times are kept in whole microseconds, up to a little over an hour
+MAX_MICROS = 0xFFFFFFFF
 
-    president: President
-    is_correct: bool
-    selected_year: int
+
+def pack_result(index: int, selected_year: int, is_correct: bool) -> int:
+    """Pack a result into a single unsigned 32 bit integer"""
+    if not 0 <= index <= MAX_INDEX:
+        raise ValueError(f"President index {index} can't be packed")
+
+    if not 0 <= selected_year <= YEAR_MASK:
+        raise ValueError(f"Year {selected_year} can't be packed")
+
+    return (index << INDEX_SHIFT) | (selected_year << YEAR_SHIFT) | int(is_correct)
+
+
+def president_index(president: President, dataset: str = PRESIDENTS) -> int:
+    """Row of a president's term in a dataset, found by name and term, since
+    ordinal numbers have been renumbered before. A built in president whose
+    term is no longer in the table falls back to the ordinal number."""
+    try:
+        return get_table(dataset).row_of(president)
+    except TermTableError:
+        if PRESIDENTS != dataset:
+            raise
+
+        return president.ordinal_number - 1
+
+
+class Result:
+    """Log the result of a question, and how long it took when timed: the
+    player's think time from the question showing to the answer, and the
+    screen's time handling the answer"""
+
+    __slots__ = ("packed", "dataset", "think_us", "handle_us")
+
+    def __init__(
+        self,
+        president: President,
+        is_correct: bool,
+        selected_year: int,
+        dataset: str = PRESIDENTS,
+    ) -> None:
+        index = president_index(president, dataset)
+        self.packed = pack_result(index, selected_year, is_correct)
+        self.dataset = dataset
+        self.think_us: Optional[int] = None
+        self.handle_us: Optional[int] = None
+
+    @classmethod
+    def from_packed(
+        cls,
+        packed: int,
+        dataset: str = PRESIDENTS,
+        think_us: Optional[int] = None,
+        handle_us: Optional[int] = None,
+    ) -> "Result":
+        result = cls.__new__(cls)
+        result.packed = packed
+        result.dataset = dataset
+        result.think_us = think_us
+        result.handle_us = handle_us
+        return result
+
+    @classmethod
+    def from_row(
+        cls,
+        table: TermTable,
+        row: int,
+        selected_year: int,
+        think_us: Optional[int] = None,
+    ) -> "Result":
+        """Result of answering the question for a row of a dataset"""
+        is_correct = table.within_term(row, selected_year)
+        return cls.from_packed(
+            pack_result(row, selected_year, is_correct), table.name, think_us
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], dataset: str = PRESIDENTS) -> "Result":
+        president = data["president"]
+        if not isinstance(president, President):
+            president = President.model_validate(president)
+
+        result = cls(
+            president=president,
+            is_correct=data["is_correct"],
+            selected_year=data["selected_year"],
+            dataset=dataset,
+        )
+        result.think_us = data.get("think_us")
+        result.handle_us = data.get("handle_us")
+        return result
+
+    @property
+    def president(self) -> President:
+        if PRESIDENTS == self.dataset:
+            return all_presidents()[self.packed >> INDEX_SHIFT]
+
+        return get_table(self.dataset)[self.packed >> INDEX_SHIFT]
+
+    @property
+    def is_correct(self) -> bool:
+        return bool(self.packed & 1)
+
+    @property
+    def selected_year(self) -> int:
+        return (self.packed >> YEAR_SHIFT) & YEAR_MASK
 
     @property
     def correct_year(self) -> str:
         return f"{self.president.start} - {self.president.end}"
+
+    @property
+    def think_time(self) -> Optional[float]:
+        """Seconds from the question showing to the answer, if timed"""
+        return None if self.think_us is None else self.think_us / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "president": self.president.model_dump(),
+            "is_correct": self.is_correct,
+            "selected_year": self.selected_year,
+        }
+        if self.think_us is not None:
+            data["think_us"] = self.think_us
+            data["handle_us"] = self.handle_us
+
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Result):
+            return NotImplemented
+
+        return self.packed == other.packed and self.dataset == other.dataset
+
+    def __repr__(self) -> str:
+        return (
+            f"Result(president={self.president.name!r}, "
+            f"is_correct={self.is_correct}, selected_year={self.selected_year})"
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            _validate_result,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                Result.to_dict
+            ),
+        )
+
+
+def _validate_result(
+    value: Union[Result, Dict[str, Any]], dataset: str = PRESIDENTS
+) -> Result:
+    if isinstance(value, Result):
+        return value
+
+    return Result.from_dict(value, dataset)
+
+
+class PackedResults(Sequence[Result]):
+    """The results of a game stored as one 32 bit integer each. Result
+    objects are only created when they are read. Every result of a game
+    comes from the same dataset.
+
+    Timed games keep the think and handling times of each result in two
+    more arrays of the same length. Games from before timing leave them
+    empty."""
+
+    __slots__ = ("packed", "dataset", "think_us", "handle_us")
+
+    def __init__(
+        self,
+        packed: Union[array, None] = None,
+        dataset: str = PRESIDENTS,
+        think_us: Union[array, None] = None,
+        handle_us: Union[array, None] = None,
+    ) -> None:
+        self.packed = array("I") if packed is None else packed
+        self.dataset = dataset
+        self.think_us = array("I") if think_us is None else think_us
+        self.handle_us = array("I") if handle_us is None else handle_us
+        if self.timed and not (
+            len(self.packed) == len(self.think_us) == len(self.handle_us)
+        ):
+            raise ValueError("Every result needs a think and handling time")
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Iterable[Union[Result, Dict[str, Any]]],
+        dataset: str = PRESIDENTS,
+    ) -> "PackedResults":
+        results = [_validate_result(result, dataset) for result in results]
+        packed = array("I", (result.packed for result in results))
+        # Only kept when every result was timed
+        if results and all(
+            result.think_us is not None and result.handle_us is not None
+            for result in results
+        ):
+            return cls(
+                packed,
+                dataset,
+                array("I", (min(result.think_us, MAX_MICROS) for result in results)),
+                array("I", (min(result.handle_us, MAX_MICROS) for result in results)),
+            )
+
+        return cls(packed, dataset)
+
+    @property
+    def timed(self) -> bool:
+        return bool(self.think_us)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, dataset: str = PRESIDENTS) -> "PackedResults":
+        """Read results written by to_bytes"""
+        packed = array("I")
+        packed.frombytes(data)
+        if "big" == sys.byteorder:
+            packed.byteswap()
+
+        return cls(packed, dataset)
+
+    def to_bytes(self) -> bytes:
+        """Little endian bytes of the packed results"""
+        if "big" == sys.byteorder:
+            packed = array("I", self.packed)
+            packed.byteswap()
+            return packed.tobytes()
+
+        return self.packed.tobytes()
+
+    def timings_to_bytes(self) -> bytes:
+        """Little endian think times then handling times, empty if untimed"""
+        timings = self.think_us + self.handle_us
+        if "big" == sys.byteorder:
+            timings.byteswap()
+
+        return timings.tobytes()
+
+    def set_timings_from_bytes(self, data: bytes) -> None:
+        """Read the times written by timings_to_bytes"""
+        timings = array("I")
+        timings.frombytes(data)
+        if "big" == sys.byteorder:
+            timings.byteswap()
+
+        if len(timings) != 2 * len(self.packed):
+            raise ValueError(
+                f"{len(timings)} times don't fit {len(self.packed)} results"
+            )
+
+        self.think_us = timings[: len(self.packed)]
+        self.handle_us = timings[len(self.packed) :]
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    @overload
+    def __getitem__(self, index: int) -> Result: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PackedResults": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PackedResults(
+                self.packed[index],
+                self.dataset,
+                self.think_us[index],
+                self.handle_us[index],
+            )
+
+        if self.timed:
+            return Result.from_packed(
+                self.packed[index],
+                self.dataset,
+                self.think_us[index],
+                self.handle_us[index],
+            )
+
+        return Result.from_packed(self.packed[index], self.dataset)
+
+    def __iter__(self) -> Iterator[Result]:
+        if self.timed:
+            return map(
+                Result.from_packed,
+                self.packed,
+                repeat(self.dataset),
+                self.think_us,
+                self.handle_us,
+            )
+
+        return map(Result.from_packed, self.packed, repeat(self.dataset))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PackedResults):
+            return self.packed == other.packed and self.dataset == other.dataset
+
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PackedResults({list(self)!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # Accepts and serializes the same list of results as before packing
+        return core_schema.with_info_plain_validator_function(
+            _validate_packed_results,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda results: [result.to_dict() for result in results]
+            ),
+        )
+
+
+def _validate_packed_results(
+    value: Any, info: core_schema.ValidationInfo
+) -> PackedResults:
+    if isinstance(value, PackedResults):
+        return value
+
+    # Within a game log, the results belong to the log's dataset
+    dataset = (info.data or {}).get("dataset", PRESIDENTS)
+    return PackedResults.from_results(value, dataset)
@@ -0,0 +1,181 @@
+import random
+import threading
+from array import array
+from collections import deque
+from typing import Deque, Iterable, Optional
+
+from models.results import INDEX_SHIFT, PackedResults
+
+# How much each earlier answer of a term still counts, answer by answer
+MEMORY = 0.8
+# Terms keep this much weight however well they are known
+MIN_WEIGHT = 0.05
+# A term asked this many questions ago is back to its full weight
+SPACING = 8
+
+
+class FenwickTree:
+    """Weights with O(log n) updates and O(log n) sampling by weight.
+
+    Each node holds the sum of a power of two run of weights ending at it,
+    so a prefix sum adds log n nodes and finding the weight a running total
+    falls in walks down log n of them."""
+
+    def __init__(self, weights: Iterable[float]) -> None:
+        self.weights = array("d", weights)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def _build(self) -> None:
+        """Fill the tree from the weights in O(n)"""
+        size = len(self.weights)
+        self.tree = array("d", [0.0]) + self.weights
+        for node in range(1, size + 1):
+            parent = node + (node & -node)
+            if parent <= size:
+                self.tree[parent] += self.tree[node]
+
+        # Updates add differences, whose rounding errors the rebuild clears
+        self._updates = 0
+
+    @property
+    def total(self) -> float:
+        return self.prefix_sum(len(self.weights))
+
+    def prefix_sum(self, count: int) -> float:
+        """Sum of the first count weights"""
+        total = 0.0
+        while count > 0:
+            total += self.tree[count]
+            count &= count - 1
+
+        return total
+
+    def update(self, index: int, weight: float) -> None:
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        self._updates += 1
+        if self._updates > len(self.weights):
+            self._build()
+            return
+
+        node = index + 1
+        size = len(self.weights)
+        while node <= size:
+            self.tree[node] += delta
+            node += node & -node
+
+    def find(self, target: float) -> int:
+        """Index of the weight a running total of target falls in"""
+        size = len(self.weights)
+        node = 0
+        step = 1 << size.bit_length()
+        while step:
+            child = node + step
+            if child <= size and self.tree[child] <= target:
+                node = child
+                target -= self.tree[child]
+
+            step >>= 1
+
+        # Rounding can run past the last weight, or land on a zero one
+        while node >= size or 0.0 == self.weights[node]:
+            node -= 1
+
+        return node
+
+    def sample(self, rng: random.Random) -> int:
+        return self.find(rng.random() * self.total)
+
+
+class AdaptiveSchedule:
+    """Which term to ask a player next, weighted towards the terms they
+    miss and away from the ones just asked.
+
+    A term's error rate counts recent answers more than old ones and starts
+    at one half. Its weight is MIN_WEIGHT plus that rate, scaled down to
+    nothing when it is asked and back up over the next SPACING questions.
+    Asking or answering updates the weights of at most SPACING terms."""
+
+    def __init__(self, size: int) -> None:
+        # Answers and misses of each term, older ones decayed by MEMORY
+        self.seen = array("d", bytes(8 * size))
+        self.missed = array("d", bytes(8 * size))
+        # Question number each term was last asked at
+        self.asked = array("q", [-SPACING] * size)
+        self.step = 0
+        self.spacing = min(SPACING, size - 1)
+        self.recent: Deque[int] = deque()
+        self.weights = FenwickTree(self.weight(row) for row in range(size))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    @classmethod
+    def from_history(
+        cls, size: int, history: Iterable[PackedResults]
+    ) -> "AdaptiveSchedule":
+        """A player's schedule from the results of their games, oldest first,
+        counted in one pass with the weights built once at the end"""
+        schedule = cls(size)
+        for results in history:
+            for packed in results.packed:
+                row = packed >> INDEX_SHIFT
+                if row >= size:
+                    # The dataset has shrunk since
+                    continue
+
+                schedule.step += 1
+                schedule.asked[row] = schedule.step
+                schedule._count(row, bool(packed & 1))
+
+        recent = sorted(range(size), key=schedule.asked.__getitem__)
+        schedule.recent.extend(
+            row for row in recent[size - schedule.spacing :]
+            if schedule.step - schedule.asked[row] < schedule.spacing
+        )
+        schedule.weights = FenwickTree(schedule.weight(row) for row in range(size))
+        return schedule
+
+    def error_rate(self, row: int) -> float:
+        return (self.missed[row] + 1) / (self.seen[row] + 2)
+
+    def weight(self, row: int) -> float:
+        since = self.step - self.asked[row]
+        spacing = min(since / self.spacing, 1.0) if self.spacing else 1.0
+        return (MIN_WEIGHT + self.error_rate(row)) * spacing
+
+    def next_row(self, rng: Optional[random.Random] = None) -> int:
+        """Pick the next term to ask by weight, and space it from its next
+        turn"""
+        rng = random if rng is None else rng
+        with self._lock:
+            row = self.weights.sample(rng)
+            self.step += 1
+            self.asked[row] = self.step
+            if row in self.recent:
+                self.recent.remove(row)
+
+            self.recent.append(row)
+            if len(self.recent) > self.spacing:
+                # Back to its full weight
+                self.weights.update(self.recent[0], self.weight(self.recent[0]))
+                self.recent.popleft()
+
+            for recent in self.recent:
+                self.weights.update(recent, self.weight(recent))
+
+            return row
+
+    def record(self, row: int, is_correct: bool) -> None:
+        """Count an answer towards the term's error rate"""
+        with self._lock:
+            self._count(row, is_correct)
+            self.weights.update(row, self.weight(row))
+
+    def _count(self, row: int, is_correct: bool) -> None:
+        self.seen[row] = self.seen[row] * MEMORY + 1
+        self.missed[row] = self.missed[row] * MEMORY + (not is_correct)
@@ -0,0 +1,96 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cache
+from itertools import accumulate
+from typing import Iterable, List, Tuple
+
+from models.term_table import TermTable
+
+
+class TermIndex:
+    """Answers which terms of a table were held in a year or a range of
+    years, as rows of the table.
+
+    The terms are sorted by start year next to a running maximum of their end
+    years. Two binary searches bound the terms that can overlap a range, so a
+    lookup costs O(log n + k) when no term lies inside another, as in a
+    chronological table. Nested terms are still answered correctly, they are
+    filtered out of the bounded slice. A shared boundary year, like 1797,
+    belongs to both the outgoing and incoming term."""
+
+    def __init__(self, table: TermTable) -> None:
+        self.table = table
+        self.rows = array(
+            "i",
+            sorted(
+                range(len(table)),
+                key=lambda row: (table.starts[row], table.ends[row], row),
+            ),
+        )
+        self.starts = array("i", (table.starts[row] for row in self.rows))
+        self.ends = array("i", (table.ends[row] for row in self.rows))
+        # Latest end year of any term up to each position, never decreasing
+        self.reach = array("i", accumulate(self.ends, max))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _bounds(self, first: int, last: int) -> Tuple[int, int]:
+        """Slice of terms that may overlap first to last"""
+        return bisect_left(self.reach, first), bisect_right(self.starts, last)
+
+    def in_office(self, year: int) -> List[int]:
+        """Every row whose term includes some of the year"""
+        return self.overlapping(year, year)
+
+    def overlapping(self, first: int, last: int) -> List[int]:
+        """Every row whose term overlaps first to last, inclusive"""
+        if first > last:
+            raise ValueError(f"Range {first} - {last} ends before it starts")
+
+        low, high = self._bounds(first, last)
+        return [self.rows[i] for i in range(low, high) if self.ends[i] >= first]
+
+    def in_office_many(self, years: Iterable[int]) -> List[List[int]]:
+        """in_office for many years at once, in the order given.
+
+        The years are sorted and swept with the terms in one pass, rather
+        than searching for each, so n terms and m years cost O(n + m log m)
+        however many years repeat."""
+        years = array("i", years)
+        order = sorted(range(len(years)), key=years.__getitem__)
+        answers: List[List[int]] = [[] for _ in years]
+
+        low = high = last_position = 0
+        previous = None
+        for position in order:
+            year = years[position]
+            if year == previous:
+                answers[position] = answers[last_position]
+                continue
+
+            # Both bounds only move forward as the years increase
+            while low < len(self) and self.reach[low] < year:
+                low += 1
+
+            while high < len(self) and self.starts[high] <= year:
+                high += 1
+
+            answers[position] = [
+                self.rows[i] for i in range(low, high) if self.ends[i] >= year
+            ]
+            previous = year
+            last_position = position
+
+        return answers
+
+    def count_in_office(self, years: Iterable[int]) -> array:
+        """Number of terms held in each year"""
+        return array("i", map(len, self.in_office_many(years)))
+
+
+@cache
+def term_index(table: TermTable) -> TermIndex:
+    """Index of a table's terms, built on first use"""
+    return TermIndex(table)
+
@@ -0,0 +1,190 @@
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models.presidents import DISTRACTOR_WINDOW, PRESIDENT_TERMS, President
+
+# Name of the built in dataset, the game's original list of presidents
+PRESIDENTS = "presidents"
+
+# Packed results hold a 16 bit row and a 15 bit year
+MAX_ROWS = 0x10000
+MAX_YEAR = 0x7FFF
+
+# How many bad rows to describe before summarizing the rest
+MAX_REPORTED_ERRORS = 10
+
+
+class TermTableError(ValueError):
+    """Term data that can't be used by the game"""
+
+
+class TermTable:
+    """A dataset of terms held as columns rather than one model per term.
+
+    Rows are only turned into President models when they are read, so
+    tables with tens of thousands of terms cost a few arrays."""
+
+    def __init__(
+        self,
+        name: str,
+        title: str,
+        names: List[str],
+        starts: array,
+        ends: array,
+        ordinals: array,
+    ) -> None:
+        self.name = name
+        self.title = title
+        self.names = names
+        self.starts = starts
+        self.ends = ends
+        self.ordinals = ordinals
+        self._rows: Optional[Dict[Tuple[str, int, int], int]] = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        name: str,
+        title: str,
+        names: Iterable[str],
+        starts: Iterable[int],
+        ends: Iterable[int],
+        ordinals: Optional[Iterable[int]] = None,
+    ) -> "TermTable":
+        """Build a table, validating every row before reporting the errors."""
+        names = [str(term_name).strip() for term_name in names]
+        try:
+            starts = array("i", starts)
+            ends = array("i", ends)
+            if ordinals is None:
+                ordinals = array("i", range(1, len(names) + 1))
+            else:
+                ordinals = array("i", ordinals)
+        except (TypeError, ValueError, OverflowError) as error:
+            raise TermTableError(f"{name}: years must be integers ({error})") from None
+
+        table = cls(name, title, names, starts, ends, ordinals)
+        table.validate()
+        return table
+
+    @classmethod
+    def from_presidents(
+        cls, name: str, title: str, presidents: List[President]
+    ) -> "TermTable":
+        return cls.from_columns(
+            name,
+            title,
+            (president.name for president in presidents),
+            (president.start for president in presidents),
+            (president.end for president in presidents),
+            (president.ordinal_number for president in presidents),
+        )
+
+    def validate(self) -> None:
+        """Check every column at once, raising one error for all bad rows."""
+        count = len(self.names)
+        if not len(self.starts) == len(self.ends) == len(self.ordinals) == count:
+            raise TermTableError(f"{self.name}: columns have different lengths")
+
+        if not count:
+            raise TermTableError(f"{self.name}: has no terms")
+
+        if count > MAX_ROWS:
+            raise TermTableError(
+                f"{self.name}: has {count} terms, at most {MAX_ROWS} are supported"
+            )
+
+        # Leave room for every choice offered around a term to be recorded
+        lowest = DISTRACTOR_WINDOW
+        highest = MAX_YEAR - DISTRACTOR_WINDOW
+        errors = []
+        for row, (term_name, start, end) in enumerate(
+            zip(self.names, self.starts, self.ends)
+        ):
+            if not term_name:
+                errors.append(f"row {row + 1}: missing name")
+            elif "\x00" in term_name:
+                errors.append(f"row {row + 1}: name contains a NUL character")
+
+            if start > end:
+                errors.append(f"row {row + 1}: ends in {end} before starting in {start}")
+            elif start < lowest or end > highest:
+                errors.append(f"row {row + 1}: years must be within {lowest} - {highest}")
+
+        if errors:
+            reported = "\n  ".join(errors[:MAX_REPORTED_ERRORS])
+            more = len(errors) - MAX_REPORTED_ERRORS
+            if more > 0:
+                reported += f"\n  and {more} more"
+
+            raise TermTableError(f"{self.name}: invalid terms\n  {reported}")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, row: int) -> President:
+        # Already validated with the rest of the table
+        return President.model_construct(
+            name=self.names[row],
+            start=self.starts[row],
+            end=self.ends[row],
+            ordinal_number=self.ordinals[row],
+        )
+
+    def within_term(self, row: int, year: int) -> bool:
+        return self.starts[row] <= year <= self.ends[row]
+
+    def row_of(self, president: President) -> int:
+        """Row holding a president's term"""
+        if self._rows is None:
+            self._rows = {
+                term: row
+                for row, term in enumerate(zip(self.names, self.starts, self.ends))
+            }
+
+        try:
+            return self._rows[(president.name, president.start, president.end)]
+        except KeyError:
+            raise TermTableError(
+                f"{self.name}: no term for {president.name} "
+                f"({president.start} - {president.end})"
+            ) from None
+
+
+# Loaded tables by name, and how to load one that isn't loaded yet
+_TABLES: Dict[str, TermTable] = {}
+_TABLES_LOCK = threading.Lock()
+_loader: Optional[Callable[[str], TermTable]] = None
+
+
+def register_table(table: TermTable, replace: bool = True) -> None:
+    """Make a table available to get_table, optionally keeping one already
+    registered under the same name"""
+    with _TABLES_LOCK:
+        if replace or table.name not in _TABLES:
+            _TABLES[table.name] = table
+
+
+def set_table_loader(loader: Callable[[str], TermTable]) -> None:
+    """Set how get_table loads a dataset the first time it is asked for."""
+    global _loader
+    _loader = loader
+
+
+def get_table(name: str) -> TermTable:
+    """A dataset by name, loading it on first use"""
+    table = _TABLES.get(name)
+    if table is not None:
+        return table
+
+    if _loader is None:
+        raise TermTableError(f"Dataset {name!r} is not loaded")
+
+    table = _loader(name)
+    with _TABLES_LOCK:
+        return _TABLES.setdefault(name, table)
+
+
+# Straight from the raw terms, so no President models are built at import
+register_table(TermTable.from_columns(PRESIDENTS, "President", *zip(*PRESIDENT_TERMS)))
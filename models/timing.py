@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from models.results import INDEX_SHIFT, PackedResults
+
+# Upper bound of each histogram bucket in microseconds, doubling from a
+# millisecond to about a minute. The last bucket holds anything longer.
+BUCKET_BOUNDS = tuple(1000 << power for power in range(17))
+
+
+class TimeHistogram:
+    """Counts of times in buckets that double in width, so it takes the
+    same space for quick screen updates and slow answers alike"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total_us = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, micros: int) -> None:
+        # The bucket is the power of two above the time, in milliseconds
+        bucket = min(max(micros - 1, 0) // 1000, 1 << 17).bit_length()
+        self.counts[min(bucket, len(BUCKET_BOUNDS))] += 1
+        self.count += 1
+        self.total_us += micros
+
+    def record_many(self, times: Iterable[int]) -> None:
+        for micros in times:
+            self.record(micros)
+
+    def merge(self, other: "TimeHistogram") -> None:
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+
+        self.count += other.count
+        self.total_us += other.total_us
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_us / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Estimated time under which `fraction` of the times fall, spread
+        evenly across the bucket it lands in"""
+        if not self.count:
+            return 0.0
+
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                low = BUCKET_BOUNDS[bucket - 1] if bucket else 0
+                high = (
+                    BUCKET_BOUNDS[bucket]
+                    if bucket < len(BUCKET_BOUNDS)
+                    else 2 * BUCKET_BOUNDS[-1]
+                )
+                return low + (high - low) * (target - seen) / count
+
+            seen += count
+
+        return float(BUCKET_BOUNDS[-1])
+
+
+class ResponseTimes:
+    """How long answers take: think time per term and for a whole session,
+    and how long the screen took to handle each event"""
+
+    def __init__(self) -> None:
+        self.terms: Dict[Tuple[str, int], TimeHistogram] = {}
+        self.think = TimeHistogram()
+        self.handle = TimeHistogram()
+
+    def term(self, dataset: str, row: int) -> TimeHistogram:
+        histogram = self.terms.get((dataset, row))
+        if histogram is None:
+            histogram = self.terms[(dataset, row)] = TimeHistogram()
+
+        return histogram
+
+    def record_answer(
+        self, dataset: str, row: int, think_us: int, handle_us: Optional[int] = None
+    ) -> None:
+        self.term(dataset, row).record(think_us)
+        self.think.record(think_us)
+        if handle_us is not None:
+            self.handle.record(handle_us)
+
+    def record_results(self, results: PackedResults) -> None:
+        """Add the timed answers of a recorded game"""
+        if not results.timed:
+            return
+
+        for packed, think_us, handle_us in zip(
+            results.packed, results.think_us, results.handle_us
+        ):
+            self.record_answer(results.dataset, packed >> INDEX_SHIFT, think_us, handle_us)
+
+    def merge(self, other: "ResponseTimes") -> None:
+        for (dataset, row), histogram in other.terms.items():
+            self.term(dataset, row).merge(histogram)
+
+        self.think.merge(other.think)
+        self.handle.merge(other.handle)
@@ -0,0 +1,36 @@
+import argparse
+import os
+from pathlib import Path
+
+from serving import MultiSessionServer
+
+parser = argparse.ArgumentParser(
+    description="Serve the President Term Quiz with many sessions per process"
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="Number of worker processes, each hosting sessions on its own event loop",
+)
+parser.add_argument(
+    "--metrics",
+    type=Path,
+    nargs="?",
+    const=Path("metrics"),
+    metavar="DIR",
+    help="Serve every session's counters and timings at /metrics to this "
+    "machine, gathered in DIR (./metrics by default)",
+)
+parser.add_argument("--host", default="localhost")
+parser.add_argument("--port", type=int, default=8000)
+args = parser.parse_args()
+
+server = MultiSessionServer(
+    workers=args.workers,
+    host=args.host,
+    port=args.port,
+    title="President Term Quiz",
+    metrics_dir=args.metrics,
+)
+server.serve()
@@ -1,9 +1,34 @@
-from .game_over_screen import GameOverScreen
-from .scoreboard_screen import ResultDetailScreen, ScoreboardScreen
-from .quiz_screen import QuizScreen
+from importlib import import_module
+
+# Screens are imported on first use, so starting the app only pays for the
+# quiz screen it shows first
+_SCREEN_MODULES = {
+    "AccuracyScreen": "accuracy_screen",
+    "GameOverScreen": "game_over_screen",
+    "ResultDetailScreen": "scoreboard_screen",
+    "ScoreboardScreen": "scoreboard_screen",
+    "QuizScreen": "quiz_screen",
+}
+
+
+def __getattr__(name: str):
+    module = _SCREEN_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    screen = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = screen
+    return screen
+
+
+def load_screens() -> None:
+    """Import every screen now, for processes that start their apps later."""
+    for name in __all__:
+        __getattr__(name)
 
 
 __all__ = [
+    "AccuracyScreen",
     "GameOverScreen",
     "ResultDetailScreen",
     "ScoreboardScreen",
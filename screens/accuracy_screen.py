@@ -0,0 +1,119 @@
+from typing import List, Optional
+
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.geometry import Size
+from textual.screen import Screen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Footer, Header, Static
+
+from config import DATASET, SCOREBOARD, SCOREBOARD_WRITER, get_css_path
+from models import TermTable, get_table
+from storage import TermStats
+from storage.analytics import DISTANCE_LABELS
+
+# The bar showing how far off wrong answers were, one shade per distance
+BAR_WIDTH = 20
+BAR_SHADES = "█▓▒░-·"
+
+
+class AccuracyList(ScrollView, can_focus=True):
+    """Answer totals of each term, most missed first, formatting only the
+    rows in view"""
+
+    def __init__(self, id: Optional[str] = None) -> None:
+        super().__init__(id=id)
+        self.dataset: Optional[TermTable] = None
+        self.terms: List[TermStats] = []
+
+    def show(self, dataset: TermTable, terms: List[TermStats]) -> None:
+        self.dataset = dataset
+        self.terms = sorted(
+            # Only terms of the table as it is now loaded
+            (term for term in terms if 0 <= term.row < len(dataset)),
+            key=lambda term: (term.accuracy, -term.answered),
+        )
+        self.virtual_size = Size(self.size.width, len(self.terms))
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        style = self.rich_style
+        if not 0 <= index < len(self.terms):
+            return Strip.blank(width, style)
+
+        term = self.terms[index]
+        name = self.dataset.names[term.row]
+        ordinal = self.dataset.ordinals[term.row]
+
+        # Each bucket's share of the wrong answers, closest first
+        wrong = term.answered - term.correct
+        bar = ""
+        if wrong:
+            for count, shade in zip(term.distances, BAR_SHADES):
+                bar += shade * round(count / wrong * BAR_WIDTH)
+
+        text = Text.from_markup(
+            f" {ordinal:>3}  {name[:25]:<26}{term.answered:>8}"
+            f"  [b]{term.accuracy:>5.0%}[/b]{term.mean_distance:>8.1f}  {bar}"
+        )
+        text.stylize(style)
+        strip = Strip(text.render(self.app.console), text.cell_len)
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
+
+
+class AccuracyScreen(Screen):
+    """How often each term is answered correctly, read from the running
+    totals rather than every game"""
+
+    CSS_PATH = get_css_path("scoreboard_screen.tcss")
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back to Scoreboard", priority=True),
+    ]
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Footer()
+
+        with Vertical(id="GameOverContainer"):
+            yield Static("Accuracy by Term", classes="title")
+            yield Static(
+                "[b]   #  NAME                      ANSWERED  RIGHT  OFF BY  "
+                "YEARS OFF[/b]",
+                id="AccuracyHeader",
+            )
+            yield AccuracyList(id="AccuracyList")
+            yield Static(
+                "Years off: "
+                + "  ".join(
+                    f"{shade} {label}"
+                    for shade, label in zip(BAR_SHADES, DISTANCE_LABELS)
+                ),
+                id="AccuracyLegend",
+            )
+
+    def on_mount(self) -> None:
+        self.accuracy_list = self.query_one(AccuracyList)
+
+    def on_screen_resume(self) -> None:
+        """The app keeps this screen, so refresh it every time it is shown."""
+        self.accuracy_list.focus()
+        self.run_worker(
+            self.load_accuracy, thread=True, group="accuracy", exclusive=True
+        )
+
+    def load_accuracy(self) -> None:
+        """Read the totals in a worker thread, since it waits for the games
+        still being written, then show them."""
+        # Games finished moments ago may still be on their way to the store
+        SCOREBOARD_WRITER.flush()
+        dataset = get_table(DATASET)
+        stats = SCOREBOARD.accuracy_stats(dataset.name)
+        self.app.call_from_thread(
+            self.accuracy_list.show, dataset, stats.rows(dataset.name)
+        )
@@ -26,6 +26,8 @@ class ButtonVariant(StrEnum):
 
 class ButtonId(StrEnum):
     RESTART = auto()
+    DAILY_CHALLENGE = auto()
+    PRACTICE = auto()
     VIEW_SCOREBOARD = auto()
     QUIT = auto()
 
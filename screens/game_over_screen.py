@@ -1,30 +1,37 @@
+from functools import partial
 from typing import Optional
 from textual.app import ComposeResult
 from textual.containers import Vertical, Center
 from textual.widgets import Header, Footer, Button, Static
 from textual.screen import Screen
 
-from config import get_css_path
+from config import LEADERBOARD, SCOREBOARD, SCOREBOARD_WRITER, get_css_path
+from models import GameLog, ResponseTimes
 from screens.constants import ButtonId
-from screens.scoreboard_screen import ScoreboardScreen
+from storage import LeaderboardWindow
 
 
 class GameOverScreen(Screen):
     """Screen displayed when user has answered all the president’s term or
-    player has given up."""
+    player has given up. The app keeps one and shows each result on it."""
 
     CSS_PATH = get_css_path("game_over_screen.tcss")
     BINDINGS = [
         ("s", "view_scoreboard", "View Scoreboard"),
         ("r", "restart", "Restart Quiz"),
+        ("d", "daily_challenge", "Daily Challenge"),
+        ("p", "practice", "Practice Weak Terms"),
         ("q", "quit", "Quit"),
     ]
 
     def __init__(
         self,
-        score: int,
-        total_questions: int,
-        duration: int,
+        score: int = 0,
+        total_questions: int = 0,
+        duration: float = 0,
+        weekly_rank: Optional[int] = None,
+        challenge_rank: Optional[int] = None,
+        response_times: Optional[ResponseTimes] = None,
         name: Optional[str] = None,
         id: Optional[str] = None,
         classes: Optional[str] = None,
@@ -34,41 +41,144 @@ class GameOverScreen(Screen):
         self.score = score
         self.total_questions = total_questions
         self.duration = duration
+        self.weekly_rank = weekly_rank
+        self.challenge_rank = challenge_rank
+        self.response_times = response_times
+        # The game whose ranks are being looked up
+        self.ranked_game: Optional[GameLog] = None
 
     def compose(self) -> ComposeResult:
         """Create the final widgets."""
         yield Header()
         yield Footer()
 
-        percentage = 0
-        if self.total_questions > 0:
-            percentage = (self.score / self.total_questions) * 100
-
         with Vertical(id="GameOverContainer"):
             yield Static("Game Over", classes="title")
-            yield Static(
-                f"You finished the quiz with a final score of {self.score} out of {self.total_questions}"
-                f" ({percentage:.0f}%) in {self.duration:.1f} seconds!",
-                classes="message",
-            )
+            yield Static(id="FinalScore", classes="message")
+            yield Static(id="WeeklyRank", classes="message")
+            yield Static(id="ChallengeRank", classes="message")
+            yield Static(id="ResponseTimes", classes="message")
+
             with Center():
                 yield Button("Restart Quiz", id=ButtonId.RESTART)
+                yield Button("Daily Challenge", id=ButtonId.DAILY_CHALLENGE)
+                yield Button("Practice", id=ButtonId.PRACTICE)
                 yield Button("View Scoreboard", id=ButtonId.VIEW_SCOREBOARD)
                 yield Button("Quit Application", id=ButtonId.QUIT)
 
+    def on_mount(self) -> None:
+        self.update_result()
+
+    def show_result(
+        self,
+        score: int,
+        total_questions: int,
+        duration: float,
+        weekly_rank: Optional[int] = None,
+        challenge_rank: Optional[int] = None,
+        response_times: Optional[ResponseTimes] = None,
+    ) -> None:
+        """Replace the result shown with a newly finished game."""
+        self.score = score
+        self.total_questions = total_questions
+        self.duration = duration
+        self.weekly_rank = weekly_rank
+        self.challenge_rank = challenge_rank
+        self.response_times = response_times
+        if self.is_mounted:
+            self.update_result()
+
+    def rank_game(self, game_log: GameLog) -> None:
+        """Look up where a finished game places in a worker thread, so the
+        screen shows without waiting on the scoreboard."""
+        self.ranked_game = game_log
+        self.run_worker(
+            partial(self.load_ranks, game_log), thread=True, group="ranks"
+        )
+
+    def load_ranks(self, game_log: GameLog) -> None:
+        weekly_rank = challenge_rank = None
+        if game_log.challenge_id is None:
+            weekly_rank = LEADERBOARD.rank(LeaderboardWindow.WEEK, game_log)
+        else:
+            # Ranked against every session's games, so they must be stored
+            SCOREBOARD_WRITER.flush()
+            challenge_rank = SCOREBOARD.challenge_rank(game_log)
+
+        self.app.call_from_thread(
+            self.show_ranks, game_log, weekly_rank, challenge_rank
+        )
+
+    def show_ranks(
+        self,
+        game_log: GameLog,
+        weekly_rank: Optional[int],
+        challenge_rank: Optional[int],
+    ) -> None:
+        # Unless another game has finished since
+        if game_log is self.ranked_game:
+            self.weekly_rank = weekly_rank
+            self.challenge_rank = challenge_rank
+            if self.is_mounted:
+                self.update_result()
+
+    def update_result(self) -> None:
+        percentage = 0
+        if self.total_questions > 0:
+            percentage = (self.score / self.total_questions) * 100
+
+        self.query_one("#FinalScore", Static).update(
+            f"You finished the quiz with a final score of {self.score} out of {self.total_questions}"
+            f" ({percentage:.0f}%) in {self.duration:.2f} seconds!"
+        )
+
+        weekly_rank = self.query_one("#WeeklyRank", Static)
+        weekly_rank.display = self.weekly_rank is not None
+        weekly_rank.update(f"You placed #{self.weekly_rank} this week!")
+
+        challenge_rank = self.query_one("#ChallengeRank", Static)
+        challenge_rank.display = self.challenge_rank is not None
+        challenge_rank.update(
+            f"You placed #{self.challenge_rank} in today's challenge!"
+        )
+
+        times = self.response_times
+        response_times = self.query_one("#ResponseTimes", Static)
+        response_times.display = times is not None and len(times.think) > 0
+        if response_times.display:
+            response_times.update(
+                f"This session you answered in {times.think.percentile(0.5) / 1e6:.1f}"
+                f" seconds on the median, {times.think.percentile(0.9) / 1e6:.1f}"
+                f" at the 90th percentile. Answers took "
+                f"{times.handle.percentile(0.5) / 1e3:.1f} ms to show."
+            )
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button clicks."""
         match event.button.id:
             case ButtonId.RESTART:
                 self.action_restart()
+            case ButtonId.DAILY_CHALLENGE:
+                self.action_daily_challenge()
+            case ButtonId.PRACTICE:
+                self.action_practice()
             case ButtonId.VIEW_SCOREBOARD:
                 self.action_view_scoreboard()
             case ButtonId.QUIT:
                 self.action_quit()
 
     def action_restart(self) -> None:
-        """Trigger the main application to restart the quiz."""
-        self.app.action_restart_quiz()
+        """Trigger the main application to restart the quiz, adaptive again
+        if the last game was."""
+        self.app.action_restart_quiz(adaptive=self.app.adaptive)
+
+    def action_daily_challenge(self) -> None:
+        """Play today's challenge, the same questions every player gets."""
+        self.app.action_restart_quiz(daily=True)
+
+    def action_practice(self) -> None:
+        """Play an adaptive game on the terms the player misses most."""
+        self.app.action_restart_quiz(adaptive=True)
 
     def action_quit(self) -> None:
         """Quit the application."""
@@ -76,4 +186,4 @@ class GameOverScreen(Screen):
 
     def action_view_scoreboard(self) -> None:
         """Pushes the scoreboard screen."""
-        self.app.push_screen(ScoreboardScreen())
+        self.app.push_screen("scoreboard")
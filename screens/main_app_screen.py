@@ -1,8 +1,29 @@
+from time import perf_counter_ns
+from typing import Any, Callable, Optional
+
 from textual.app import App
 from textual.screen import Screen
 
-from config import get_css_path
-from screens import GameOverScreen, ResultDetailScreen, ScoreboardScreen, QuizScreen
+import screens
+from config import (
+    CHALLENGES,
+    CSS_CACHE_DIR,
+    METRICS,
+    SCOREBOARD_WRITER,
+    get_css_path,
+    local_player,
+)
+from screens.quiz_screen import QuizScreen
+from screens.stylesheet import SharedStylesheet
+
+
+def lazy_screen(name: str) -> Callable[[], Screen]:
+    """Create a screen, importing its module the first time it is shown"""
+
+    def create() -> Screen:
+        return getattr(screens, name)()
+
+    return create
 
 
 class PresidentQuizApp(App):
@@ -10,19 +31,83 @@ class PresidentQuizApp(App):
 
     TITLE = "Presidential Term Quiz"
     SCREENS = {
-        "details": ResultDetailScreen,
-        "game_over": GameOverScreen,
-        "scoreboard": ScoreboardScreen,
+        "accuracy": lazy_screen("AccuracyScreen"),
+        "details": lazy_screen("ResultDetailScreen"),
+        "game_over": lazy_screen("GameOverScreen"),
+        "scoreboard": lazy_screen("ScoreboardScreen"),
         "quiz": QuizScreen,
     }
     CSS_PATH = get_css_path("app.tcss")
 
+    def __init__(
+        self,
+        *args,
+        daily: bool = False,
+        adaptive: bool = False,
+        player: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        # Start with today's challenge or an adaptive game rather than a
+        # shuffled one. Restarting keeps playing adaptive games.
+        self.daily = daily
+        self.adaptive = adaptive
+        # Who plays this session, the terminal's player unless a server says
+        self.player = local_player() if player is None else player
+        # Parse each stylesheet once, however many apps and processes use it
+        self.stylesheet = SharedStylesheet(
+            variables=self.get_css_variables(), cache_dir=CSS_CACHE_DIR
+        )
+        # When the screen change being timed started
+        self._transition_ns: Optional[int] = None
+
     def on_mount(self) -> None:
         """Called after the app is mounted."""
+        METRICS.count("sessions_started")
         self.theme = "tokyo-night"
+        quiz_screen = self.get_screen("quiz", QuizScreen)
+        if self.daily:
+            quiz_screen.challenge = CHALLENGES.get(quiz_screen.dataset)
+
+        quiz_screen.adaptive = self.adaptive
+        quiz_screen.player = self.player
+
         self.push_screen("quiz")
 
-    def action_restart_quiz(self) -> None:
-        """Restart the quiz from the Game Over Screen."""
+    def action_restart_quiz(self, daily: bool = False, adaptive: bool = False) -> None:
+        """Restart the quiz from the Game Over Screen, reusing the quiz
+        screen rather than composing a new one. A daily game plays today's
+        challenge, an adaptive one the player's weak terms."""
+        self.adaptive = adaptive
         self.pop_screen()
-        self.push_screen(QuizScreen())
+        quiz_screen = self.get_screen("quiz", QuizScreen)
+        challenge = CHALLENGES.get(quiz_screen.dataset) if daily else None
+        quiz_screen.reset(challenge, adaptive)
+        self.push_screen(quiz_screen)
+
+    def push_screen(self, *args, **kwargs) -> Any:
+        self._start_transition()
+        return super().push_screen(*args, **kwargs)
+
+    def pop_screen(self) -> Any:
+        self._start_transition()
+        return super().pop_screen()
+
+    def _start_transition(self) -> None:
+        """Time a screen change until the refresh that shows it. Popping a
+        screen and pushing another is timed as one change."""
+        if self._transition_ns is None:
+            self._transition_ns = perf_counter_ns()
+            self.call_after_refresh(self._end_transition)
+
+    def _end_transition(self) -> None:
+        if self._transition_ns is not None:
+            METRICS.time(
+                "screen_transition", (perf_counter_ns() - self._transition_ns) // 1000
+            )
+            self._transition_ns = None
+
+    def on_unmount(self) -> None:
+        """Make sure every finished game is recorded before exiting."""
+        METRICS.count("sessions_finished")
+        SCOREBOARD_WRITER.flush()
@@ -0,0 +1,115 @@
+import random
+import threading
+from collections import deque
+from typing import Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+from models import AdaptiveSchedule, President, TermTable
+from screens import constants
+from storage import DailyChallenge
+
+
+class Question(NamedTuple):
+    """Everything QuizScreen shows for a question, ready to swap in"""
+
+    row: int
+    president: President
+    choices: List[int]
+    text: str
+    labels: Tuple[str, ...]
+    # Questions still to come after this one
+    remaining: int
+
+
+def build_question(
+    dataset: TermTable, row: int, choices: List[int], remaining: int
+) -> Question:
+    president = dataset[row]
+    text = (
+        f"When was {president.name}, the {president.ordinal} "
+        f"{dataset.title}, in term?"
+    )
+    labels = tuple(
+        f"{letter}. {year}"
+        for (letter, _), year in zip(constants.CHOICE_BUTTONS, choices)
+    )
+    return Question(row, president, choices, text, labels, remaining)
+
+
+def generate_questions(
+    dataset: TermTable, rows: List[int], rng: Optional[random.Random] = None
+) -> Iterator[Question]:
+    """Build the questions for rows, last row first."""
+    rng = random if rng is None else rng
+    for remaining in range(len(rows) - 1, -1, -1):
+        row = rows[remaining]
+        choices = dataset[row].generate_choices(rng=rng)
+        yield build_question(dataset, row, choices, remaining)
+
+
+def adaptive_questions(
+    dataset: TermTable,
+    schedule: AdaptiveSchedule,
+    count: int,
+    rng: Optional[random.Random] = None,
+) -> Iterator[Question]:
+    """count questions on the terms a player's schedule picks, each picked
+    only when it is built so earlier answers weigh in"""
+    rng = random if rng is None else rng
+    for remaining in range(count - 1, -1, -1):
+        row = schedule.next_row(rng)
+        choices = dataset[row].generate_choices(rng=rng)
+        yield build_question(dataset, row, choices, remaining)
+
+
+def challenge_questions(
+    dataset: TermTable, challenge: DailyChallenge
+) -> Iterator[Question]:
+    """The questions of a daily challenge, in its order and with its
+    choices, so every player answers the same game."""
+    for number, row in enumerate(challenge.rows):
+        yield build_question(
+            dataset,
+            row,
+            challenge.question_choices(number),
+            len(challenge) - 1 - number,
+        )
+
+
+class QuestionPrefetcher:
+    """Keeps the next few questions built ahead of time.
+
+    fill() runs in a worker thread while the player reads the feedback, so
+    take() usually only pops a ready question. If the worker hasn't caught
+    up, take() builds the question itself."""
+
+    def __init__(self, questions: Iterator[Question], depth: int = 2) -> None:
+        self.depth = depth
+        self._questions = questions
+        self._ready: Deque[Question] = deque()
+        # The generator can't be advanced by two threads at once
+        self._lock = threading.Lock()
+        self.prefetched_total = 0
+        self.missed_total = 0
+
+    def fill(self) -> None:
+        """Build questions until depth are ready or none are left."""
+        with self._lock:
+            while len(self._ready) < self.depth:
+                question = next(self._questions, None)
+                if question is None:
+                    return
+
+                self._ready.append(question)
+
+    def take(self) -> Optional[Question]:
+        """The next question, or None once they have all been asked"""
+        with self._lock:
+            if self._ready:
+                self.prefetched_total += 1
+                return self._ready.popleft()
+
+            question = next(self._questions, None)
+            if question is not None:
+                self.missed_total += 1
+
+            return question
@@ -1,7 +1,7 @@
 import random
 from datetime import datetime
-from time import time
-from typing import Union
+from time import perf_counter_ns
+from typing import Iterator, Optional
 
 from textual.app import ComposeResult
 from textual.containers import Vertical, Horizontal
@@ -9,11 +9,33 @@ from textual.widgets import Header, Footer, Button, Static
 from textual.screen import Screen
 from textual.message import Message
 
-from config import SCOREBOARD, get_css_path
-from models import GameLog, President, Result
-from models.presidents import ALL_PRESIDENTS
-from screens import GameOverScreen, constants
+from config import (
+    DATASET,
+    METRICS,
+    SCHEDULES,
+    SCOREBOARD_WRITER,
+    get_css_path,
+    local_player,
+)
+from models import (
+    AdaptiveSchedule,
+    GameLog,
+    ResponseTimes,
+    Result,
+    TermTable,
+    get_table,
+    term_index,
+)
+from screens import constants
 from screens.constants import ButtonVariant
+from screens.questions import (
+    Question,
+    QuestionPrefetcher,
+    adaptive_questions,
+    challenge_questions,
+    generate_questions,
+)
+from storage import DailyChallenge
 
 
 class QuizScreen(Screen):
@@ -28,7 +50,13 @@ class QuizScreen(Screen):
         ("g", "game_over", "Give up"),
         ("n", "next_question", "Next question"),
     ]
+    # How many questions are built ahead of the one being answered
+    PREFETCH_DEPTH = 2
+    # Adaptive games may ask a term again, so they end after this many
+    ADAPTIVE_QUESTIONS = 20
+    curr_question: Optional[Question] = None
     curr_president = None
+    curr_row = None
     curr_choices = []
 
     class ChoiceSelected(Message):
@@ -37,12 +65,36 @@ class QuizScreen(Screen):
         def __init__(self, selected_year: int) -> None:
             super().__init__()
             self.selected_year = selected_year
+            # When the key or click came in, which the answer is timed to
+            self.created_ns = perf_counter_ns()
+
+    def __init__(
+        self,
+        dataset: Optional[TermTable] = None,
+        prefetch: bool = True,
+        challenge: Optional[DailyChallenge] = None,
+        adaptive: bool = False,
+        player: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        # The terms the questions are drawn from
+        self.dataset = get_table(DATASET) if dataset is None else dataset
+        self.prefetch = prefetch
+        # The daily challenge being played, or None for a shuffled game
+        self.challenge = challenge
+        # Whether games ask about the player's weak terms, and their schedule
+        self.adaptive = adaptive
+        self.schedule: Optional[AdaptiveSchedule] = None
+        # Who is playing, the games are stored and scheduled as theirs
+        self.player = local_player() if player is None else player
+        # Answer and handling times of every game in this session
+        self.response_times = ResponseTimes()
 
     @property
-    def duration(self) -> int:
-        end_time = time()
-        duration = end_time - self.start_time
-        return int(duration)
+    def duration(self) -> float:
+        """Seconds since the game started, to the millisecond"""
+        return round((perf_counter_ns() - self.start_ns) / 1_000_000_000, 3)
 
     def compose(self) -> ComposeResult:
         """Create the main widgets for the screen."""
@@ -80,89 +132,182 @@ class QuizScreen(Screen):
 
     def on_mount(self) -> None:
         """Called when the screen is mounted."""
-        self.remaining_presidents = list(ALL_PRESIDENTS)
-        random.shuffle(self.remaining_presidents)
+        # Resolve the widgets the handlers update once, not on every key
+        self.question_text = self.query_one("#QuestionText", Static)
+        self.feedback_text = self.query_one("#FeedbackText", Static)
+        self.next_button = self.query_one("#NextButton", Button)
+        self.choices_container = self.query_one("#ChoicesContainer", Horizontal)
+        self.choice_buttons = [
+            self.query_one(f"#choice-{number}", Button)
+            for _, number in constants.CHOICE_BUTTONS
+        ]
+
+        self.reset(self.challenge, self.adaptive)
+
+    def reset(
+        self, challenge: Optional[DailyChallenge] = None, adaptive: bool = False
+    ) -> None:
+        """Start a new game on this screen, reshuffling the questions and
+        clearing the score. A daily challenge asks its own questions, and an
+        adaptive game the terms the player misses most."""
+        self.challenge = challenge
+        self.adaptive = adaptive
+        self.schedule = None
+        if challenge is not None:
+            self.start_game(challenge_questions(self.dataset, challenge))
+        elif adaptive:
+            # Nothing to answer until the player's schedule is read
+            self.start_game(iter(()), show=False)
+            self.question_text.update("Loading your weakest terms...")
+            self.feedback_text.update("")
+            self.choices_container.disabled = True
+            self.next_button.disabled = True
+            self.run_worker(
+                self.load_schedule, thread=True, group="schedule", exclusive=True
+            )
+        else:
+            rows = list(range(len(self.dataset)))
+            random.shuffle(rows)
+            self.start_game(generate_questions(self.dataset, rows))
+
+    def load_schedule(self) -> None:
+        """Read the player's schedule in a worker thread, since the first
+        time it goes through every game they have played."""
+        schedule = SCHEDULES.get(self.player, self.dataset)
+        self.app.call_from_thread(self.start_adaptive_game, schedule)
+
+    def start_adaptive_game(self, schedule: AdaptiveSchedule) -> None:
+        # Unless the game was given up or another started while loading
+        if not self.adaptive or self.schedule is not None or not self.is_current:
+            return
+
+        self.schedule = schedule
+        self.start_game(
+            adaptive_questions(
+                self.dataset,
+                self.schedule,
+                min(self.ADAPTIVE_QUESTIONS, len(self.dataset)),
+            )
+        )
+
+    def start_game(self, questions: Iterator[Question], show: bool = True) -> None:
+        """Clear the score and ask the first of the questions."""
+        self.prefetcher = QuestionPrefetcher(
+            questions,
+            depth=self.PREFETCH_DEPTH if self.prefetch else 0,
+        )
 
         self.score = 0
         self.total_questions_answered = 0
 
         self.question_results = []
-        self.start_time = time()
-
-        self.next_question()
+        # Monotonic, so clock changes can't skew the times
+        self.start_ns = perf_counter_ns()
+        self.shown_ns = self.start_ns
 
-    def get_random_president(self) -> Union[President, None]:
-        """Selects a random president from the list."""
-        next_president = None
-        if self.remaining_presidents:
-            next_president = self.remaining_presidents.pop()
+        self.curr_question = None
+        self.curr_president = None
+        if show:
+            self.next_question()
+            self.prefetch_questions()
 
-        return next_president
+    def prefetch_questions(self) -> None:
+        """Build the next questions in a worker thread."""
+        if self.prefetch:
+            self.run_worker(self.prefetcher.fill, thread=True, group="prefetch")
 
     def next_question(self) -> None:
         """Sets up the next question."""
-        self.curr_president = self.get_random_president()
-        if self.curr_president is None:
+        started_ns = perf_counter_ns()
+        question = self.prefetcher.take()
+        self.curr_question = question
+        if question is None:
+            self.curr_president = None
             self.action_game_over()
             return
 
-        self.curr_choices = self.curr_president.generate_choices()
+        self.curr_row = question.row
+        self.curr_president = question.president
+        self.curr_choices = question.choices
 
-        # Get references to widgets
-        question_text = self.query_one("#QuestionText", Static)
-        feedback_text = self.query_one("#FeedbackText", Static)
-        next_button = self.query_one("#NextButton", Button)
+        with self.app.batch_update():
+            self.question_text.update(question.text)
+            self.feedback_text.update(
+                "Select the correct term year for the President above."
+            )
+            self.next_button.disabled = True
 
-        question_text.update(
-            f"When was {self.curr_president.name}, the {self.curr_president.ordinal} President, in term?"
-        )
-        feedback_text.update("Select the correct term year for the President above.")
-        next_button.disabled = True
+            for button, label in zip(self.choice_buttons, question.labels):
+                button.label = label
+                button.variant = ButtonVariant.PRIMARY
+
+            # Enabling the container restyles the four buttons in one pass
+            self.choices_container.disabled = False
 
-        zipped = zip(constants.CHOICE_BUTTONS, self.curr_choices)
-        for i, param in enumerate(zipped):
-            letter = param[0][0]
-            year = param[1]
+        # The player starts thinking once the question is up
+        self.shown_ns = perf_counter_ns()
+        self.response_times.handle.record((self.shown_ns - started_ns) // 1000)
 
-            button = self.query_one(f"#choice-{i}", Button)
-            button.label = f"{letter}. {year}"
-            button.disabled = False
-            button.variant = ButtonVariant.PRIMARY
+    def in_office_text(self, year: int) -> str:
+        """Who held office in a year the player picked, to set it apart"""
+        names = [
+            self.dataset.names[row] for row in term_index(self.dataset).in_office(year)
+        ]
+        if not names:
+            return f"No {self.dataset.title} was in office in {year}."
+
+        return f"In {year} it was {' and '.join(names)}."
 
     def action_next_question(self) -> None:
         """Action handler to go to next question"""
+        # An adaptive game has no questions until its schedule is read, and
+        # taking one would end it
+        if self.adaptive and self.schedule is None:
+            return
+
         self.next_question()
 
     def action_game_over(self) -> None:
         """Action handler to go to Game Over screen"""
+        # Not needed until the first game ends
+        from screens.game_over_screen import GameOverScreen
+
+        # Read once, so the log and the screen show the same time
+        duration = self.duration
         game_log = GameLog(
             date=datetime.now(),
             score=self.score,
             total_questions=self.total_questions_answered,
-            duration=self.duration,
+            duration=duration,
+            dataset=self.dataset.name,
+            challenge_id=None if self.challenge is None else self.challenge.id,
+            player=self.player,
             results=self.question_results,
         )
-        SCOREBOARD.append(game_log)
+        SCOREBOARD_WRITER.submit(game_log)
+        METRICS.count("games_finished")
 
         self.app.pop_screen()
-        game_over_screen = GameOverScreen(
+        game_over_screen = self.app.get_screen("game_over", GameOverScreen)
+        game_over_screen.show_result(
             score=self.score,
             total_questions=self.total_questions_answered,
-            duration=self.duration,
+            duration=duration,
+            response_times=self.response_times,
         )
         self.app.push_screen(game_over_screen)
+        game_over_screen.rank_game(game_log)
         return
 
     def action_check_choice(self, index: int) -> None:
         """Action handler for key bindings (a, b, c, d)."""
-        button = self.query_one(f"#choice-{index}", Button)
-        if not button.disabled and self.curr_president is not None:
+        if not self.choices_container.disabled and self.curr_president is not None:
             self.post_message(self.ChoiceSelected(self.curr_choices[index]))
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button clicks."""
-        if event.button.id and event.button.id.startswith("choice-"):
-            index = int(event.button.id.split("-")[-1])
+        if event.button in self.choice_buttons:
+            index = self.choice_buttons.index(event.button)
             selected_year = self.curr_choices[index]
             self.post_message(self.ChoiceSelected(selected_year))
 
@@ -180,49 +325,69 @@ class QuizScreen(Screen):
         selected_year = message.selected_year
         is_correct = self.curr_president.within_term(selected_year)
 
-        feedback_text = self.query_one("#FeedbackText", Static)
-        next_button = self.query_one("#NextButton", Button)
-
         # A choice was already made, increment values
-        if next_button.disabled:
+        result = None
+        if self.next_button.disabled:
             self.total_questions_answered += 1
+            METRICS.count("questions_answered")
             if is_correct:
                 self.score += 1
+                METRICS.count("answers_correct")
 
-            self.question_results.append(
-                Result(
-                    president=self.curr_president,
-                    is_correct=is_correct,
-                    selected_year=selected_year,
-                ),
+            result = Result.from_row(
+                self.dataset,
+                self.curr_row,
+                selected_year,
+                think_us=(message.created_ns - self.shown_ns) // 1000,
             )
-
-        # Disable all choice buttons after a selection is made
-        for i in range(4):
-            button = self.query_one(f"#choice-{i}", Button)
-            button.disabled = True
-
-            current_choice = self.curr_choices[i]
-            if current_choice == selected_year:
-                if is_correct:
+            self.question_results.append(result)
+            if self.schedule is not None:
+                self.schedule.record(self.curr_row, is_correct)
+
+            # Build what comes next while the feedback is being read
+            self.prefetch_questions()
+
+        # Repaint once, after every widget has changed
+        with self.app.batch_update():
+            # Disable all choice buttons after a selection is made, with one
+            # restyle of the container rather than one per button
+            self.choices_container.disabled = True
+
+            for button, current_choice in zip(self.choice_buttons, self.curr_choices):
+                if current_choice == selected_year:
+                    if is_correct:
+                        button.variant = ButtonVariant.SUCCESS
+                    else:
+                        button.variant = ButtonVariant.ERROR
+
+                # Highlight the correct answer if the choice was wrong
+                elif not is_correct and self.curr_president.within_term(
+                    current_choice
+                ):
                     button.variant = ButtonVariant.SUCCESS
-                else:
-                    button.variant = ButtonVariant.ERROR
 
-            # Highlight the correct answer if the choice was wrong
-            if not is_correct and self.curr_president.within_term(current_choice):
-                button.variant = ButtonVariant.SUCCESS
+            self.next_button.disabled = False
+            self.next_button.label = "Next President"
+            if not self.curr_question.remaining:
+                self.next_button.label = "Finish Quiz"
 
-        next_button.disabled = False
-        next_button.label = "Next President"
-        if not self.remaining_presidents:
-            next_button.label = "Finish Quiz"
+            msg = f"{self.curr_president.name} was {self.dataset.title} in between {self.curr_president.start} - {self.curr_president.end}"
+            if is_correct:
+                self.feedback_text.update(f"Correct! {msg}.")
+            else:
+                correct_year = self.curr_president.get_correct_year(self.curr_choices)
+                self.feedback_text.update(
+                    f"❌ Wrong! The correct year was {correct_year}. {msg}. "
+                    f"{self.in_office_text(selected_year)}"
+                )
 
-        msg = f"{self.curr_president.name} was President in between {self.curr_president.start} - {self.curr_president.end}"
-        if is_correct:
-            feedback_text.update(f"Correct! {msg}.")
+        # From the key or click to every widget updated
+        handle_us = (perf_counter_ns() - message.created_ns) // 1000
+        METRICS.time("answer_handling", handle_us)
+        if result is None:
+            self.response_times.handle.record(handle_us)
         else:
-            correct_year = self.curr_president.get_correct_year(self.curr_choices)
-            feedback_text.update(
-                f"❌ Wrong! The correct year was {correct_year}. {msg}"
+            result.handle_us = handle_us
+            self.response_times.record_answer(
+                self.dataset.name, self.curr_row, result.think_us, handle_us
             )
@@ -1,19 +1,115 @@
-from typing import Optional
-
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate, islice
+from time import perf_counter_ns
+from typing import Iterator, List, Optional, Tuple
+
+from rich.text import Text
 from textual.app import ComposeResult
-from textual.containers import Horizontal, ScrollableContainer, Vertical
+from textual.containers import Horizontal, Vertical
+from textual.events import Click
+from textual.geometry import Region, Size
 from textual.widgets import Header, Footer, Static, Button
 from textual.screen import Screen
-from textual.widget import Widget
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual.binding import Binding
 
-from config import SCOREBOARD, get_css_path
-from models import GameLog, Result
-from datetime import datetime
+from config import (
+    DATASET,
+    LEADERBOARD,
+    METRICS,
+    SCOREBOARD,
+    SCOREBOARD_PAGE_SIZE,
+    SCOREBOARD_WRITER,
+    get_css_path,
+)
+from models import GameLog, PackedResults, get_table
+from storage import LeaderboardWindow
+from storage.challenge import challenge_id
+from datetime import date, datetime
+
+
+def result_rows(results: PackedResults, start: int = 0) -> Iterator[Tuple[str, ...]]:
+    """The lines describing each answer of a game, from the start-th on"""
+    for number in range(start, len(results)):
+        result = results[number]
+        status = "✅ CORRECT" if result.is_correct else "❌ INCORRECT"
+        if result.think_time is not None:
+            status += f" in {result.think_time:.2f} s"
+
+        lines = (
+            f"  - {number + 1}. {result.president.name}: {status}",
+            f"       President's term: {result.correct_year}",
+        )
+        if not result.is_correct:
+            lines += (f"       Selected {result.selected_year}",)
+
+        yield lines
+
+
+class ResultDetailList(ScrollView, can_focus=True):
+    """The answers of a game, formatting only the rows scrolled into view"""
+
+    MAX_CACHED_ROWS = 512
+
+    def __init__(self, id: Optional[str] = None) -> None:
+        super().__init__(id=id)
+        self.results = PackedResults()
+        # First line of each answer, and one past the last line
+        self.line_starts = array("I", [0])
+        self._rows: OrderedDict[int, Tuple[str, ...]] = OrderedDict()
+
+    def show(self, results: PackedResults) -> None:
+        """Show the answers of another game, from the top."""
+        self.results = results
+        # Wrong answers have a third line for the selected year, known from
+        # the packed results without formatting anything
+        self.line_starts = array(
+            "I", accumulate((3 - (packed & 1) for packed in results.packed), initial=0)
+        )
+        self._rows.clear()
+        self.virtual_size = Size(self.size.width, self.line_starts[-1])
+        self.scroll_home(animate=False, immediate=True)
+        self.refresh()
+
+    def get_row(self, number: int) -> Tuple[str, ...]:
+        """The lines of an answer, formatting a screenful from it if it isn't
+        cached"""
+        row = self._rows.get(number)
+        if row is not None:
+            self._rows.move_to_end(number)
+            return row
+
+        rows = islice(result_rows(self.results, number), max(self.size.height, 1))
+        for offset, lines in enumerate(rows):
+            self._rows[number + offset] = lines
+
+        while len(self._rows) > self.MAX_CACHED_ROWS:
+            self._rows.popitem(last=False)
+
+        return self._rows[number]
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        style = self.rich_style
+        if not 0 <= index < self.line_starts[-1]:
+            return Strip.blank(width, style)
+
+        number = bisect_right(self.line_starts, index) - 1
+        line = self.get_row(number)[index - self.line_starts[number]]
+
+        text = Text(line, style=style)
+        strip = Strip(text.render(self.app.console), text.cell_len)
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
 
 
 class ResultDetailScreen(Screen):
-    """Shows the detailed results of a single quize game"""
+    """Shows the detailed results of a single quize game. The app keeps one
+    and shows each game on it."""
 
     BINDINGS = [
         Binding("escape", "app.pop_screen", "Back to Scoreboard", priority=True)
@@ -23,87 +119,160 @@ class ResultDetailScreen(Screen):
 
     def __init__(
         self,
-        log: GameLog,
+        game_log: Optional[GameLog] = None,
         name: Optional[str] = None,
         id: Optional[str] = None,
         classes: Optional[str] = None,
     ) -> None:
         super().__init__(name, id, classes)
-        self.log = log
+        self._game_log = game_log
 
+    # Not named log, which would hide textual's logger
     @property
-    def log(self) -> GameLog:
-        return self._log
+    def game_log(self) -> Optional[GameLog]:
+        return self._game_log
 
-    @log.setter
-    def log(self, value: GameLog) -> None:
-        self._log = value
+    @game_log.setter
+    def game_log(self, value: GameLog) -> None:
+        self._game_log = value
+        if self.is_mounted:
+            self.update_details()
 
     def compose(self) -> ComposeResult:
         yield Header()
         yield Footer()
 
-        detail_view = Static(id="DetailView")
+        with Vertical(id="GameOverContainer"):
+            yield Static("Detailed Results", classes="title")
+            yield Static(id="DetailSummary")
+            yield ResultDetailList(id="DetailView")
 
-        # Build the content string
-        content = f"Game Summary ({self.log.date.strftime('%Y-%m-%d %H:%M:%S')})\n"
-        content += f"Score: {self.log.score} / {self.log.total_questions}\n"
-        content += (
-            f"Percentage: {(self.log.score / self.log.total_questions) * 100:0.0f}%\n"
+    def on_mount(self) -> None:
+        self.detail_summary = self.query_one("#DetailSummary", Static)
+        self.detail_list = self.query_one(ResultDetailList)
+        if self.game_log is not None:
+            self.update_details()
+
+    def update_details(self) -> None:
+        """Show the summary of the game and scroll its answers to the top."""
+        log = self.game_log
+        percentage = 0.0
+        if log.total_questions:
+            percentage = log.score / log.total_questions * 100
+
+        self.detail_summary.update(
+            f"Game Summary ({log.date.strftime('%Y-%m-%d %H:%M:%S')})\n"
+            f"Score: {log.score} / {log.total_questions}\n"
+            f"Percentage: {percentage:0.0f}%\n"
+            f"Time: {log.duration:.2f} seconds\n\n"
+            "Individual Results:"
         )
-        content += f"Time: {self.log.duration:.1f} seconds\n\n"
-        content += "Individual Results:\n"
-
-        for i, result in enumerate(self.log.results):
-            details = f"       President's term: {result.correct_year}"
-            status = "✅ CORRECT"
-            if not result.is_correct:
-                status = "❌ INCORRECT"
-                details += f"\n       Selected {result.selected_year}"
+        self.detail_list.show(log.results)
+        self.detail_list.focus()
+
+
+class ScoreboardList(ScrollView, can_focus=True):
+    """The ranked games, rendering only the rows in view and fetching them
+    from the scoreboard one page at a time"""
+
+    COMPONENT_CLASSES = {"scoreboard-list--cursor"}
+    MAX_CACHED_PAGES = 8
+
+    def __init__(self, id: Optional[str] = None) -> None:
+        super().__init__(id=id)
+        self.cursor = 0
+        self.row_count = 0
+        self._pages: OrderedDict[int, List[GameLog]] = OrderedDict()
+
+    def reload(self, row_count: int, first_page: List[GameLog]) -> None:
+        """Drop cached pages and size the list to the current scoreboard,
+        loaded off the UI thread."""
+        self._pages.clear()
+        self._pages[0] = first_page
+        self.row_count = row_count
+        self.cursor = min(self.cursor, max(self.row_count - 1, 0))
+        self.virtual_size = Size(self.size.width, self.row_count)
+        self.refresh()
+
+    def get_log(self, index: int) -> Optional[GameLog]:
+        """Get the game at a rank, fetching its page if it isn't cached."""
+        if not 0 <= index < self.row_count:
+            return None
+
+        page_number, row = divmod(index, SCOREBOARD_PAGE_SIZE)
+        page = self._pages.get(page_number)
+        if page is None:
+            started_ns = perf_counter_ns()
+            page = SCOREBOARD.top(
+                SCOREBOARD_PAGE_SIZE, page_number * SCOREBOARD_PAGE_SIZE
+            )
+            METRICS.time("scoreboard_page", (perf_counter_ns() - started_ns) // 1000)
+            self._pages[page_number] = page
+            if len(self._pages) > self.MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+
+        if row >= len(page):
+            return None
+
+        return page[row]
 
-            content += f"  - {i+1}. {result.president.name}: {status}\n{details}\n"
-
-        detail_view.update(content)
-
-        with Vertical(id="GameOverContainer"):
-            yield Static("Detailed Results", classes="title")
-            # yield ScrollableContainer(detail_view)
-            yield detail_view
+    @property
+    def selected_log(self) -> Optional[GameLog]:
+        return self.get_log(self.cursor)
 
+    def move_cursor(self, delta: int) -> None:
+        """Move the cursor, repainting only the rows that changed."""
+        if not self.row_count:
+            return
 
-class ScoreboardEntry(Widget):
-    """A clickable widget to display one game log on the scoreboard"""
+        old_cursor = self.cursor
+        self.cursor = max(0, min(self.row_count - 1, self.cursor + delta))
+        if old_cursor == self.cursor:
+            return
 
-    can_focus: bool = True
+        self._refresh_row(old_cursor)
+        self._refresh_row(self.cursor)
+        self.scroll_to_region(
+            Region(0, self.cursor, 1, 1), animate=False, immediate=True
+        )
 
-    def __init__(self, log: GameLog, index: int) -> None:
-        self.log = log
-        self.index = index
-        super().__init__()
+    def _refresh_row(self, index: int) -> None:
+        self.refresh(Region(0, index - self.scroll_offset.y, self.size.width, 1))
 
-    @property
-    def log(self) -> GameLog:
-        return self._log
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
 
-    @log.setter
-    def log(self, value: GameLog) -> None:
-        self._log = value
+        log = self.get_log(index)
+        if log is None:
+            return Strip.blank(width, self.rich_style)
 
-    def render(self) -> str:
-        date_str = self.log.date.strftime("%Y-%m-%d %H:%M")
-        score_str = f"{self.log.score} / {self.log.total_questions}"
-        time_str = f"{self.log.duration:.1f} seconds"
+        date_str = log.date.strftime("%Y-%m-%d %H:%M")
+        score_str = f"{log.score} / {log.total_questions}"
+        time_str = f"{log.duration:.2f} seconds"
 
         # Determine sorting color (e.g., if this is the highest score)
         color = "white"
-        if 0 == self.index:
+        if 0 == index:
             color = "yellow"
 
-        return f"[b][{color}]{score_str:<10}[/][/b]{date_str:<25}{time_str:<10}  (Press ENTER for details)"
+        text = Text.from_markup(
+            f" [b][{color}]{score_str:<10}[/][/b]{date_str:<25}{time_str:<10}  (Press ENTER for details)"
+        )
+        style = self.rich_style
+        if index == self.cursor:
+            style += self.get_component_rich_style("scoreboard-list--cursor")
+
+        text.stylize(style)
+        strip = Strip(text.render(self.app.console), text.cell_len)
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
 
-    def on_click(self) -> None:
-        """Set focus to this entry when clicked."""
-        self.focus()
+    def on_click(self, event: Click) -> None:
+        """Move the cursor to the clicked game."""
+        self.move_cursor(event.y + self.scroll_offset.y - self.cursor)
 
 
 class ScoreboardScreen(Screen):
@@ -116,6 +285,9 @@ class ScoreboardScreen(Screen):
         Binding("enter", "show_details", "View Details", show=False),
         Binding("up", "move_focus_up", "Move Up", show=False),
         Binding("down", "move_focus_down", "Move Down", show=False),
+        Binding("pageup", "previous_page", "Previous Page"),
+        Binding("pagedown", "next_page", "Next Page"),
+        Binding("a", "view_accuracy", "Accuracy by Term"),
     ]
 
     def compose(self) -> ComposeResult:
@@ -124,60 +296,93 @@ class ScoreboardScreen(Screen):
 
         with Vertical(id="GameOverContainer"):
             yield Static("President Quiz Scoreboard", classes="title")
-            yield Static(id="ScoreboardHeader")
-            yield Vertical(id="ScoreboardList")
+            yield Static(id="LeaderboardSummary")
+            yield Static(
+                "[b] SCORE     DATE & TIME                TIME[/b]",
+                id="ScoreboardHeader",
+            )
+            yield ScoreboardList(id="ScoreboardList")
 
     def on_mount(self) -> None:
-        self.update_scoreboard()
+        self.scoreboard_list = self.query_one(ScoreboardList)
 
-    def update_scoreboard(self) -> None:
-        sorted_scoreboard = sorted(
-            SCOREBOARD,
-            key=lambda log: (log.score, -log.duration),
-            reverse=True,
+    def on_screen_resume(self) -> None:
+        """The app keeps this screen, so refresh it every time it is shown."""
+        self.scoreboard_list.focus()
+        self.run_worker(
+            self.load_scoreboard, thread=True, group="scoreboard", exclusive=True
         )
 
-        # Update header
-        header = self.query_one("#ScoreboardHeader", Static)
-        header.update("[b]SCORE     DATE & TIME                TIME[/b]")
+    def load_scoreboard(self) -> None:
+        """Read the scoreboard in a worker thread, since it waits for the
+        games still being written, then show it."""
+        started_ns = perf_counter_ns()
+        # Games finished moments ago may still be on their way to the store
+        SCOREBOARD_WRITER.flush()
+        row_count = SCOREBOARD.count()
+        first_page = SCOREBOARD.top(SCOREBOARD_PAGE_SIZE)
+
+        # Each best is a few seeks of the window index, like the count and
+        # the first page, so loading doesn't slow down as games pile up
+        summary = []
+        for window, label in (
+            (LeaderboardWindow.TODAY, "Best today"),
+            (LeaderboardWindow.WEEK, "Best this week"),
+        ):
+            best = LEADERBOARD.top(window, get_table(DATASET).name, 1)
+            if best:
+                summary.append(
+                    f"{label}: {best[0].score} correct in {best[0].duration:.2f} seconds"
+                )
+
+        # Challenge games are ranked against each other, not every game
+        challenge = challenge_id(get_table(DATASET).name, date.today())
+        best = SCOREBOARD.challenge_top(challenge, 1)
+        if best:
+            summary.append(
+                f"Today's challenge: {best[0].score} correct in "
+                f"{best[0].duration:.2f} seconds"
+            )
+
+        self.app.call_from_thread(
+            self.show_scoreboard, row_count, first_page, summary, started_ns
+        )
 
-        # Update list
-        list_container = self.query_one("#ScoreboardList", Vertical)
-        list_container.remove_children()
+    def show_scoreboard(
+        self,
+        row_count: int,
+        first_page: List[GameLog],
+        summary: List[str],
+        started_ns: int,
+    ) -> None:
+        self.scoreboard_list.reload(row_count, first_page)
+        self.query_one("#LeaderboardSummary", Static).update("    ".join(summary))
+        METRICS.time("scoreboard_load", (perf_counter_ns() - started_ns) // 1000)
 
-        for i, log in enumerate(sorted_scoreboard):
-            entry = ScoreboardEntry(log=log, index=i)
-            list_container.mount(entry)
+    def action_next_page(self) -> None:
+        """Move down one screen of games."""
+        self.scoreboard_list.move_cursor(self.scoreboard_list.size.height)
 
-        # Focus the first entry
-        if sorted_scoreboard:
-            list_container.children[0].focus()
+    def action_previous_page(self) -> None:
+        """Move up one screen of games."""
+        self.scoreboard_list.move_cursor(-self.scoreboard_list.size.height)
 
     def action_show_details(self) -> None:
-        """Action triggered by ENTER key to show the details of the focused game."""
-        focused_widget = self.focused
-        if isinstance(focused_widget, ScoreboardEntry):
-            self.app.push_screen(ResultDetailScreen(log=focused_widget.log))
+        """Action triggered by ENTER key to show the details of the selected game."""
+        log = self.scoreboard_list.selected_log
+        if log is not None:
+            details = self.app.get_screen("details", ResultDetailScreen)
+            details.game_log = log
+            self.app.push_screen(details)
+
+    def action_view_accuracy(self) -> None:
+        """Show how often each term is answered correctly."""
+        self.app.push_screen("accuracy")
 
     def action_move_focus_up(self) -> None:
-        """Moves focus to the previous ScoreboardEntry in the list."""
-        self._move_focus(-1)
+        """Moves the cursor to the previous game in the list."""
+        self.scoreboard_list.move_cursor(-1)
 
     def action_move_focus_down(self) -> None:
-        """Moves focus to the next ScoreboardEntry in the list."""
-        self._move_focus(1)
-
-    def _move_focus(self, direction: int) -> None:
-        """Helper method to handle focus movement."""
-        entries = self.query(ScoreboardEntry)
-        if not entries:
-            return
-
-        focused_widget = self.focused
-        if focused_widget is None:
-            entries[0].focus()
-            return
-
-        new_index = focused_widget.index + direction
-        if 0 <= new_index < len(entries):
-            entries[new_index].focus()
+        """Moves the cursor to the next game in the list."""
+        self.scoreboard_list.move_cursor(1)
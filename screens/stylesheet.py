@@ -0,0 +1,298 @@
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import textual
+from textual.css.model import RuleSet
+from textual.css.stylesheet import Stylesheet
+from textual.css.types import CSSLocation
+
+log = logging.getLogger(__name__)
+
+# Parsed rules shared by every app running in this process
+_SHARED_RULES: Dict[tuple, List[RuleSet]] = {}
+
+# Cached rules are only read back by the same textual and Python
+CACHE_VERSION = (2, textual.__version__, sys.version_info[:2])
+CACHE_SUFFIX = ".rules"
+# Signs every cache file, readable by its owner alone
+KEY_FILE = "key"
+KEY_SIZE = 32
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+# Cache files this process has read or written
+_USED_CACHE_FILES: Set[Path] = set()
+# Cache directories that couldn't be written, so aren't tried again
+_UNWRITABLE_DIRS: Set[Path] = set()
+# Key of each cache directory, None for those that can't be trusted
+_CACHE_KEYS: Dict[Path, Optional[bytes]] = {}
+
+
+def cache_file(cache_dir: Path, cache_key: tuple) -> Path:
+    """Where the rules for a parse are cached, named by a hash of the CSS
+    and everything else the rules depend on"""
+    digest = hashlib.sha256(repr((CACHE_VERSION, cache_key)).encode("utf-8"))
+    return Path.joinpath(cache_dir, digest.hexdigest() + CACHE_SUFFIX)
+
+
+def is_private(status: os.stat_result) -> bool:
+    """Whether only this user, or root, can change a file or directory"""
+    if not hasattr(os, "getuid"):
+        # No owners or modes to check
+        return True
+
+    return status.st_uid in (os.getuid(), 0) and not status.st_mode & 0o022
+
+
+def read_key(path: Path) -> bytes:
+    """A cache directory's key, if only this user can read and change it"""
+    with open(path, "rb") as file:
+        status = os.fstat(file.fileno())
+        if hasattr(os, "getuid") and (
+            status.st_uid != os.getuid() or status.st_mode & 0o077
+        ):
+            raise PermissionError(f"{path} can be read or changed by others")
+
+        key = file.read()
+
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"{path} isn't a key")
+
+    return key
+
+
+def make_key(cache_dir: Path) -> bytes:
+    """Read a cache directory's key, creating it the first time"""
+    path = Path.joinpath(cache_dir, KEY_FILE)
+    try:
+        return read_key(path)
+    except FileNotFoundError:
+        pass
+
+    partial = path.with_name(f"{path.name}.{os.getpid()}")
+    descriptor = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(os.urandom(KEY_SIZE))
+
+        # Processes starting together all end up with the first key linked
+        os.link(partial, path)
+    except FileExistsError:
+        pass
+    finally:
+        partial.unlink(missing_ok=True)
+
+    return read_key(path)
+
+
+def signing_key(cache_dir: Path) -> Optional[bytes]:
+    """Key that signs the rules cached in a directory, or None when the
+    directory can't be trusted: cached rules are unpickled, so anyone who
+    could write them could run code in the app"""
+    if cache_dir in _CACHE_KEYS:
+        return _CACHE_KEYS[cache_dir]
+
+    key = None
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not is_private(cache_dir.stat()):
+            log.warning(
+                "Not caching stylesheets in %s, other users can change it",
+                cache_dir,
+            )
+        else:
+            key = make_key(cache_dir)
+    except (OSError, ValueError) as error:
+        log.warning("Not caching stylesheets in %s: %s", cache_dir, error)
+
+    _CACHE_KEYS[cache_dir] = key
+    return key
+
+
+def sign(key: bytes, payload: bytes) -> bytes:
+    return hmac.new(key, payload, hashlib.sha256).digest()
+
+
+def read_rules(path: Path, key: bytes) -> Optional[List[RuleSet]]:
+    """Rules cached by an earlier process, if there are any, and only if they
+    are signed with the directory's key"""
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        log.warning("Ignoring unreadable stylesheet cache %s", path)
+        return None
+
+    digest, payload = data[:DIGEST_SIZE], data[DIGEST_SIZE:]
+    if not hmac.compare_digest(digest, sign(key, payload)):
+        log.warning("Ignoring unsigned stylesheet cache %s", path)
+        return None
+
+    try:
+        rules = pickle.loads(payload)
+    except Exception:
+        log.warning("Ignoring unreadable stylesheet cache %s", path)
+        return None
+
+    _USED_CACHE_FILES.add(path)
+    return rules
+
+
+def write_rules(path: Path, rules: List[RuleSet], key: bytes) -> None:
+    """Cache parsed rules for later processes, signed with the directory's
+    key"""
+    if path.parent in _UNWRITABLE_DIRS:
+        return
+
+    payload = pickle.dumps(rules, protocol=pickle.HIGHEST_PROTOCOL)
+    partial = path.with_name(f"{path.name}.{os.getpid()}")
+    try:
+        with open(partial, "wb") as file:
+            file.write(sign(key, payload))
+            file.write(payload)
+
+        # Readers never see a half written cache file
+        os.replace(partial, path)
+    except OSError:
+        log.warning("Couldn't cache stylesheet rules in %s", path.parent)
+        _UNWRITABLE_DIRS.add(path.parent)
+        return
+
+    _USED_CACHE_FILES.add(path)
+
+
+def prune_cache(cache_dir: Path, keep: Iterable[Path]) -> int:
+    """Delete cached rules other than those to keep, returning how many were
+    deleted"""
+    # Leave a directory that isn't ours alone
+    if signing_key(cache_dir) is None:
+        return 0
+
+    keep = set(keep)
+    deleted = 0
+    for path in cache_dir.glob(f"*{CACHE_SUFFIX}"):
+        if path not in keep:
+            path.unlink(missing_ok=True)
+            deleted += 1
+
+    return deleted
+
+
+def used_cache_files() -> Set[Path]:
+    return set(_USED_CACHE_FILES)
+
+
+class SharedStylesheet(Stylesheet):
+    """A stylesheet that parses each CSS source once per process, no matter
+    how many apps are running.
+
+    With a cache directory, the parsed rules are also saved to disk, so later
+    processes load them rather than parsing the same CSS again."""
+
+    def __init__(
+        self,
+        *,
+        variables: Optional[Dict[str, str]] = None,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        super().__init__(variables=variables)
+        self.cache_dir = cache_dir
+        self._variables_key: Optional[Tuple[Tuple[str, str], ...]] = None
+
+    @property
+    def variables_key(self) -> Tuple[Tuple[str, str], ...]:
+        """The CSS variables in a hashable form"""
+        if self._variables_key is None:
+            self._variables_key = tuple(sorted(self._variables.items()))
+
+        return self._variables_key
+
+    def set_variables(self, variables: Dict[str, str]) -> None:
+        super().set_variables(variables)
+        self._variables_key = None
+
+    def copy(self) -> "SharedStylesheet":
+        stylesheet = SharedStylesheet(
+            variables=self._variables.copy(), cache_dir=self.cache_dir
+        )
+        stylesheet.source = self.source.copy()
+        return stylesheet
+
+    def _parse_rules(
+        self,
+        css: str,
+        read_from: CSSLocation,
+        is_default_rules: bool = False,
+        tie_breaker: int = 0,
+        scope: str = "",
+    ) -> List[RuleSet]:
+        """Parse the CSS, reusing the rules if any app already parsed it,
+        in this process or, through the cache, in an earlier one"""
+        cache_key = (
+            css,
+            read_from,
+            is_default_rules,
+            tie_breaker,
+            scope,
+            self.variables_key,
+        )
+        rules = _SHARED_RULES.get(cache_key)
+        if rules is not None:
+            return rules
+
+        path = key = None
+        if self.cache_dir is not None:
+            key = signing_key(self.cache_dir)
+
+        if key is not None:
+            path = cache_file(self.cache_dir, cache_key)
+            rules = read_rules(path, key)
+
+        if rules is None:
+            rules = super()._parse_rules(
+                css,
+                read_from,
+                is_default_rules=is_default_rules,
+                tie_breaker=tie_breaker,
+                scope=scope,
+            )
+            if path is not None:
+                write_rules(path, rules, key)
+
+        _SHARED_RULES[cache_key] = rules
+
+        return rules
+
+    def reparse(self) -> None:
+        """Re-parse the source with the current variables, going through the
+        shared rules"""
+        # Parse into a fresh stylesheet so errors don't break this one
+        stylesheet = SharedStylesheet(
+            variables=self._variables, cache_dir=self.cache_dir
+        )
+        for read_from, (css, is_defaults, tie_breaker, scope) in self.source.items():
+            stylesheet.add_source(
+                css,
+                read_from=read_from,
+                is_default_css=is_defaults,
+                tie_breaker=tie_breaker,
+                scope=scope,
+            )
+
+        try:
+            stylesheet.parse()
+        except Exception:
+            self._invalid_css.update(stylesheet._invalid_css)
+            raise
+
+        self._rules = stylesheet.rules
+        self._rules_map = None
+        self.source = stylesheet.source
+        self._require_parse = False
@@ -1,4 +1,45 @@
-from textual_serve.server import Server
+import argparse
+from pathlib import Path
+
+from serving import MetricsServer, WarmPoolServer
+
+parser = argparse.ArgumentParser(description="Serve the President Term Quiz")
+parser.add_argument(
+    "--warm-pool",
+    type=int,
+    default=0,
+    metavar="SIZE",
+    help="Keep SIZE pre-imported app workers ready for new connections",
+)
+parser.add_argument(
+    "--metrics",
+    type=Path,
+    nargs="?",
+    const=Path("metrics"),
+    metavar="DIR",
+    help="Serve every session's counters and timings at /metrics to this "
+    "machine, gathered in DIR (./metrics by default)",
+)
+parser.add_argument("--host", default="localhost")
+parser.add_argument("--port", type=int, default=8000)
+args = parser.parse_args()
+
+if args.warm_pool > 0:
+    server = WarmPoolServer(
+        "python -m app",
+        pool_size=args.warm_pool,
+        host=args.host,
+        port=args.port,
+        title="President Term Quiz",
+        metrics_dir=args.metrics,
+    )
+else:
+    server = MetricsServer(
+        "python -m app",
+        host=args.host,
+        port=args.port,
+        title="President Term Quiz",
+        metrics_dir=args.metrics,
+    )
 
-server = Server("python -m app", title="President Term Quiz")
 server.serve()
@@ -0,0 +1,12 @@
+from .metrics import MetricsServer
+from .multi_session import MultiSessionServer
+from .warm_pool import PoolMetrics, WarmPoolServer, WarmWorkerPool
+
+
+__all__ = [
+    "MetricsServer",
+    "MultiSessionServer",
+    "PoolMetrics",
+    "WarmPoolServer",
+    "WarmWorkerPool",
+]
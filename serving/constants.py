@@ -0,0 +1 @@
+WARM_PRELUDE = b"__WARM__\n"
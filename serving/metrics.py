@@ -0,0 +1,192 @@
+import asyncio
+import ipaddress
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from textual_serve.app_service import AppService
+from textual_serve.server import Server, to_int
+
+from config import METRICS, METRICS_DIR_VARIABLE
+from models.timing import BUCKET_BOUNDS
+from serving.players import PlayerAppService, player_middleware
+from storage import ProcessMetrics, collect_metrics
+
+log = logging.getLogger("textual-serve")
+
+PREFIX = "president_quiz"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER_HELP = {
+    "sessions_started": "Game sessions started",
+    "sessions_finished": "Game sessions that ended",
+    "games_finished": "Games played to the game over screen",
+    "questions_answered": "Questions answered",
+    "answers_correct": "Questions answered correctly",
+}
+HISTOGRAM_HELP = {
+    "answer_handling": "Time from a key or click to the answer being shown",
+    "screen_transition": "Time from changing screens to the next refresh",
+    "scoreboard_load": "Time to load the scoreboard screen",
+    "scoreboard_page": "Time to fetch a page of the scoreboard",
+}
+
+
+def render_metrics(totals: ProcessMetrics, live: List[ProcessMetrics]) -> str:
+    """The metrics in the Prometheus text exposition format"""
+    lines = []
+    for name, count in totals.counters.items():
+        metric = f"{PREFIX}_{name}_total"
+        lines.append(f"# HELP {metric} {COUNTER_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {count}")
+
+    gauges = (
+        ("sessions_active", "Game sessions running now",
+         sum(metrics.sessions_active for metrics in live)),
+        ("processes", "Processes writing metrics", len(live)),
+        ("resident_memory_bytes", "Resident memory of those processes",
+         sum(metrics.rss_bytes for metrics in live)),
+    )
+    for name, help, value in gauges:
+        metric = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+
+    lines.extend(render_values(totals, live))
+
+    for name, histogram in totals.histograms.items():
+        metric = f"{PREFIX}_{name}_seconds"
+        lines.append(f"# HELP {metric} {HISTOGRAM_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS, histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound / 1e6:g}"}} {cumulative}')
+
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+        lines.append(f"{metric}_sum {histogram.total_us / 1e6:.6f}")
+        lines.append(f"{metric}_count {histogram.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def render_values(totals: ProcessMetrics, live: List[ProcessMetrics]) -> List[str]:
+    """The values of the processes' sources: counters added up across every
+    process, gauges across the running ones, maximums and averages as such"""
+    lines = []
+    for name, value in sorted(totals.values.items()):
+        metric = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {totals.help.get(name, name)}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value:g}")
+
+    gauges: Dict[str, List[float]] = {}
+    for metrics in live:
+        for name, value in metrics.values.items():
+            if not name.endswith("_total"):
+                gauges.setdefault(name, []).append(value)
+
+    for name, values in sorted(gauges.items()):
+        if name.endswith("_max"):
+            value = max(values)
+        elif name.endswith("_avg"):
+            value = sum(values) / len(values)
+        else:
+            value = sum(values)
+
+        metric = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {totals.help.get(name, name)}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value:g}")
+
+    return lines
+
+
+def is_local(request: web.Request) -> bool:
+    try:
+        return ipaddress.ip_address(request.remote or "").is_loopback
+    except ValueError:
+        # A unix socket
+        return True
+
+
+class MetricsServer(Server):
+    """Serve the quiz with its metrics at /metrics, added up from every
+    process hosting a session. The game processes write them to the metrics
+    directory, which is handed down to them in the environment, as is the
+    player each browser names."""
+
+    def __init__(
+        self, command: str, metrics_dir: Optional[Path] = None, **kwargs
+    ) -> None:
+        super().__init__(command, **kwargs)
+        self.metrics_dir = metrics_dir
+        if metrics_dir is not None:
+            os.environ[METRICS_DIR_VARIABLE] = str(metrics_dir)
+            # Sessions hosted in this process record here too
+            METRICS.directory = metrics_dir
+
+    async def _make_app(self) -> web.Application:
+        app = await super()._make_app()
+        app.middlewares.append(player_middleware)
+        if self.metrics_dir is not None:
+            app.add_routes([web.get("/metrics", self.handle_metrics, name="metrics")])
+
+        return app
+
+    def create_app_service(
+        self, websocket: web.WebSocketResponse, player: str
+    ) -> AppService:
+        """The service running a session's app, as the player"""
+        return PlayerAppService(
+            self.command,
+            player=player,
+            write_bytes=websocket.send_bytes,
+            write_str=websocket.send_str,
+            close=websocket.close,
+            download_manager=self.download_manager,
+            debug=self.debug,
+        )
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle the websocket with an app playing as the request's player."""
+        websocket = web.WebSocketResponse(heartbeat=15)
+
+        width = to_int(request.query.get("width", "80"), 80)
+        height = to_int(request.query.get("height", "24"), 24)
+
+        app_service: Optional[AppService] = None
+        try:
+            await websocket.prepare(request)
+            app_service = self.create_app_service(websocket, request["player"])
+            await app_service.start(width, height)
+            await self._process_messages(websocket, app_service)
+
+        except asyncio.CancelledError:
+            await websocket.close()
+
+        except Exception as error:
+            log.exception(error)
+
+        finally:
+            if app_service is not None:
+                await app_service.stop()
+
+        return websocket
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Serve the metrics, to this machine only."""
+        if not is_local(request):
+            raise web.HTTPForbidden()
+
+        assert self.metrics_dir is not None
+        # Reading the files would hold up the sessions on this loop
+        totals, live = await asyncio.to_thread(collect_metrics, self.metrics_dir)
+        return web.Response(
+            body=render_metrics(totals, live).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import socket
+from functools import partial
+from typing import List, Optional, Set
+
+from aiohttp import WSMsgType, web
+from textual import events, messages
+from textual._xterm_parser import XTermParser
+from textual.driver import Driver
+from textual.geometry import Size
+from textual_serve.server import to_int
+
+from screens.main_app_screen import PresidentQuizApp
+from serving.metrics import MetricsServer
+
+log = logging.getLogger("textual-serve")
+
+
+class SessionDriver(Driver):
+    """Driver that renders an app straight into its browser session instead
+    of a subprocess' stdout"""
+
+    def __init__(self, app, *, session: "Session", **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self._session = session
+
+    @property
+    def is_web(self) -> bool:
+        return True
+
+    def write(self, data: str) -> None:
+        """Queue terminal output for the browser."""
+        self._session.send(data.encode("utf-8"))
+
+    def start_application_mode(self) -> None:
+        """Start application mode."""
+        self.write("\x1b[?1049h")  # Alt screen
+        self.write("\x1b[?1000h\x1b[?1003h\x1b[?1015h\x1b[?1006h")  # Mouse
+        self.write("\x1b[?25l")  # Hide cursor
+        self.write("\x1b[?2004h")  # Bracketed paste
+
+        size = Size(80, 24) if self._size is None else Size(*self._size)
+        self._app.post_message(events.Resize(size, size))
+
+    def disable_input(self) -> None:
+        """Disable further input."""
+        self._session.input_enabled = False
+
+    def stop_application_mode(self) -> None:
+        """Stop application mode, restore state."""
+        self.write("\x1b[?1000l\x1b[?1003l\x1b[?1015l\x1b[?1006l")
+        self.write("\x1b[?2004l")
+        self.write("\x1b[?1049l")
+
+
+class Session:
+    """One browser connection and the app instance it drives"""
+
+    def __init__(
+        self, websocket: web.WebSocketResponse, width: int, height: int, player: str
+    ):
+        self.websocket = websocket
+        self.input_enabled = True
+        self.app = PresidentQuizApp(
+            driver_class=partial(SessionDriver, session=self), player=player
+        )
+        self._size = (width, height)
+        self._parser = XTermParser()
+        self._pending: List[bytes] = []
+        self._flush_task: Optional[asyncio.Task[None]] = None
+
+    def send(self, data: bytes) -> None:
+        """Buffer output and send everything written in this loop iteration
+        as one websocket frame"""
+        self._pending.append(data)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """Send the buffered output."""
+        await asyncio.sleep(0)
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._flush_task = None
+        if self.websocket.closed:
+            return
+
+        try:
+            await self.websocket.send_bytes(data)
+        except ConnectionResetError:
+            pass
+
+    def feed_input(self, data: str) -> None:
+        """Turn browser keystrokes into app events."""
+        if not self.input_enabled:
+            return
+
+        driver = self.app._driver
+        if driver is None:
+            return
+
+        for event in self._parser.feed(data):
+            driver.process_message(event)
+
+        for event in self._parser.tick():
+            driver.process_message(event)
+
+    def resize(self, width: int, height: int) -> None:
+        """Tell the app about the new browser terminal size."""
+        size = Size(width, height)
+        self.app.post_message(events.Resize(size, size))
+
+    async def run(self) -> None:
+        """Run the app until it exits or the browser goes away."""
+        app_task = asyncio.create_task(
+            self.app.run_async(size=self._size), name="quiz-session"
+        )
+        message_task = asyncio.create_task(self._process_messages())
+        try:
+            await asyncio.wait(
+                [app_task, message_task], return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            if not app_task.done():
+                self.app.post_message(messages.ExitApp())
+                await app_task
+
+            message_task.cancel()
+            if self._flush_task is not None:
+                await self._flush_task
+
+    async def _process_messages(self) -> None:
+        """Process messages from the client browser websocket."""
+        async for message in self.websocket:
+            if message.type != WSMsgType.TEXT:
+                continue
+
+            envelope = message.json()
+            match envelope[0]:
+                case "stdin":
+                    self.feed_input(envelope[1])
+                case "resize":
+                    self.resize(envelope[1]["width"], envelope[1]["height"])
+                case "ping":
+                    await self.websocket.send_json(["pong", envelope[1]])
+                case "blur":
+                    self.app.post_message(events.AppBlur())
+                case "focus":
+                    self.app.post_message(events.AppFocus())
+
+
+class MultiSessionServer(MetricsServer):
+    """Serve every player from one event loop per worker process, sharing the
+    president data and parsed stylesheets between sessions"""
+
+    def __init__(self, workers: int = 1, **kwargs) -> None:
+        super().__init__("multi-session", **kwargs)
+        self.workers = workers
+        self.sessions: Set[Session] = set()
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle the websocket with an in-process app session."""
+        websocket = web.WebSocketResponse(heartbeat=15)
+
+        width = to_int(request.query.get("width", "80"), 80)
+        height = to_int(request.query.get("height", "24"), 24)
+
+        session: Optional[Session] = None
+        try:
+            await websocket.prepare(request)
+            session = Session(websocket, width, height, request["player"])
+            self.sessions.add(session)
+            await session.run()
+
+        except asyncio.CancelledError:
+            pass
+
+        except Exception as error:
+            log.exception(error)
+
+        finally:
+            if session is not None:
+                self.sessions.discard(session)
+
+            await websocket.close()
+
+        return websocket
+
+    async def on_startup(self, app: web.Application) -> None:
+        """Called on startup."""
+        await super().on_startup(app)
+        self.console.print(f"Worker {os.getpid()} hosting sessions in-process")
+
+    def serve(self, debug: bool = False) -> None:
+        """Serve from one process per worker, all sharing the same port."""
+        if self.workers <= 1:
+            super().serve(debug=debug)
+            return
+
+        # Bind before forking so every worker accepts on the same socket
+        sock = socket.create_server((self.host, self.port), reuse_port=True)
+        sock.set_inheritable(True)
+
+        children = []
+        for _ in range(self.workers):
+            pid = os.fork()
+            if 0 == pid:
+                self._serve_socket(sock, debug)
+                os._exit(0)
+
+            children.append(pid)
+
+        sock.close()
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except KeyboardInterrupt:
+                pass
+
+    def _serve_socket(self, sock: socket.socket, debug: bool) -> None:
+        """Run one worker on an already bound socket."""
+        self.debug = debug
+        self.initialize_logging()
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        web.run_app(
+            self._make_app(),
+            sock=sock,
+            handle_signals=True,
+            loop=loop,
+            print=lambda *args: None,
+        )
@@ -0,0 +1,67 @@
+"""Who is playing each browser session.
+
+The page can name the player, as in /?player=ada, and the name is kept in a
+cookie so the websocket that follows, and later visits, play as them. A
+browser that never names one is given a random name, so its games still
+belong to one player.
+"""
+
+import secrets
+from typing import Awaitable, Callable
+
+from aiohttp import web
+from textual_serve.app_service import AppService
+
+from config import PLAYER_VARIABLE
+
+PLAYER_COOKIE = "president_quiz_player"
+MAX_NAME_LENGTH = 64
+# A year, renewed on every visit
+COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def player_name(value: str) -> str:
+    """A name given by the browser, trimmed to something worth storing"""
+    return value.strip()[:MAX_NAME_LENGTH]
+
+
+@web.middleware
+async def player_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Put the request's player in request["player"], remembering it in a
+    cookie"""
+    player = player_name(request.query.get("player", ""))
+    if not player:
+        player = player_name(request.cookies.get(PLAYER_COOKIE, ""))
+
+    if not player:
+        player = f"guest-{secrets.token_hex(6)}"
+
+    request["player"] = player
+    response = await handler(request)
+    # A websocket's headers were sent when it was opened
+    if not isinstance(response, web.WebSocketResponse):
+        response.set_cookie(
+            PLAYER_COOKIE,
+            player,
+            max_age=COOKIE_MAX_AGE,
+            httponly=True,
+            samesite="Lax",
+        )
+
+    return response
+
+
+class PlayerAppService(AppService):
+    """App service whose process plays as the session's player"""
+
+    def __init__(self, command: str, *, player: str, **kwargs) -> None:
+        super().__init__(command, **kwargs)
+        self.player = player
+
+    def _build_environment(self, width: int = 80, height: int = 24) -> dict[str, str]:
+        environment = super()._build_environment(width, height)
+        environment[PLAYER_VARIABLE] = self.player
+        return environment
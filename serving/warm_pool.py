@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from asyncio.subprocess import Process
+from collections import deque
+from dataclasses import dataclass, field
+from importlib.metadata import version
+from statistics import mean
+from time import perf_counter
+from typing import ClassVar, Deque, Dict, Optional, Set
+
+from aiohttp import web
+from textual_serve.app_service import AppService
+
+from config import METRICS
+from serving.constants import WARM_PRELUDE
+from serving.metrics import MetricsServer
+from serving.players import PlayerAppService
+
+log = logging.getLogger("textual-serve")
+
+WORKER_MODULE = "serving.warm_worker"
+
+
+def build_worker_environment(debug: bool = False) -> Dict[str, str]:
+    """Build the environment for a worker, matching what textual-serve gives
+    the processes it starts itself"""
+    environment = dict(os.environ)
+    environment["TEXTUAL_DRIVER"] = "textual.drivers.web_driver:WebDriver"
+    environment["TEXTUAL_FPS"] = "60"
+    environment["TEXTUAL_COLOR_SYSTEM"] = "truecolor"
+    environment["TERM_PROGRAM"] = "textual"
+    environment["TERM_PROGRAM_VERSION"] = version("textual-serve")
+    if debug:
+        environment["TEXTUAL"] = "debug,devtools"
+        environment["TEXTUAL_LOG"] = "textual.log"
+
+    return environment
+
+
+@dataclass
+class PoolMetrics:
+    """Counters describing the warm worker pool"""
+
+    # What each value of the snapshot measures
+    HELP: ClassVar[Dict[str, str]] = {
+        "target_size": "Idle workers the pool keeps ready",
+        "idle_workers": "Workers ready for a connection",
+        "spawning_workers": "Workers starting up",
+        "spawned_total": "Workers started",
+        "spawn_failures_total": "Workers that failed to start",
+        "acquired_total": "Connections given a worker",
+        "hits_total": "Connections that found a worker ready",
+        "waited_total": "Connections that waited for a worker",
+        "spawn_seconds_avg": "Mean time to start a worker, of recent ones",
+        "spawn_seconds_max": "Longest recent worker start",
+        "wait_seconds_avg": "Mean wait for a worker, of recent connections",
+        "wait_seconds_max": "Longest recent wait for a worker",
+    }
+
+    target_size: int
+    idle_workers: int = 0
+    spawning_workers: int = 0
+    spawned_total: int = 0
+    spawn_failures_total: int = 0
+    acquired_total: int = 0
+    waited_total: int = 0
+    spawn_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    wait_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the counters and recent timings"""
+        return {
+            "target_size": self.target_size,
+            "idle_workers": self.idle_workers,
+            "spawning_workers": self.spawning_workers,
+            "spawned_total": self.spawned_total,
+            "spawn_failures_total": self.spawn_failures_total,
+            "acquired_total": self.acquired_total,
+            # Connections that found a warm worker, and those that waited
+            "hits_total": self.acquired_total - self.waited_total,
+            "waited_total": self.waited_total,
+            "spawn_seconds_avg": mean(self.spawn_seconds) if self.spawn_seconds else 0.0,
+            "spawn_seconds_max": max(self.spawn_seconds, default=0.0),
+            "wait_seconds_avg": mean(self.wait_seconds) if self.wait_seconds else 0.0,
+            "wait_seconds_max": max(self.wait_seconds, default=0.0),
+        }
+
+
+class WarmWorkerPool:
+    """Keeps a number of idle, already imported app workers ready so a new
+    connection never pays for interpreter start up and imports"""
+
+    def __init__(self, size: int, debug: bool = False) -> None:
+        if size < 1:
+            raise ValueError("The warm pool needs at least one worker")
+
+        self.size = size
+        self.debug = debug
+        self.metrics = PoolMetrics(target_size=size)
+        self._idle: asyncio.Queue[Process] = asyncio.Queue()
+        self._spawn_tasks: Set[asyncio.Task[None]] = set()
+        self._closed = False
+
+    async def start(self) -> None:
+        """Fill the pool and wait until every worker is warm."""
+        self._refill()
+        await asyncio.gather(*self._spawn_tasks, return_exceptions=True)
+
+    async def acquire(self) -> Process:
+        """Take a warm worker out of the pool, waiting for one to be spawned
+        if the pool has been drained."""
+        start_time = perf_counter()
+        waited = self._idle.empty()
+        while True:
+            if self._idle.empty():
+                # Make sure a worker is on the way before waiting for it
+                self._refill(minimum=1)
+
+            process = await self._idle.get()
+            self.metrics.idle_workers = self._idle.qsize()
+            if process.returncode is None:
+                break
+
+        self.metrics.acquired_total += 1
+        if waited:
+            self.metrics.waited_total += 1
+
+        self.metrics.wait_seconds.append(perf_counter() - start_time)
+        self._refill()
+        return process
+
+    async def close(self) -> None:
+        """Stop spawning and shut down every idle worker."""
+        self._closed = True
+        for task in self._spawn_tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._spawn_tasks, return_exceptions=True)
+
+        while not self._idle.empty():
+            process = self._idle.get_nowait()
+            if process.returncode is None:
+                # Closing stdin tells the worker it will never be used
+                assert process.stdin is not None
+                process.stdin.close()
+                await process.wait()
+
+        self.metrics.idle_workers = 0
+
+    def _refill(self, minimum: int = 0) -> None:
+        """Spawn workers in the background until the pool is back to size."""
+        if self._closed:
+            return
+
+        missing = self.size - self._idle.qsize() - len(self._spawn_tasks)
+        for _ in range(max(missing, minimum - len(self._spawn_tasks))):
+            task = asyncio.create_task(self._spawn())
+            self._spawn_tasks.add(task)
+            task.add_done_callback(self._on_spawn_done)
+
+        self.metrics.spawning_workers = len(self._spawn_tasks)
+
+    def _on_spawn_done(self, task: "asyncio.Task[None]") -> None:
+        """Forget a finished spawn task."""
+        self._spawn_tasks.discard(task)
+        self.metrics.spawning_workers = len(self._spawn_tasks)
+
+    async def _spawn(self) -> None:
+        """Start one worker and put it in the pool once its imports are done."""
+        start_time = perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            WORKER_MODULE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=build_worker_environment(self.debug),
+        )
+
+        assert process.stdout is not None
+        try:
+            prelude = await process.stdout.readline()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if prelude != WARM_PRELUDE:
+            self.metrics.spawn_failures_total += 1
+            log.error("Warm worker failed to start")
+            if process.returncode is None:
+                process.kill()
+
+            await process.wait()
+            return
+
+        self.metrics.spawned_total += 1
+        self.metrics.spawn_seconds.append(perf_counter() - start_time)
+        self._idle.put_nowait(process)
+        self.metrics.idle_workers = self._idle.qsize()
+
+
+class WarmAppService(PlayerAppService):
+    """App service that takes its process from the warm pool instead of
+    starting a new one."""
+
+    def __init__(self, command: str, *, pool: WarmWorkerPool, **kwargs) -> None:
+        super().__init__(command, **kwargs)
+        self._pool = pool
+
+    async def _open_app_process(self, width: int = 80, height: int = 24) -> Process:
+        """Hand a warm worker the connection's terminal size and player to
+        start it."""
+        self._process = process = await self._pool.acquire()
+        assert process.stdin is not None
+        self._stdin = process.stdin
+
+        start = json.dumps(
+            {"width": width, "height": height, "player": self.player}
+        ).encode("utf-8")
+        process.stdin.write(start + b"\n")
+        await process.stdin.drain()
+
+        return process
+
+
+class WarmPoolServer(MetricsServer):
+    """Serve the quiz from a pool of pre-imported workers."""
+
+    def __init__(self, command: str, pool_size: int, **kwargs) -> None:
+        super().__init__(command, **kwargs)
+        self.pool_size = pool_size
+        self.pool: Optional[WarmWorkerPool] = None
+
+    async def on_startup(self, app: web.Application) -> None:
+        """Fill the pool before accepting connections."""
+        self.pool = WarmWorkerPool(self.pool_size, debug=self.debug)
+        if self.metrics_dir is not None:
+            # Pool hits, misses and spawn times go to /metrics with the games'
+            METRICS.add_source(
+                "warm_pool", self.pool.metrics.snapshot, self.pool.metrics.HELP
+            )
+            METRICS.enable(self.metrics_dir)
+
+        await self.pool.start()
+        await super().on_startup(app)
+        self.console.print(f"Warm pool ready with {self.pool_size} workers")
+
+    def create_app_service(
+        self, websocket: web.WebSocketResponse, player: str
+    ) -> AppService:
+        """The service handing a worker from the warm pool the session"""
+        assert self.pool is not None
+        return WarmAppService(
+            self.command,
+            pool=self.pool,
+            player=player,
+            write_bytes=websocket.send_bytes,
+            write_str=websocket.send_str,
+            close=websocket.close,
+            download_manager=self.download_manager,
+            debug=self.debug,
+        )
+
+    async def on_shutdown(self, app: web.Application) -> None:
+        """Shut the idle workers down and report the pool metrics."""
+        if self.pool is not None:
+            await self.pool.close()
+            log.info("Warm pool metrics: %s", self.pool.metrics.snapshot())
+
+        await super().on_shutdown(app)
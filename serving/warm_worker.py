@@ -0,0 +1,55 @@
+"""Pre-imported app worker handed out by the warm pool server.
+
+The worker imports the app, the screens and the president data up front,
+announces itself as warm and then idles until the server hands it a
+connection by writing a single JSON start line to stdin, with the terminal
+size and the player.
+"""
+
+import json
+import os
+import sys
+
+from models.presidents import all_presidents
+from screens import load_screens
+from screens.main_app_screen import PresidentQuizApp
+from serving.constants import WARM_PRELUDE
+
+
+def read_start_line() -> dict:
+    """Read the start line one byte at a time so no input is buffered away
+    from the driver's input reader"""
+    line = bytearray()
+    while True:
+        byte = os.read(sys.stdin.fileno(), 1)
+        if not byte:
+            return {}
+
+        if byte == b"\n":
+            break
+
+        line += byte
+
+    return json.loads(line)
+
+
+def main() -> None:
+    # The app defers these until first use, a warm worker has time to spare
+    load_screens()
+    all_presidents()
+    os.write(sys.stdout.fileno(), WARM_PRELUDE)
+
+    start = read_start_line()
+    if not start:
+        # The pool closed before handing this worker a connection
+        return
+
+    os.environ["COLUMNS"] = str(start.get("width", 80))
+    os.environ["ROWS"] = str(start.get("height", 24))
+
+    app = PresidentQuizApp(player=start.get("player"))
+    app.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from .engine import SimulationResult, simulate, simulate_many
+from .players import (
+    PLAYERS,
+    NoisyMemoryPlayer,
+    Player,
+    RandomPlayer,
+    RangeAwarePlayer,
+)
+from .questions import QuestionBatch, question_batch
+
+
+__all__ = [
+    "NoisyMemoryPlayer",
+    "PLAYERS",
+    "Player",
+    "QuestionBatch",
+    "RandomPlayer",
+    "RangeAwarePlayer",
+    "SimulationResult",
+    "question_batch",
+    "simulate",
+    "simulate_many",
+]
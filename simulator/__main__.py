@@ -0,0 +1,117 @@
+"""Simulate games to tune how hard the questions are.
+
+    python -m simulator --games 100000 --player noisy --sigma 8 --window 10 25 50
+
+Prints the mean score and how far apart the easiest and hardest terms are
+for each distractor window, and how many games a second were played.
+Totals written with --output read like a scoreboard's, with
+`python analytics.py show --file`.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+from config import DATASET
+from models import get_table
+from models.presidents import DISTRACTOR_WINDOW
+from simulator.engine import CHUNK_GAMES, SimulationResult, simulate_many
+from simulator.players import PLAYERS, NoisyMemoryPlayer, RangeAwarePlayer
+from simulator.questions import np
+
+
+def print_result(result: SimulationResult, window: int, wall_seconds: float, workers: int) -> None:
+    terms = result.stats.rows(result.table.name)
+    accuracies = [term.accuracy for term in terms]
+    print(
+        f"window {window:>3}: mean score {result.mean_score:.2f}/{len(result.table)}"
+        f"  accuracy {result.accuracy:.1%}"
+        f"  terms {min(accuracies):.1%} to {max(accuracies):.1%}"
+        f" (stdev {statistics.pstdev(accuracies):.1%})"
+    )
+    print(
+        f"            {result.games / wall_seconds:,.0f} games/s"
+        f"  {result.games / wall_seconds / workers:,.0f} games/s per core"
+        f"  {result.games / result.cpu_seconds:,.0f} games per CPU second"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator",
+        description="Simulate games to tune how hard the questions are",
+    )
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--player", choices=sorted(PLAYERS), default="noisy")
+    parser.add_argument(
+        "--sigma", type=float, default=5.0, help="Years a noisy player misremembers by"
+    )
+    parser.add_argument(
+        "--slack", type=int, default=10, help="Years a range player is unsure by"
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        nargs="+",
+        default=[DISTRACTOR_WINDOW],
+        help="Years either side of a term the distractors come from, "
+        "one run for each",
+    )
+    parser.add_argument("--distractors", type=int, default=3)
+    parser.add_argument("--dataset", help="Dataset to play, the game's by default")
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes, one per core by default"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--chunk", type=int, default=CHUNK_GAMES, help="Games each worker plays at once"
+    )
+    parser.add_argument(
+        "--output", help="Write the answer totals as JSON, one file per window"
+    )
+    args = parser.parse_args()
+
+    table = get_table(args.dataset or DATASET)
+    if args.player == NoisyMemoryPlayer.name:
+        player = NoisyMemoryPlayer(args.sigma)
+    elif args.player == RangeAwarePlayer.name:
+        player = RangeAwarePlayer(args.slack)
+    else:
+        player = PLAYERS[args.player]()
+
+    workers = args.workers or os.cpu_count() or 1
+    print(
+        f"{args.games:,} games of {table.title} by {player!r} on {workers} "
+        f"worker(s), {'numpy' if np is not None else 'without numpy'}"
+    )
+
+    for window in args.window:
+        started = time.perf_counter()
+        result = simulate_many(
+            table,
+            player,
+            args.games,
+            window,
+            args.distractors,
+            args.seed,
+            workers,
+            args.chunk,
+        )
+        print_result(result, window, time.perf_counter() - started, workers)
+
+        if args.output:
+            output = Path(args.output)
+            if len(args.window) > 1:
+                output = output.with_name(f"{output.stem}-{window}{output.suffix}")
+
+            # Imported here, since it reads the scoreboard's settings
+            from analytics import write_stats
+
+            write_stats(result.stats, str(output))
+            print(f"            totals written to {output}")
+
+
+if "__main__" == __name__:
+    main()
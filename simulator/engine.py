@@ -0,0 +1,186 @@
+"""Plays games without the app, to see how hard a dataset and distractor
+window are for players of a given skill.
+
+Games are played in chunks, each seeded from the run's seed and the
+chunk's number, so a run gives the same totals however many workers share
+it. Every chunk returns the totals a scoreboard would keep of its games,
+and the chunks' totals add up to the run's.
+"""
+
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+from models import PackedResults, TermTable
+from models.presidents import DISTRACTOR_WINDOW
+from models.results import pack_result
+from simulator.players import Player
+from simulator.questions import QuestionBatch, np, question_batch
+from storage.analytics import COUNT_FIELDS, DISTANCE_BUCKETS, AccuracyStats
+
+# Games per chunk, which bounds each worker's memory
+CHUNK_GAMES = 1000
+
+
+class SimulationResult:
+    """Totals of simulated games: their scores and the answer totals of
+    every term, as AccuracyStats so they read like recorded games"""
+
+    def __init__(self, table: TermTable) -> None:
+        self.table = table
+        self.games = 0
+        self.questions = 0
+        self.correct = 0
+        # Number of games with each score
+        self.score_counts = [0] * (len(table) + 1)
+        self.stats = AccuracyStats()
+        self.cpu_seconds = 0.0
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.questions if self.questions else 0.0
+
+    @property
+    def mean_score(self) -> float:
+        return self.correct / self.games if self.games else 0.0
+
+    def merge(self, other: "SimulationResult") -> None:
+        self.games += other.games
+        self.questions += other.questions
+        self.correct += other.correct
+        for score, count in enumerate(other.score_counts):
+            self.score_counts[score] += count
+
+        self.stats.merge(other.stats)
+        self.cpu_seconds += other.cpu_seconds
+
+
+def chunk_rng(seed: int, index: int):
+    """The generator of one chunk, the same whichever worker plays it"""
+    if np is not None:
+        return np.random.default_rng([seed, index])
+
+    return random.Random(f"{seed}:{index}")
+
+
+def record_numpy(
+    result: SimulationResult, batch: QuestionBatch, picks: "np.ndarray"
+) -> None:
+    """Add a batch's answers to the totals a column at a time"""
+    count = len(batch.table)
+    questions = len(batch)
+    index = np.arange(questions)
+    years = batch.choices[index, picks]
+    right = picks == batch.correct
+    distance = np.maximum(np.maximum(batch.starts - years, years - batch.ends), 0)
+    bucket = np.searchsorted(DISTANCE_BUCKETS, distance)
+
+    counts = np.zeros((count, COUNT_FIELDS), dtype=np.int64)
+    counts[:, 0] = np.bincount(batch.rows, minlength=count)
+    counts[:, 1] = np.bincount(batch.rows, weights=right, minlength=count)
+    counts[:, 2] = np.bincount(batch.rows, weights=distance, minlength=count)
+    wrong = batch.rows[~right]
+    bucket_counts = np.bincount(
+        wrong * (len(DISTANCE_BUCKETS) + 1) + bucket[~right],
+        minlength=count * (len(DISTANCE_BUCKETS) + 1),
+    )
+    counts[:, 3:] = bucket_counts.reshape(count, -1)
+
+    name = batch.table.name
+    for row in np.flatnonzero(counts[:, 0]):
+        result.stats.add(name, int(row), counts[row].tolist())
+
+    scores = right.reshape(batch.games, -1).sum(axis=1)
+    for score, games in enumerate(np.bincount(scores, minlength=count + 1)):
+        result.score_counts[score] += int(games)
+
+    result.correct += int(right.sum())
+
+
+def record_python(result: SimulationResult, batch: QuestionBatch, picks: array) -> None:
+    """Add a batch's answers to the totals, packed as a game's results are"""
+    packed = array("I")
+    per_game = batch.questions_per_game
+    score = 0
+    for number, (row, choices, pick, correct) in enumerate(
+        zip(batch.rows, batch.choices, picks, batch.correct), 1
+    ):
+        packed.append(pack_result(row, choices[pick], pick == correct))
+        score += pick == correct
+        if number % per_game == 0:
+            result.score_counts[score] += 1
+            result.correct += score
+            score = 0
+
+    result.stats.record_results(PackedResults(packed, batch.table.name), batch.table)
+
+
+def simulate(
+    table: TermTable,
+    player: Player,
+    games: int,
+    window: int = DISTRACTOR_WINDOW,
+    distractors: int = 3,
+    seed: int = 0,
+    chunk: int = 0,
+) -> SimulationResult:
+    """Play `games` games as one chunk of a run"""
+    started = time.process_time()
+    rng = chunk_rng(seed, chunk)
+    batch = question_batch(table, games, rng, window, distractors)
+    picks = player.choose(batch, rng)
+
+    result = SimulationResult(table)
+    result.games = games
+    result.questions = len(batch)
+    if np is not None:
+        record_numpy(result, batch, picks)
+    else:
+        record_python(result, batch, picks)
+
+    result.cpu_seconds = time.process_time() - started
+    return result
+
+
+def chunk_sizes(games: int, chunk_games: int) -> Iterator[int]:
+    while games > 0:
+        yield min(games, chunk_games)
+        games -= chunk_games
+
+
+def simulate_many(
+    table: TermTable,
+    player: Player,
+    games: int,
+    window: int = DISTRACTOR_WINDOW,
+    distractors: int = 3,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_games: int = CHUNK_GAMES,
+) -> SimulationResult:
+    """Play `games` games in chunks across a pool of worker processes and
+    merge their totals. One worker plays them all in this process."""
+    workers = workers or os.cpu_count() or 1
+    sizes = list(chunk_sizes(games, chunk_games))
+    result = SimulationResult(table)
+    arguments = [
+        (table, player, size, window, distractors, seed, index)
+        for index, size in enumerate(sizes)
+    ]
+
+    if workers == 1 or len(sizes) == 1:
+        for chunk_arguments in arguments:
+            result.merge(simulate(*chunk_arguments))
+        return result
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        chunks: List[SimulationResult] = list(pool.map(simulate, *zip(*arguments)))
+
+    # Merged in chunk order, so the totals don't depend on which finished first
+    for chunk_result in chunks:
+        result.merge(chunk_result)
+
+    return result
@@ -0,0 +1,129 @@
+import random
+from array import array
+from typing import Dict, Type
+
+from simulator.questions import QuestionBatch, np
+
+
+class Player:
+    """Picks one choice for every question of a batch, returning the index
+    of each pick. Players remember nothing between questions."""
+
+    name = "player"
+
+    def choose(self, batch: QuestionBatch, rng) -> "array | np.ndarray":
+        if np is not None:
+            return self.choose_numpy(batch, rng)
+
+        return array(
+            "b",
+            (
+                self.choose_one(start, end, choices, rng)
+                for start, end, choices in zip(batch.starts, batch.ends, batch.choices)
+            ),
+        )
+
+    def choose_one(
+        self, start: int, end: int, choices: list, rng: random.Random
+    ) -> int:
+        raise NotImplementedError
+
+    def choose_numpy(self, batch: QuestionBatch, rng) -> "np.ndarray":
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class RandomPlayer(Player):
+    """Guesses"""
+
+    name = "random"
+
+    def choose_one(
+        self, start: int, end: int, choices: list, rng: random.Random
+    ) -> int:
+        return int(rng.random() * len(choices))
+
+    def choose_numpy(self, batch: QuestionBatch, rng) -> "np.ndarray":
+        return rng.integers(0, batch.choices.shape[1], len(batch))
+
+
+class RangeAwarePlayer(Player):
+    """Knows roughly when each term was, to within `slack` years, and
+    guesses among the choices that fit"""
+
+    name = "range"
+
+    def __init__(self, slack: int = 10) -> None:
+        self.slack = slack
+
+    def choose_one(
+        self, start: int, end: int, choices: list, rng: random.Random
+    ) -> int:
+        low = start - self.slack
+        high = end + self.slack
+        plausible = [
+            index for index, year in enumerate(choices) if low <= year <= high
+        ]
+        return plausible[int(rng.random() * len(plausible))]
+
+    def choose_numpy(self, batch: QuestionBatch, rng) -> "np.ndarray":
+        choices = batch.choices
+        plausible = (choices >= (batch.starts - self.slack)[:, None]) & (
+            choices <= (batch.ends + self.slack)[:, None]
+        )
+        # The highest random key among the plausible choices wins
+        keys = np.where(plausible, rng.random(choices.shape), -1.0)
+        return keys.argmax(axis=1)
+
+    def __repr__(self) -> str:
+        return f"{self.name}(slack={self.slack})"
+
+
+class NoisyMemoryPlayer(Player):
+    """Remembers each term's start and end give or take a normally
+    distributed `sigma` years, and picks the choice closest to that"""
+
+    name = "noisy"
+
+    def __init__(self, sigma: float = 5.0) -> None:
+        self.sigma = sigma
+
+    def choose_one(
+        self, start: int, end: int, choices: list, rng: random.Random
+    ) -> int:
+        low = start + rng.gauss(0, self.sigma)
+        high = end + rng.gauss(0, self.sigma)
+        if low > high:
+            low, high = high, low
+
+        # A random tie breaker so equally close choices are picked evenly
+        return min(
+            range(len(choices)),
+            key=lambda index: (
+                max(low - choices[index], choices[index] - high, 0),
+                rng.random(),
+            ),
+        )
+
+    def choose_numpy(self, batch: QuestionBatch, rng) -> "np.ndarray":
+        questions = len(batch)
+        first = batch.starts + rng.normal(0, self.sigma, questions)
+        second = batch.ends + rng.normal(0, self.sigma, questions)
+        low = np.minimum(first, second)[:, None]
+        high = np.maximum(first, second)[:, None]
+
+        choices = batch.choices
+        distance = np.maximum(np.maximum(low - choices, choices - high), 0)
+        # Choices are whole years apart, so the tie breaker can't reorder them
+        distance += rng.random(choices.shape) * 1e-6
+        return distance.argmin(axis=1)
+
+    def __repr__(self) -> str:
+        return f"{self.name}(sigma={self.sigma})"
+
+
+PLAYERS: Dict[str, Type[Player]] = {
+    player.name: player for player in (RandomPlayer, RangeAwarePlayer, NoisyMemoryPlayer)
+}
@@ -0,0 +1,131 @@
+import random
+from array import array
+from typing import List, Union
+
+from models import TermTable
+from models.presidents import DISTRACTOR_WINDOW, term_choices
+
+try:
+    import numpy as np
+except ImportError:
+    # Batches are built one question at a time instead, with the same odds
+    np = None
+
+
+class QuestionBatch:
+    """Every question of a run of games as columns: the row asked about,
+    its term and the choices offered, with the index of the right one.
+
+    With numpy the columns are arrays and choices is a questions by choices
+    matrix. Without it they are arrays and a list of lists."""
+
+    def __init__(
+        self,
+        table: TermTable,
+        games: int,
+        rows,
+        starts,
+        ends,
+        choices,
+        correct,
+    ) -> None:
+        self.table = table
+        self.games = games
+        self.rows = rows
+        self.starts = starts
+        self.ends = ends
+        self.choices = choices
+        self.correct = correct
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def questions_per_game(self) -> int:
+        return len(self.table)
+
+
+def python_batch(
+    table: TermTable,
+    games: int,
+    rng: random.Random,
+    window: int = DISTRACTOR_WINDOW,
+    distractors: int = 3,
+) -> QuestionBatch:
+    """Questions for games that each ask every row once, in a random order"""
+    rows = array("i")
+    choices: List[List[int]] = []
+    correct = array("b")
+    order = list(range(len(table)))
+    for _ in range(games):
+        rng.shuffle(order)
+        for row in order:
+            start = table.starts[row]
+            end = table.ends[row]
+            options = term_choices(start, end, distractors, window, rng)
+            rows.append(row)
+            choices.append(options)
+            correct.append(
+                next(index for index, year in enumerate(options) if start <= year <= end)
+            )
+
+    starts = array("i", (table.starts[row] for row in rows))
+    ends = array("i", (table.ends[row] for row in rows))
+    return QuestionBatch(table, games, rows, starts, ends, choices, correct)
+
+
+def numpy_batch(
+    table: TermTable,
+    games: int,
+    rng: "np.random.Generator",
+    window: int = DISTRACTOR_WINDOW,
+    distractors: int = 3,
+) -> QuestionBatch:
+    """python_batch a column at a time, with term_choices' sampling"""
+    if distractors > 2 * window:
+        raise ValueError(f"Can't pick {distractors} distinct years from {2 * window}")
+
+    count = len(table)
+    rows = rng.permuted(np.tile(np.arange(count), (games, 1)), axis=1).ravel()
+    starts = np.frombuffer(table.starts, dtype=np.int32).astype(np.int64)[rows]
+    ends = np.frombuffer(table.ends, dtype=np.int32).astype(np.int64)[rows]
+    questions = len(rows)
+
+    # Floyd's algorithm over every question at once, one column per draw
+    span = 2 * window
+    offsets = np.empty((questions, distractors), dtype=np.int64)
+    for column, limit in enumerate(range(span - distractors, span)):
+        draw = (rng.random(questions) * (limit + 1)).astype(np.int64)
+        taken = (offsets[:, :column] == draw[:, None]).any(axis=1)
+        offsets[:, column] = np.where(taken, limit, draw)
+
+    choices = np.empty((questions, distractors + 1), dtype=np.int64)
+    choices[:, :distractors] = np.where(
+        offsets < window,
+        starts[:, None] - window + offsets,
+        ends[:, None] + 1 + offsets - window,
+    )
+
+    # Put the year within the term in a random place
+    within = starts + (rng.random(questions) * (ends - starts + 1)).astype(np.int64)
+    correct = rng.integers(0, distractors + 1, questions)
+    index = np.arange(questions)
+    choices[:, distractors] = choices[index, correct]
+    choices[index, correct] = within
+
+    return QuestionBatch(table, games, rows, starts, ends, choices, correct)
+
+
+def question_batch(
+    table: TermTable,
+    games: int,
+    rng: Union[random.Random, "np.random.Generator"],
+    window: int = DISTRACTOR_WINDOW,
+    distractors: int = 3,
+) -> QuestionBatch:
+    """Questions for games that each ask every row once, built with numpy
+    when it is installed"""
+    if np is not None:
+        return numpy_batch(table, games, rng, window, distractors)
+
+    return python_batch(table, games, rng, window, distractors)
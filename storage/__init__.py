@@ -0,0 +1,42 @@
+from .analytics import AccuracyStats, TermStats
+from .base import ScoreboardStore, rank_key
+from .challenge import ChallengeCache, DailyChallenge
+from .leaderboard import Leaderboard, LeaderboardWindow
+from .memory import InMemoryScoreboardStore
+from .metrics import MetricsRecorder, ProcessMetrics, collect_metrics
+from .schedules import ScheduleCache
+from .sqlite import SQLiteScoreboardStore
+from .term_files import load_dataset, load_table
+from .writer import GameLogWriter, WriterMetrics
+
+
+def create_scoreboard_store(location: str) -> ScoreboardStore:
+    """Create the scoreboard backend for a location, either ":memory:" or the
+    path to an SQLite database"""
+    if ":memory:" == location:
+        return InMemoryScoreboardStore()
+
+    return SQLiteScoreboardStore(location)
+
+
+__all__ = [
+    "AccuracyStats",
+    "ChallengeCache",
+    "DailyChallenge",
+    "GameLogWriter",
+    "InMemoryScoreboardStore",
+    "Leaderboard",
+    "LeaderboardWindow",
+    "MetricsRecorder",
+    "ProcessMetrics",
+    "SQLiteScoreboardStore",
+    "ScheduleCache",
+    "ScoreboardStore",
+    "TermStats",
+    "collect_metrics",
+    "create_scoreboard_store",
+    "load_dataset",
+    "load_table",
+    "rank_key",
+    "WriterMetrics",
+]
@@ -0,0 +1,170 @@
+"""Answer accuracy per term, kept as running totals.
+
+Every recorded game adds to the totals of the terms it asked about: how
+often each was answered, how often correctly, and how many years off the
+wrong answers were. Totals from different processes or nodes add together,
+so reading them costs one row per term however many games were played.
+
+Run `python analytics.py --help` to show, export and merge them.
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from models import GameLog, PackedResults, TermTable, TermTableError, get_table
+from models.results import INDEX_SHIFT, YEAR_MASK, YEAR_SHIFT
+
+log = logging.getLogger(__name__)
+
+# Upper bound of each bucket of years a wrong answer was off by. The last
+# bucket holds anything further out.
+DISTANCE_BUCKETS = (1, 2, 5, 10, 25)
+DISTANCE_LABELS = ("1", "2", "3-5", "6-10", "11-25", "26+")
+
+# answered, correct and the total distance, then one count per bucket
+COUNT_FIELDS = 3 + len(DISTANCE_BUCKETS) + 1
+
+
+def error_distance(start: int, end: int, year: int) -> int:
+    """Years between a selected year and the nearest year of the term"""
+    if year < start:
+        return start - year
+
+    return max(year - end, 0)
+
+
+def distance_bucket(distance: int) -> int:
+    return bisect_left(DISTANCE_BUCKETS, distance)
+
+
+class TermStats(NamedTuple):
+    """Totals for one term of a dataset"""
+
+    row: int
+    answered: int
+    correct: int
+    distance_total: int
+    distances: Tuple[int, ...]
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.answered if self.answered else 0.0
+
+    @property
+    def mean_distance(self) -> float:
+        """Mean years off across the wrong answers"""
+        wrong = self.answered - self.correct
+        return self.distance_total / wrong if wrong else 0.0
+
+
+class AccuracyStats:
+    """Totals per term of every dataset, added to game by game and merged
+    with the totals of other processes"""
+
+    def __init__(self) -> None:
+        # (dataset, row) to the COUNT_FIELDS counts
+        self.counts: Dict[Tuple[str, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _counts(self, dataset: str, row: int) -> List[int]:
+        counts = self.counts.get((dataset, row))
+        if counts is None:
+            counts = self.counts[(dataset, row)] = [0] * COUNT_FIELDS
+
+        return counts
+
+    def record_results(self, results: PackedResults, table: TermTable) -> None:
+        """Add the answers of a game, straight from the packed results"""
+        starts = table.starts
+        ends = table.ends
+        for packed in results.packed:
+            row = packed >> INDEX_SHIFT
+            counts = self._counts(table.name, row)
+            counts[0] += 1
+            if packed & 1:
+                counts[1] += 1
+                continue
+
+            year = (packed >> YEAR_SHIFT) & YEAR_MASK
+            distance = error_distance(starts[row], ends[row], year)
+            counts[2] += distance
+            counts[3 + distance_bucket(distance)] += 1
+
+    def record(self, game_log: GameLog) -> None:
+        self.record_results(game_log.results, get_table(game_log.dataset))
+
+    def record_many(self, game_logs: Iterable[GameLog]) -> None:
+        for game_log in game_logs:
+            self.record(game_log)
+
+    def add(self, dataset: str, row: int, other_counts: Iterable[int]) -> None:
+        """Add COUNT_FIELDS counts counted elsewhere to a term's totals"""
+        counts = self._counts(dataset, row)
+        for index, count in enumerate(other_counts):
+            counts[index] += count
+
+    def merge(self, other: "AccuracyStats") -> None:
+        """Add another set of totals to these"""
+        for (dataset, row), other_counts in other.counts.items():
+            self.add(dataset, row, other_counts)
+
+    def rows(self, dataset: str) -> List[TermStats]:
+        """Totals of every answered term of a dataset, in row order"""
+        return sorted(
+            TermStats(row, counts[0], counts[1], counts[2], tuple(counts[3:]))
+            for (name, row), counts in self.counts.items()
+            if name == dataset
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        datasets: Dict[str, Dict[str, List[int]]] = {}
+        for (dataset, row), counts in self.counts.items():
+            datasets.setdefault(dataset, {})[str(row)] = counts
+
+        return {"buckets": list(DISTANCE_BUCKETS), "datasets": datasets}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AccuracyStats":
+        if list(DISTANCE_BUCKETS) != data.get("buckets"):
+            raise ValueError(
+                f"Totals use the distance buckets {data.get('buckets')}, "
+                f"not {list(DISTANCE_BUCKETS)}"
+            )
+
+        stats = cls()
+        for dataset, rows in data["datasets"].items():
+            for row, counts in rows.items():
+                if COUNT_FIELDS != len(counts):
+                    raise ValueError(
+                        f"{dataset} row {row}: expected {COUNT_FIELDS} counts"
+                    )
+
+                stats.counts[(dataset, int(row))] = [int(count) for count in counts]
+
+        return stats
+
+
+def stats_from_results(
+    games: Iterable[Tuple[PackedResults, str]],
+) -> AccuracyStats:
+    """Totals of games given as their results and dataset name, skipping
+    datasets that can no longer be loaded"""
+    stats = AccuracyStats()
+    missing = set()
+    for results, dataset in games:
+        if dataset in missing:
+            continue
+
+        try:
+            table = get_table(dataset)
+        except (OSError, TermTableError):
+            log.warning("Skipping games of dataset %s, it can't be loaded", dataset)
+            missing.add(dataset)
+            continue
+
+        stats.record_results(results, table)
+
+    return stats
@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models import GameLog, PackedResults
+from storage.analytics import AccuracyStats, stats_from_results
+
+
+def rank_key(log: GameLog) -> Tuple:
+    """Order game logs best first: highest score, then fastest, then oldest"""
+    return (-log.score, log.duration, log.date)
+
+
+def in_window(log: GameLog, dataset: str, first_day: Optional[date]) -> bool:
+    """Whether a game counts towards a leaderboard window: a shuffled game
+    of the dataset, finished on the window's first day or later"""
+    return (
+        log.challenge_id is None
+        and dataset == log.dataset
+        and (first_day is None or log.date.date() >= first_day)
+    )
+
+
+def window_days(first_day: date) -> List[date]:
+    """The days of a window, from its first day to today"""
+    return [
+        first_day + timedelta(days=offset)
+        for offset in range((date.today() - first_day).days + 1)
+    ]
+
+
+class ScoreboardStore(ABC):
+    """Where finished games are recorded and ranked. The queries have
+    defaults that page through every game with top(); the stores answer
+    them from indexes of their own."""
+
+    @abstractmethod
+    def add(self, log: GameLog) -> None:
+        """Record a finished game"""
+
+    def add_many(self, logs: Iterable[GameLog]) -> None:
+        """Record several finished games at once"""
+        for log in logs:
+            self.add(log)
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of recorded games"""
+
+    @abstractmethod
+    def top(self, limit: int, offset: int = 0) -> List[GameLog]:
+        """Get one page of the ranked games, best first"""
+
+    def challenge_top(
+        self, challenge_id: str, limit: int, offset: int = 0
+    ) -> List[GameLog]:
+        """Get one page of the ranked games of a daily challenge, best first"""
+        games = []
+        page_size = 1000
+        page_offset = 0
+        while len(games) < offset + limit and (
+            page := self.top(page_size, page_offset)
+        ):
+            games.extend(log for log in page if challenge_id == log.challenge_id)
+            page_offset += page_size
+
+        return games[offset : offset + limit]
+
+    def challenge_rank(self, log: GameLog) -> int:
+        """1 based placing of a game within its daily challenge, ties going
+        to the earlier game"""
+        key = rank_key(log)
+        ahead = 0
+        page_size = 1000
+        offset = 0
+        while page := self.top(page_size, offset):
+            for other in page:
+                if rank_key(other) >= key:
+                    return ahead + 1
+
+                ahead += log.challenge_id == other.challenge_id
+
+            offset += page_size
+
+        return ahead + 1
+
+    def player_results(self, player: str, dataset: str) -> Iterator[PackedResults]:
+        """The results of every game a player played on a dataset, oldest
+        first"""
+        games = []
+        page_size = 1000
+        offset = 0
+        while page := self.top(page_size, offset):
+            games.extend(
+                (log.date, log.results)
+                for log in page
+                if player == log.player and dataset == log.dataset
+            )
+            offset += page_size
+
+        games.sort(key=lambda game: game[0])
+        for _, results in games:
+            yield results
+
+    def window_top(
+        self, dataset: str, first_day: Optional[date], limit: int
+    ) -> List[GameLog]:
+        """The best shuffled games of a dataset finished from a day to today,
+        or of all time"""
+        games = []
+        page_size = 1000
+        offset = 0
+        while len(games) < limit and (page := self.top(page_size, offset)):
+            games.extend(log for log in page if in_window(log, dataset, first_day))
+            offset += page_size
+
+        return games[:limit]
+
+    def window_rank(self, log: GameLog, first_day: Optional[date]) -> int:
+        """1 based placing of a game among the shuffled games of its dataset
+        finished from a day to today, ties going to the earlier game"""
+        key = rank_key(log)
+        ahead = 0
+        page_size = 1000
+        offset = 0
+        while page := self.top(page_size, offset):
+            for other in page:
+                if rank_key(other) >= key:
+                    return ahead + 1
+
+                ahead += in_window(other, log.dataset, first_day)
+
+            offset += page_size
+
+        return ahead + 1
+
+    def accuracy_stats(self, dataset: Optional[str] = None) -> AccuracyStats:
+        """Answer totals per term, of one dataset or of all of them. Stores
+        that keep running totals read them rather than every game."""
+        page_size = 1000
+        offset = 0
+        games = []
+        while page := self.top(page_size, offset):
+            games.extend(
+                (log.results, log.dataset)
+                for log in page
+                if dataset is None or dataset == log.dataset
+            )
+            offset += page_size
+
+        return stats_from_results(games)
+
+    def rebuild_accuracy_stats(self) -> AccuracyStats:
+        """Recount the answer totals from every recorded game"""
+        return self.accuracy_stats()
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
@@ -0,0 +1,235 @@
+"""Daily challenges: the same questions for every player of a day.
+
+A challenge's seed comes from its day and dataset, so every process would
+build the same questions. Only the first one does: it writes the challenge
+to the cache directory, and every session maps that file rather than
+reading it, so they all share the one copy the OS keeps in memory.
+
+Layout, all integers little endian:
+
+    header   b"PTGC", version (u8), choices per question (u8), two bytes of
+             padding, question count (u32)
+    rows     the row asked by each question (i32 each)
+    choices  the years offered by each question (i32 each)
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from models import TermTable
+from models.presidents import term_choices
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"PTGC"
+VERSION = 1
+# Padded so the columns that follow are aligned for reading in place
+HEADER = struct.Struct("<4sBBxxI")
+CHOICES = 4
+# Challenge files left behind by earlier days are deleted after this long
+KEEP_FILES = timedelta(days=7)
+
+
+class ChallengeFormatError(ValueError):
+    """The data is not a challenge this version can read"""
+
+
+def challenge_id(dataset: str, day: date) -> str:
+    """Name of the challenge of a dataset on a day, shared by every game of
+    it on the scoreboard"""
+    return f"{dataset}@{day.isoformat()}"
+
+
+def challenge_key(table: TermTable, day: date) -> str:
+    """Hash naming a challenge's cache file. It covers the terms too, so an
+    edited dataset never gets stale questions."""
+    digest = hashlib.sha256(f"{VERSION}\0{challenge_id(table.name, day)}".encode())
+    digest.update("\0".join(table.names).encode())
+    digest.update(table.starts.tobytes())
+    digest.update(table.ends.tobytes())
+    return digest.hexdigest()
+
+
+class DailyChallenge:
+    """The rows a challenge asks, in order, and the choices of each. The
+    columns are arrays, or views of a mapped challenge file."""
+
+    def __init__(self, id: str, rows: Sequence[int], choices: Sequence[int]) -> None:
+        if CHOICES * len(rows) != len(choices):
+            raise ChallengeFormatError(
+                f"{len(rows)} questions need {CHOICES * len(rows)} choices, "
+                f"not {len(choices)}"
+            )
+
+        self.id = id
+        self.rows = rows
+        self.choices = choices
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def question_choices(self, number: int) -> List[int]:
+        return list(self.choices[CHOICES * number : CHOICES * (number + 1)])
+
+    def to_bytes(self) -> bytes:
+        rows = array("i", self.rows)
+        choices = array("i", self.choices)
+        if "big" == sys.byteorder:
+            rows.byteswap()
+            choices.byteswap()
+
+        header = HEADER.pack(MAGIC, VERSION, CHOICES, len(rows))
+        return header + rows.tobytes() + choices.tobytes()
+
+    @classmethod
+    def from_buffer(
+        cls, id: str, data: Union[bytes, mmap.mmap, memoryview]
+    ) -> "DailyChallenge":
+        """Read a challenge written by to_bytes, in place where the byte
+        order allows"""
+        if len(data) < HEADER.size:
+            raise ChallengeFormatError("Too short to be a challenge")
+
+        magic, version, choices_per_question, count = HEADER.unpack_from(data)
+        if MAGIC != magic or VERSION != version or CHOICES != choices_per_question:
+            raise ChallengeFormatError(f"Not a version {VERSION} challenge")
+
+        middle = HEADER.size + 4 * count
+        end = middle + 4 * count * CHOICES
+        if len(data) != end:
+            raise ChallengeFormatError("The challenge is truncated")
+
+        view = memoryview(data)
+        rows = view[HEADER.size : middle].cast("i")
+        choices = view[middle:end].cast("i")
+        if "big" == sys.byteorder:
+            rows = array("i", rows)
+            rows.byteswap()
+            choices = array("i", choices)
+            choices.byteswap()
+
+        return cls(id, rows, choices)
+
+
+def generate_challenge(table: TermTable, day: date) -> DailyChallenge:
+    """Build the challenge of a day: every row once, in an order and with
+    choices drawn from a generator seeded by the day and dataset"""
+    id = challenge_id(table.name, day)
+    seed = int.from_bytes(hashlib.sha256(id.encode()).digest()[:8], "little")
+    rng = random.Random(seed)
+
+    rows = list(range(len(table)))
+    rng.shuffle(rows)
+    choices = array("i")
+    for row in rows:
+        choices.extend(
+            term_choices(table.starts[row], table.ends[row], CHOICES - 1, rng=rng)
+        )
+
+    return DailyChallenge(id, array("i", rows), choices)
+
+
+class ChallengeCache:
+    """Daily challenges, looked up in this process, then the cache
+    directory, and only built when neither has it"""
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory
+        self._challenges: Dict[str, DailyChallenge] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: TermTable, day: Optional[date] = None) -> DailyChallenge:
+        """The challenge of a dataset on a day, today by default"""
+        day = date.today() if day is None else day
+        key = challenge_key(table, day)
+        with self._lock:
+            challenge = self._challenges.get(key)
+            if challenge is None:
+                challenge = self._load(key, table, day)
+                # Around midnight yesterday's and today's are both played
+                if len(self._challenges) > 1:
+                    self._challenges.clear()
+
+                self._challenges[key] = challenge
+
+        return challenge
+
+    def _load(self, key: str, table: TermTable, day: date) -> DailyChallenge:
+        id = challenge_id(table.name, day)
+        challenge = self._map_file(key, id)
+        if challenge is not None:
+            return challenge
+
+        challenge = generate_challenge(table, day)
+        if self._write_file(key, challenge):
+            # Share the written pages rather than keep a copy of them
+            challenge = self._map_file(key, id) or challenge
+
+        return challenge
+
+    def _path(self, key: str) -> Path:
+        return Path.joinpath(self.directory, f"{key}.challenge")
+
+    def _map_file(self, key: str, id: str) -> Optional[DailyChallenge]:
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path(key), "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            # Empty files can't be mapped
+            log.warning("Rebuilding challenge %s: %s", id, error)
+            return None
+
+        try:
+            return DailyChallenge.from_buffer(id, data)
+        except ChallengeFormatError as error:
+            log.warning("Rebuilding challenge %s: %s", id, error)
+            data.close()
+            return None
+
+    def _write_file(self, key: str, challenge: DailyChallenge) -> bool:
+        """Write a challenge for other processes, replacing the file in one
+        step so none of them maps half of it"""
+        if self.directory is None:
+            return False
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(challenge.to_bytes())
+
+            os.replace(temporary, self._path(key))
+        except OSError as error:
+            # Each process builds it again instead
+            log.warning("Couldn't cache challenge %s: %s", challenge.id, error)
+            return False
+
+        self._prune()
+        return True
+
+    def _prune(self) -> None:
+        """Delete the challenge files of days long gone"""
+        cutoff = time.time() - KEEP_FILES.total_seconds()
+        for path in self.directory.glob("*.challenge"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
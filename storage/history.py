@@ -0,0 +1,559 @@
+"""Versioned binary format for streams of game logs.
+
+Layout, all integers little endian or LEB128 varints:
+
+    header   b"PTGH", version (u8), length prefixed UTF-8 dataset name and
+             title, term count (varint), then per term: ordinal, start, end
+             (varints) and a length prefixed UTF-8 name. Version 1 files
+             have no dataset name or title and hold the presidents
+    games    per game: payload length (varint) then date in microseconds
+             since the epoch (zigzag varint), score, total questions,
+             duration in milliseconds, result count, one term index per
+             result, one zigzag year offset from that term's start per
+             result and the correctness bits packed 8 to a byte. Then a
+             byte that is 1 for timed games, followed by the think times
+             and then the handling times in microseconds, one per result.
+             Then the challenge id and the player, each a varint of its
+             UTF-8 length plus one, zero when there is none, followed by
+             the bytes. Before version 3 the duration is in seconds and the
+             timing byte and times are left out, and before version 4 so
+             are the challenge id and player
+    end      a zero length, marking the end of the games
+    index    the file offset of every game (u64 each)
+    trailer  index offset (u64), game count (u64), b"PTGI"
+
+Games are read into the rows of the dataset loaded here, matched to the
+header's terms by name and term, so a history still reads right after the
+dataset has been edited.
+
+Run `python -m storage.history --help` to convert to and from JSON.
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from models import (
+    PRESIDENTS,
+    GameLog,
+    PackedResults,
+    TermTable,
+    TermTableError,
+    get_table,
+)
+from models.results import (
+    INDEX_SHIFT,
+    YEAR_MASK,
+    YEAR_SHIFT,
+    pack_result,
+    president_index,
+)
+from models.term_table import register_table, set_table_loader
+from storage.term_files import load_dataset
+
+MAGIC = b"PTGH"
+INDEX_MAGIC = b"PTGI"
+VERSION = 4
+TRAILER = struct.Struct("<QQ4s")
+EPOCH = datetime(1970, 1, 1)
+
+
+class HistoryFormatError(ValueError):
+    """The data is not a game history this version can read"""
+
+
+class HistoryTerms(NamedTuple):
+    """The terms a history was written with, and the row of each in the
+    dataset loaded here, or -1 where it has no such term"""
+
+    written: TermTable
+    local: TermTable
+    rows: array
+
+
+def history_terms(written: TermTable) -> HistoryTerms:
+    """Match the terms of a history's header to the loaded dataset of the
+    same name, using the header's own terms when it can't be loaded"""
+    try:
+        local = get_table(written.name)
+    except (TermTableError, OSError):
+        # Lets the results be read even when the dataset isn't otherwise loaded
+        register_table(written, replace=False)
+        local = get_table(written.name)
+
+    if local is written or (
+        local.names == written.names
+        and local.starts == written.starts
+        and local.ends == written.ends
+    ):
+        return HistoryTerms(written, local, array("i", range(len(written))))
+
+    rows = array("i")
+    for row in range(len(written)):
+        try:
+            rows.append(president_index(written[row], local.name))
+        except TermTableError:
+            rows.append(-1)
+
+    return HistoryTerms(written, local, rows)
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """Append an unsigned LEB128 varint"""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def decode_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint, returning it and the next position"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+
+        shift += 7
+
+
+def zigzag(value: int) -> int:
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def unzigzag(value: int) -> int:
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+def encode_string(value: str, out: bytearray) -> None:
+    encoded = value.encode("utf-8")
+    encode_varint(len(encoded), out)
+    out += encoded
+
+
+def decode_string(data: bytes, position: int) -> Tuple[str, int]:
+    length, position = decode_varint(data, position)
+    if position + length > len(data):
+        raise IndexError("String not fully read")
+
+    return bytes(data[position : position + length]).decode("utf-8"), position + length
+
+
+def encode_optional_string(value: Optional[str], out: bytearray) -> None:
+    if value is None:
+        out.append(0)
+        return
+
+    encoded = value.encode("utf-8")
+    encode_varint(len(encoded) + 1, out)
+    out += encoded
+
+
+def decode_optional_string(data: bytes, position: int) -> Tuple[Optional[str], int]:
+    length, position = decode_varint(data, position)
+    if 0 == length:
+        return None, position
+
+    length -= 1
+    if position + length > len(data):
+        raise IndexError("String not fully read")
+
+    return bytes(data[position : position + length]).decode("utf-8"), position + length
+
+
+def encode_header(table: TermTable) -> bytes:
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    encode_string(table.name, out)
+    encode_string(table.title, out)
+    encode_varint(len(table), out)
+    for row in range(len(table)):
+        encode_varint(table.ordinals[row], out)
+        encode_varint(table.starts[row], out)
+        encode_varint(table.ends[row], out)
+        encode_string(table.names[row], out)
+
+    return bytes(out)
+
+
+def decode_header(data: bytes, position: int = 0) -> Tuple[HistoryTerms, int, int]:
+    """Read the header, returning its terms matched to the loaded dataset,
+    the version and where games start"""
+    if len(data) - position < len(MAGIC) + 1:
+        raise IndexError("Header not fully read")
+
+    if data[position : position + 4] != MAGIC:
+        raise HistoryFormatError("Not a game history file")
+
+    version = data[position + 4]
+    if not 1 <= version <= VERSION:
+        raise HistoryFormatError(f"Unsupported game history version {version}")
+
+    position += 5
+    dataset, title = PRESIDENTS, "President"
+    if version > 1:
+        dataset, position = decode_string(data, position)
+        title, position = decode_string(data, position)
+
+    count, position = decode_varint(data, position)
+    names = []
+    starts = array("i")
+    ends = array("i")
+    ordinals = array("i")
+    for _ in range(count):
+        ordinal_number, position = decode_varint(data, position)
+        start, position = decode_varint(data, position)
+        end, position = decode_varint(data, position)
+        name, position = decode_string(data, position)
+        ordinals.append(ordinal_number)
+        starts.append(start)
+        ends.append(end)
+        names.append(name)
+
+    table = TermTable(dataset, title, names, starts, ends, ordinals)
+    return history_terms(table), version, position
+
+
+def encode_game(log: GameLog, table: TermTable) -> bytes:
+    """Encode one game, without its length prefix"""
+    packed = log.results.packed
+    out = bytearray()
+    encode_varint(zigzag((log.date - EPOCH) // timedelta(microseconds=1)), out)
+    encode_varint(log.score, out)
+    encode_varint(log.total_questions, out)
+    encode_varint(round(log.duration * 1000), out)
+    encode_varint(len(packed), out)
+
+    for value in packed:
+        encode_varint(value >> INDEX_SHIFT, out)
+
+    for value in packed:
+        start = table.starts[value >> INDEX_SHIFT]
+        encode_varint(zigzag(((value >> YEAR_SHIFT) & YEAR_MASK) - start), out)
+
+    bits = bytearray((len(packed) + 7) // 8)
+    for i, value in enumerate(packed):
+        if value & 1:
+            bits[i >> 3] |= 1 << (i & 7)
+
+    out += bits
+    out.append(log.results.timed)
+    for micros in chain(log.results.think_us, log.results.handle_us):
+        encode_varint(micros, out)
+
+    encode_optional_string(log.challenge_id, out)
+    encode_optional_string(log.player, out)
+    return bytes(out)
+
+
+def decode_game(
+    data: bytes, position: int, terms: HistoryTerms, version: int = VERSION
+) -> Tuple[GameLog, int]:
+    """Decode one game payload, returning it and the position after it, with
+    its results in the loaded dataset's rows"""
+    table = terms.written
+    micros, position = decode_varint(data, position)
+    score, position = decode_varint(data, position)
+    total_questions, position = decode_varint(data, position)
+    duration, position = decode_varint(data, position)
+    count, position = decode_varint(data, position)
+
+    indexes = []
+    for _ in range(count):
+        index, position = decode_varint(data, position)
+        indexes.append(index)
+
+    offsets = []
+    for _ in range(count):
+        offset, position = decode_varint(data, position)
+        offsets.append(offset)
+
+    packed = array("I")
+    for i, (index, offset) in enumerate(zip(indexes, offsets)):
+        if index >= len(table):
+            raise HistoryFormatError(f"Game answers term {index} of {len(table)}")
+
+        row = terms.rows[index]
+        if row < 0:
+            raise HistoryFormatError(
+                f"{terms.local.name}: no term for {table.names[index]} "
+                f"({table.starts[index]} - {table.ends[index]})"
+            )
+
+        is_correct = bool(data[position + (i >> 3)] & (1 << (i & 7)))
+        packed.append(
+            pack_result(row, table.starts[index] + unzigzag(offset), is_correct)
+        )
+
+    position += (count + 7) // 8
+    results = PackedResults(packed, terms.local.name)
+    if version < 3:
+        # Whole seconds
+        duration *= 1000
+    else:
+        timed = data[position]
+        position += 1
+        if timed:
+            timings = array("I")
+            for _ in range(2 * count):
+                time_us, position = decode_varint(data, position)
+                timings.append(time_us)
+
+            results.think_us = timings[:count]
+            results.handle_us = timings[count:]
+
+    challenge_id = player = None
+    if version >= 4:
+        challenge_id, position = decode_optional_string(data, position)
+        player, position = decode_optional_string(data, position)
+
+    log = GameLog.model_construct(
+        date=EPOCH + timedelta(microseconds=unzigzag(micros)),
+        score=score,
+        total_questions=total_questions,
+        duration=duration / 1000,
+        dataset=terms.local.name,
+        challenge_id=challenge_id,
+        player=player,
+        results=results,
+    )
+    return log, position
+
+
+class HistoryWriter:
+    """Streams the games of one dataset to a binary history file, writing
+    the offset index when closed"""
+
+    def __init__(self, file: BinaryIO, table: Optional[TermTable] = None) -> None:
+        self.file = file
+        self.table = get_table(PRESIDENTS) if table is None else table
+        self.offsets = array("Q")
+        header = encode_header(self.table)
+        self.file.write(header)
+        self.position = len(header)
+
+    def write(self, log: GameLog) -> None:
+        if log.dataset != self.table.name:
+            raise ValueError(
+                f"Can't write a {log.dataset} game to a {self.table.name} history"
+            )
+
+        payload = encode_game(log, self.table)
+        prefix = bytearray()
+        encode_varint(len(payload), prefix)
+
+        self.offsets.append(self.position)
+        self.file.write(prefix)
+        self.file.write(payload)
+        self.position += len(prefix) + len(payload)
+
+    def write_all(self, logs: Iterable[GameLog]) -> None:
+        for log in logs:
+            self.write(log)
+
+    def close(self) -> None:
+        """End the games and write the index and trailer."""
+        self.file.write(b"\x00")
+        index_offset = self.position + 1
+        offsets = array("Q", self.offsets)
+        if "big" == sys.byteorder:
+            offsets.byteswap()
+
+        self.file.write(offsets.tobytes())
+        self.file.write(TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+        self.file.flush()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def read_history(file: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[GameLog]:
+    """Yield the games of a history file in order, holding only one chunk of
+    the file in memory at a time"""
+    buffer = bytearray()
+    position = 0
+    terms: Optional[HistoryTerms] = None
+    version = VERSION
+    eof = False
+
+    while True:
+        try:
+            if terms is None:
+                terms, version, position = decode_header(buffer, position)
+
+            length, start = decode_varint(buffer, position)
+            if 0 == length:
+                return
+
+            if start + length > len(buffer):
+                raise IndexError
+
+            log, _ = decode_game(buffer, start, terms, version)
+            position = start + length
+            yield log
+
+        except IndexError:
+            # Not enough buffered for the next header or game, read more
+            if eof:
+                raise HistoryFormatError("Truncated game history") from None
+
+            del buffer[:position]
+            position = 0
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+
+class HistoryArchive:
+    """Random access to the games of a history file through a memory map
+    and its offset index"""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.terms, self.version, _ = decode_header(self._map)
+        index_offset, count, magic = TRAILER.unpack_from(
+            self._map, len(self._map) - TRAILER.size
+        )
+        if magic != INDEX_MAGIC:
+            raise HistoryFormatError("Game history has no index")
+
+        self.offsets = array("Q")
+        self.offsets.frombytes(self._map[index_offset : index_offset + count * 8])
+        if "big" == sys.byteorder:
+            self.offsets.byteswap()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> GameLog:
+        _, start = decode_varint(self._map, self.offsets[index])
+        log, _ = decode_game(self._map, start, self.terms, self.version)
+        return log
+
+    def __iter__(self) -> Iterator[GameLog]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "HistoryArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def read_json_logs(file) -> Iterator[GameLog]:
+    """Read game logs from a JSON array, or stream them from JSON lines"""
+    first = file.read(1)
+    while first.isspace():
+        first = file.read(1)
+
+    if "[" == first:
+        for item in json.loads(first + file.read()):
+            yield GameLog.model_validate(item)
+
+        return
+
+    for line in chain([first + file.readline()], file):
+        if line.strip():
+            yield GameLog.model_validate_json(line)
+
+
+def to_binary(source: str, destination: str) -> int:
+    with (
+        open(source, "rt", encoding="utf-8") as json_file,
+        open(destination, "wb") as binary_file,
+    ):
+        # A history holds one dataset, the one the first game was played on
+        logs = read_json_logs(json_file)
+        first = next(logs, None)
+        table = get_table(PRESIDENTS if first is None else first.dataset)
+        with HistoryWriter(binary_file, table) as writer:
+            if first is not None:
+                writer.write_all(chain([first], logs))
+
+            return len(writer.offsets)
+
+
+def to_json(source: str, destination: str, lines: bool) -> int:
+    count = 0
+    with (
+        open(source, "rb") as binary_file,
+        open(destination, "wt", encoding="utf-8") as json_file,
+    ):
+        if not lines:
+            json_file.write("[")
+
+        for count, log in enumerate(read_history(binary_file), start=1):
+            if lines:
+                json_file.write(log.model_dump_json() + "\n")
+            else:
+                json_file.write(("," if count > 1 else "") + log.model_dump_json())
+
+        if not lines:
+            json_file.write("]\n")
+
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m storage.history",
+        description="Convert game histories between pydantic JSON and the binary format",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    binary = commands.add_parser(
+        "to-binary", help="Convert a JSON array or JSON lines of game logs"
+    )
+    binary.add_argument("source")
+    binary.add_argument("destination")
+
+    text = commands.add_parser("to-json", help="Convert a binary history to JSON")
+    text.add_argument("source")
+    text.add_argument("destination")
+    text.add_argument(
+        "--lines",
+        action="store_true",
+        help="Write one game per line instead of an array",
+    )
+
+    parser.add_argument(
+        "--datasets",
+        type=Path,
+        default=Path("data"),
+        help="Directory of term datasets, as the game finds them (./data)",
+    )
+    args = parser.parse_args()
+    set_table_loader(partial(load_dataset, directories=[args.datasets]))
+
+    match args.command:
+        case "to-binary":
+            count = to_binary(args.source, args.destination)
+        case "to-json":
+            count = to_json(args.source, args.destination, args.lines)
+
+    print(f"Converted {count} games to {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from enum import StrEnum, auto
+from typing import Dict, List, Optional
+
+from models import GameLog
+from storage.base import ScoreboardStore
+
+
+class LeaderboardWindow(StrEnum):
+    TODAY = auto()
+    WEEK = auto()
+    ALL_TIME = auto()
+
+
+# Calendar days in each window, up to and including today
+WINDOW_DAYS: Dict[LeaderboardWindow, Optional[int]] = {
+    LeaderboardWindow.TODAY: 1,
+    LeaderboardWindow.WEEK: 7,
+    LeaderboardWindow.ALL_TIME: None,
+}
+
+
+class Leaderboard:
+    """Ranks for today, this week and all time, asked of the store's ranking
+    index, so every session's games count and nothing is kept in memory.
+    Windows are whole days, which the store ranks one day at a time, so a
+    window only reads its own games. Only shuffled games are ranked here,
+    each against its own dataset; daily challenges have their own ranks."""
+
+    def __init__(self, store: ScoreboardStore) -> None:
+        self.store = store
+
+    @staticmethod
+    def first_day(
+        window: LeaderboardWindow, today: Optional[date] = None
+    ) -> Optional[date]:
+        """The first day of a window, or None for all time"""
+        days = WINDOW_DAYS[window]
+        if days is None:
+            return None
+
+        return (date.today() if today is None else today) - timedelta(days=days - 1)
+
+    def top(
+        self, window: LeaderboardWindow, dataset: str, limit: int
+    ) -> List[GameLog]:
+        """The best games of a dataset within a window."""
+        return self.store.window_top(dataset, self.first_day(window), limit)
+
+    def rank(self, window: LeaderboardWindow, log: GameLog) -> int:
+        """Where a game places within a window, recorded yet or not."""
+        return self.store.window_rank(log, self.first_day(window))
@@ -0,0 +1,98 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import date, datetime
+from heapq import merge
+from itertools import islice
+from typing import DefaultDict, Iterator, List, Optional, Tuple
+
+from models import GameLog, PackedResults
+from storage.analytics import AccuracyStats
+from storage.base import ScoreboardStore, rank_key, window_days
+
+
+class InMemoryScoreboardStore(ScoreboardStore):
+    """Keeps the games of this process in lists that are always ranked: one
+    of every game, and one per challenge, per dataset and per day of a
+    dataset for the leaderboard windows"""
+
+    def __init__(self) -> None:
+        self._logs: List[GameLog] = []
+        self._challenges: DefaultDict[str, List[GameLog]] = defaultdict(list)
+        # Shuffled games only, by dataset and by dataset and day
+        self._windows: DefaultDict[str, List[GameLog]] = defaultdict(list)
+        self._days: DefaultDict[Tuple[str, date], List[GameLog]] = defaultdict(list)
+        # Oldest first, by player and dataset
+        self._players: DefaultDict[
+            Tuple[str, str], List[Tuple[datetime, PackedResults]]
+        ] = defaultdict(list)
+        self._stats = AccuracyStats()
+
+    def add(self, log: GameLog) -> None:
+        insort(self._logs, log, key=rank_key)
+        if log.challenge_id is not None:
+            insort(self._challenges[log.challenge_id], log, key=rank_key)
+        else:
+            insort(self._windows[log.dataset], log, key=rank_key)
+            insort(self._days[(log.dataset, log.date.date())], log, key=rank_key)
+
+        if log.player is not None:
+            insort(
+                self._players[(log.player, log.dataset)],
+                (log.date, log.results),
+                key=lambda game: game[0],
+            )
+
+        self._stats.record(log)
+
+    def count(self) -> int:
+        return len(self._logs)
+
+    def top(self, limit: int, offset: int = 0) -> List[GameLog]:
+        return self._logs[offset : offset + limit]
+
+    def challenge_top(
+        self, challenge_id: str, limit: int, offset: int = 0
+    ) -> List[GameLog]:
+        return self._challenges.get(challenge_id, [])[offset : offset + limit]
+
+    def challenge_rank(self, log: GameLog) -> int:
+        games = self._challenges.get(log.challenge_id, [])
+        return bisect_left(games, rank_key(log), key=rank_key) + 1
+
+    def player_results(self, player: str, dataset: str) -> Iterator[PackedResults]:
+        for _, results in list(self._players.get((player, dataset), [])):
+            yield results
+
+    def _window(self, dataset: str, first_day: Optional[date]) -> List[List[GameLog]]:
+        """The ranked lists making up a window"""
+        if first_day is None:
+            return [self._windows.get(dataset, [])]
+
+        return [self._days.get((dataset, day), []) for day in window_days(first_day)]
+
+    def window_top(
+        self, dataset: str, first_day: Optional[date], limit: int
+    ) -> List[GameLog]:
+        games = self._window(dataset, first_day)
+        return list(islice(merge(*games, key=rank_key), limit))
+
+    def window_rank(self, log: GameLog, first_day: Optional[date]) -> int:
+        key = rank_key(log)
+        return 1 + sum(
+            bisect_left(games, key, key=rank_key)
+            for games in self._window(log.dataset, first_day)
+        )
+
+    def accuracy_stats(self, dataset: Optional[str] = None) -> AccuracyStats:
+        stats = AccuracyStats()
+        # Copied in one step, as the writer thread may be adding a game
+        for key, counts in list(self._stats.counts.items()):
+            if dataset is None or dataset == key[0]:
+                stats.counts[key] = list(counts)
+
+        return stats
+
+    def rebuild_accuracy_stats(self) -> AccuracyStats:
+        self._stats = AccuracyStats()
+        self._stats.record_many(self._logs)
+        return self.accuracy_stats()
@@ -0,0 +1,342 @@
+"""Counters and timings of the game, shared between its processes.
+
+Every process counts into its own MetricsRecorder, which a background thread
+writes to a file of its own, named by its pid, in the metrics directory
+every few seconds and once more at exit. Whoever serves the metrics adds
+those files up with collect_metrics. A file written at exit, or whose
+process no longer exists, is retired: its counts are folded into one file
+of retired totals, so counters never go backwards, and it is deleted. A
+file that stops being rewritten while its process lives on is still
+counted, but its gauges are left out until it is written again.
+
+Files are JSON:
+
+    {"counters": {name: count}, "histograms": {name: {"counts": [...],
+     "total_us": micros}}, "values": {name: number}, "help": {name: text},
+     "rss_bytes": bytes, "running": bool}
+
+Values are read from the sources a process adds, such as the warm pool's
+counters, along with a line describing each. Those named *_total are
+counters, the rest gauges.
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import resource
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import TimeHistogram
+
+log = logging.getLogger(__name__)
+
+# What is counted, and what is timed
+COUNTERS = (
+    "sessions_started",
+    "sessions_finished",
+    "games_finished",
+    "questions_answered",
+    "answers_correct",
+)
+HISTOGRAMS = (
+    "answer_handling",
+    "screen_transition",
+    "scoreboard_load",
+    "scoreboard_page",
+)
+# Seconds between writes of a process' file
+DUMP_INTERVAL = 5.0
+# A file this many intervals old is out of date, its gauges are left out
+STALE_INTERVALS = 3
+RETIRED_FILE = "retired.json"
+LOCK_FILE = ".lock"
+
+
+def process_exists(pid: int) -> bool:
+    """Whether a process with the pid is running on this machine"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Someone else's
+        return True
+
+    return True
+
+
+def resident_bytes() -> int:
+    """Memory the process has resident now, or at its peak where the OS
+    doesn't say"""
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # Kilobytes on Linux, but only the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ProcessMetrics:
+    """The counts and timings of one process, or the sum of several"""
+
+    def __init__(self) -> None:
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: TimeHistogram() for name in HISTOGRAMS}
+        # Read from the process' sources when it is written
+        self.values: Dict[str, float] = {}
+        # What the sources' values measure
+        self.help: Dict[str, str] = {}
+        self.rss_bytes = 0
+        self.running = True
+
+    @property
+    def sessions_active(self) -> int:
+        return self.counters["sessions_started"] - self.counters["sessions_finished"]
+
+    def merge(self, other: "ProcessMetrics") -> None:
+        for name, count in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + count
+
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, TimeHistogram()).merge(histogram)
+
+        # Gauges only mean something for a running process
+        for name, value in other.values.items():
+            if name.endswith("_total"):
+                self.values[name] = self.values.get(name, 0) + value
+
+        self.help.update(other.help)
+        self.rss_bytes += other.rss_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counters": self.counters,
+            "histograms": {
+                name: {"counts": histogram.counts, "total_us": histogram.total_us}
+                for name, histogram in self.histograms.items()
+            },
+            "values": self.values,
+            "help": self.help,
+            "rss_bytes": self.rss_bytes,
+            "running": self.running,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProcessMetrics":
+        metrics = cls()
+        for name, count in data.get("counters", {}).items():
+            metrics.counters[name] = int(count)
+
+        for name, values in data.get("histograms", {}).items():
+            histogram = metrics.histograms.setdefault(name, TimeHistogram())
+            counts = [int(count) for count in values["counts"]]
+            if len(counts) != len(histogram.counts):
+                # Written with other bucket bounds
+                continue
+
+            histogram.counts = counts
+            histogram.count = sum(counts)
+            histogram.total_us = int(values["total_us"])
+
+        metrics.values = {
+            name: float(value) for name, value in data.get("values", {}).items()
+        }
+        metrics.help = {
+            name: str(text) for name, text in data.get("help", {}).items()
+        }
+        metrics.rss_bytes = int(data.get("rss_bytes", 0))
+        metrics.running = bool(data.get("running", True))
+        return metrics
+
+
+class MetricsRecorder:
+    """Counts and times events in this process. Recording is a dict lookup
+    and an addition; the file is written by a background thread, only when
+    there is a directory to write it to."""
+
+    def __init__(
+        self, directory: Optional[Path] = None, interval: float = DUMP_INTERVAL
+    ) -> None:
+        self.directory = directory
+        self.interval = interval
+        self.metrics = ProcessMetrics()
+        self._path: Optional[Path] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sources: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.metrics.counters[name] += amount
+        self._ensure_started()
+
+    def time(self, name: str, micros: int) -> None:
+        self.metrics.histograms[name].record(micros)
+        self._ensure_started()
+
+    def add_source(
+        self,
+        prefix: str,
+        snapshot: Callable[[], Dict[str, float]],
+        help: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Write what snapshot returns with every dump, each name prefixed,
+        and what each of its values measures"""
+        self._sources[prefix] = snapshot
+        for name, text in (help or {}).items():
+            self.metrics.help[f"{prefix}_{name}"] = text
+
+    def enable(self, directory: Path) -> None:
+        """Start writing this process' metrics to a directory"""
+        self.directory = directory
+        self._ensure_started()
+
+    def dump(self) -> None:
+        """Write this process' file, replacing it in one step so a reader
+        never sees half of it"""
+        if self._path is None:
+            return
+
+        self.metrics.rss_bytes = resident_bytes()
+        for prefix, snapshot in list(self._sources.items()):
+            try:
+                values = snapshot()
+            except RuntimeError:
+                # Its timings changed while being summed, the next dump has them
+                continue
+
+            for name, value in values.items():
+                self.metrics.values[f"{prefix}_{name}"] = value
+
+        data = json.dumps(self.metrics.to_dict()).encode()
+        try:
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+
+            os.replace(temporary, self._path)
+        except OSError as error:
+            log.warning("Couldn't write metrics: %s", error)
+
+    def close(self) -> None:
+        """Stop the thread and write the final counts."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self.metrics.running = False
+            self.dump()
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use."""
+        if self._thread is not None or self.directory is None:
+            return
+
+        with self._start_lock:
+            if self._thread is not None:
+                return
+
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as error:
+                log.warning("Not writing metrics: %s", error)
+                self.directory = None
+                return
+
+            # Named by start time too, so a reused pid never takes its file
+            self._path = Path.joinpath(
+                self.directory, f"{os.getpid()}-{time.time_ns()}.json"
+            )
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="metrics-writer", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            self.dump()
+            if self._stop.wait(self.interval):
+                break
+
+
+def collect_metrics(
+    directory: Path, stale_after: float = STALE_INTERVALS * DUMP_INTERVAL
+) -> Tuple[ProcessMetrics, List[ProcessMetrics]]:
+    """Totals of every process that has written metrics, and the metrics of
+    those still running and writing them. Files of exited processes are
+    retired on the way."""
+    totals = ProcessMetrics()
+    live: List[ProcessMetrics] = []
+    # Running, but not written lately
+    stalled: List[ProcessMetrics] = []
+    if not directory.is_dir():
+        return totals, live
+
+    with open(Path.joinpath(directory, LOCK_FILE), "a") as lock:
+        # Only one reader retires files at a time
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retired_path = Path.joinpath(directory, RETIRED_FILE)
+        retired = _read_file(retired_path) or ProcessMetrics()
+        retired.rss_bytes = 0
+        gone: List[Path] = []
+
+        cutoff = time.time() - stale_after
+        for path in directory.glob("*-*.json"):
+            try:
+                pid = int(path.name.split("-", 1)[0])
+                modified = path.stat().st_mtime
+            except (ValueError, FileNotFoundError):
+                continue
+
+            metrics = _read_file(path)
+            # Retired only once its process is gone, or the counts it has
+            # yet to write would be added again with the rest of its file
+            if not process_exists(pid) or (
+                metrics is not None and not metrics.running
+            ):
+                if metrics is not None:
+                    retired.merge(metrics)
+                    retired.rss_bytes = 0
+
+                gone.append(path)
+            elif metrics is not None:
+                (stalled if modified < cutoff else live).append(metrics)
+
+        if gone:
+            data = json.dumps(retired.to_dict()).encode()
+            descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+
+            # The totals are safe before the files they came from go
+            os.replace(temporary, retired_path)
+            for path in gone:
+                path.unlink(missing_ok=True)
+
+    totals.merge(retired)
+    for metrics in live + stalled:
+        totals.merge(metrics)
+
+    return totals, live
+
+
+def _read_file(path: Path) -> Optional[ProcessMetrics]:
+    try:
+        with open(path, "rb") as file:
+            return ProcessMetrics.from_dict(json.load(file))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        log.warning("Skipping metrics file %s: %s", path.name, error)
+        return None
@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from models import TermTable
+from models.scheduler import AdaptiveSchedule
+from storage.base import ScoreboardStore
+
+# Players whose schedules are kept in memory, least recently played dropped
+MAX_PLAYERS = 1024
+
+
+class ScheduleCache:
+    """The adaptive schedules of the players seen lately. Each is loaded
+    from the player's recorded games the first time and kept up to date as
+    they answer, so the store is only read again once it is dropped."""
+
+    def __init__(self, store: ScoreboardStore, max_players: int = MAX_PLAYERS) -> None:
+        self.store = store
+        self.max_players = max_players
+        self._schedules: OrderedDict[Tuple[str, str], AdaptiveSchedule] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def get(self, player: str, table: TermTable) -> AdaptiveSchedule:
+        """A player's schedule for a dataset"""
+        key = (player, table.name)
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is not None and len(schedule) == len(table):
+                self._schedules.move_to_end(key)
+                return schedule
+
+        # Read outside the lock, so one player's history doesn't hold up the
+        # others. Two sessions loading the same player keep the first.
+        schedule = AdaptiveSchedule.from_history(
+            len(table), self.store.player_results(player, table.name)
+        )
+        with self._lock:
+            loaded = self._schedules.get(key)
+            if loaded is not None and len(loaded) == len(table):
+                schedule = loaded
+
+            self._schedules[key] = schedule
+            self._schedules.move_to_end(key)
+            while len(self._schedules) > self.max_players:
+                self._schedules.popitem(last=False)
+
+        return schedule
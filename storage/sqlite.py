@@ -0,0 +1,443 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from heapq import merge
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from models import PRESIDENTS, GameLog, PackedResults
+from storage.analytics import DISTANCE_BUCKETS, AccuracyStats, stats_from_results
+from storage.base import ScoreboardStore, rank_key, window_days
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_logs (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    total_questions INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    results BLOB NOT NULL,
+    dataset TEXT NOT NULL DEFAULT 'presidents',
+    challenge_id TEXT,
+    player TEXT,
+    timings BLOB
+);
+CREATE INDEX IF NOT EXISTS game_logs_rank
+    ON game_logs (score DESC, duration ASC, date ASC);
+"""
+
+INSERT = """
+INSERT INTO game_logs (
+    date, score, total_questions, duration, results, dataset, challenge_id, player,
+    timings
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_TOP = """
+SELECT date, score, total_questions, duration, results, dataset, challenge_id,
+    player, timings
+FROM game_logs
+ORDER BY score DESC, duration ASC, date ASC
+LIMIT ? OFFSET ?
+"""
+
+SELECT_CHALLENGE_TOP = """
+SELECT date, score, total_questions, duration, results, dataset, challenge_id,
+    player, timings
+FROM game_logs
+WHERE challenge_id = ?
+ORDER BY score DESC, duration ASC, date ASC
+LIMIT ? OFFSET ?
+"""
+
+SELECT_PLAYER_RESULTS = """
+SELECT results FROM game_logs
+WHERE player = ? AND dataset = ?
+ORDER BY date ASC
+"""
+
+# The day a game was played on, which leaderboard windows are made of. Queries
+# must spell it the same way as the index for it to be used.
+DAY = "substr(date, 1, 10)"
+WINDOW = "dataset = :dataset AND challenge_id IS NULL"
+DAY_WINDOW = f"{WINDOW} AND {DAY} = :day"
+
+
+def select_top(where: str) -> str:
+    """Select the best games matching where, walking the index in rank
+    order"""
+    return f"""
+SELECT date, score, total_questions, duration, results, dataset, challenge_id,
+    player, timings
+FROM game_logs
+WHERE {where}
+ORDER BY score DESC, duration ASC, date ASC
+LIMIT :limit
+"""
+
+
+def count_ahead(where: str) -> str:
+    """Count the games matching where that rank ahead of a score, duration
+    and date. Three counts, so each seeks its index to the range ahead
+    instead of an OR scanning every game that matches."""
+    return f"""
+SELECT
+    (SELECT COUNT(*) FROM game_logs WHERE {where} AND score > :score)
+    + (SELECT COUNT(*) FROM game_logs
+        WHERE {where} AND score = :score AND duration < :duration)
+    + (SELECT COUNT(*) FROM game_logs
+        WHERE {where} AND score = :score AND duration = :duration
+        AND date < :date)
+"""
+
+
+# The best shuffled games of a dataset, of all time or of one day
+SELECT_WINDOW_TOP = select_top(WINDOW)
+SELECT_DAY_TOP = select_top(DAY_WINDOW)
+COUNT_WINDOW_AHEAD = count_ahead(WINDOW)
+COUNT_DAY_AHEAD = count_ahead(DAY_WINDOW)
+COUNT_CHALLENGE_AHEAD = count_ahead("challenge_id = :challenge_id")
+
+# Columns added since the table was first created, for older databases
+COLUMNS = {
+    "dataset": "ALTER TABLE game_logs ADD COLUMN dataset TEXT NOT NULL "
+    "DEFAULT 'presidents'",
+    "challenge_id": "ALTER TABLE game_logs ADD COLUMN challenge_id TEXT",
+    "player": "ALTER TABLE game_logs ADD COLUMN player TEXT",
+    "timings": "ALTER TABLE game_logs ADD COLUMN timings BLOB",
+}
+
+# Indexes on columns an older database only has once migrated
+INDEXES = """
+CREATE INDEX IF NOT EXISTS game_logs_challenge_rank
+    ON game_logs (challenge_id, score DESC, duration ASC, date ASC)
+    WHERE challenge_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS game_logs_window_rank
+    ON game_logs (dataset, score DESC, duration ASC, date ASC)
+    WHERE challenge_id IS NULL;
+CREATE INDEX IF NOT EXISTS game_logs_day_rank
+    ON game_logs (dataset, substr(date, 1, 10), score DESC, duration ASC, date ASC)
+    WHERE challenge_id IS NULL;
+CREATE INDEX IF NOT EXISTS game_logs_player
+    ON game_logs (player, dataset, date)
+    WHERE player IS NOT NULL;
+"""
+
+# Running answer totals per term, one column per AccuracyStats count
+STATS_COLUMNS = (
+    ("answered", "correct", "distance_total")
+    + tuple(f"off_{bound}" for bound in DISTANCE_BUCKETS)
+    + ("off_more",)
+)
+
+STATS_SCHEMA = f"""
+CREATE TABLE answer_stats (
+    dataset TEXT NOT NULL,
+    term INTEGER NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in STATS_COLUMNS)},
+    PRIMARY KEY (dataset, term)
+)
+"""
+
+UPSERT_STATS = f"""
+INSERT INTO answer_stats (dataset, term, {", ".join(STATS_COLUMNS)})
+VALUES ({", ".join("?" * (len(STATS_COLUMNS) + 2))})
+ON CONFLICT (dataset, term) DO UPDATE SET
+    {", ".join(f"{column} = {column} + excluded.{column}" for column in STATS_COLUMNS)}
+"""
+
+SELECT_STATS = f"""
+SELECT dataset, term, {", ".join(STATS_COLUMNS)} FROM answer_stats
+"""
+
+# The number of games, kept with them so counting them doesn't read them all
+COUNT_SCHEMA = "CREATE TABLE game_count (games INTEGER NOT NULL)"
+ADD_TO_COUNT = "UPDATE game_count SET games = games + ?"
+SELECT_COUNT = "SELECT games FROM game_count"
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """Add any columns and indexes an older database is missing."""
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(game_logs)")}
+    for column, statement in COLUMNS.items():
+        if column in existing:
+            continue
+
+        try:
+            connection.execute(statement)
+        except sqlite3.OperationalError as error:
+            # Unless another process added it first
+            if "duplicate column" not in str(error):
+                raise
+
+    connection.executescript(INDEXES)
+
+
+def has_table(connection: sqlite3.Connection, name: str) -> bool:
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def add_stats(connection: sqlite3.Connection, stats: AccuracyStats) -> None:
+    connection.executemany(
+        UPSERT_STATS,
+        [(dataset, term, *counts) for (dataset, term), counts in stats.counts.items()],
+    )
+
+
+def count_stats(connection: sqlite3.Connection, replace: bool) -> AccuracyStats:
+    """Count the answer totals of every recorded game, in one write
+    transaction so no game is added or counted twice meanwhile. Unless
+    replacing them, totals another process already counted are kept."""
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if replace:
+            connection.execute("DROP TABLE IF EXISTS answer_stats")
+        elif has_table(connection, "answer_stats"):
+            connection.rollback()
+            return AccuracyStats()
+
+        connection.execute(STATS_SCHEMA)
+        rows = connection.execute("SELECT results, dataset FROM game_logs")
+        stats = stats_from_results(
+            (load_results(results, dataset), dataset) for results, dataset in rows
+        )
+        add_stats(connection, stats)
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+
+    return stats
+
+
+def count_games(connection: sqlite3.Connection) -> None:
+    """Count the recorded games once, for databases from before the count
+    was kept, unless another process already has"""
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if not has_table(connection, "game_count"):
+            connection.execute(COUNT_SCHEMA)
+            connection.execute(
+                "INSERT INTO game_count (games) SELECT COUNT(*) FROM game_logs"
+            )
+
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+
+
+def load_results(data: bytes, dataset: str = PRESIDENTS) -> PackedResults:
+    """Read the results column, which holds packed results or, for games
+    recorded before packing, a JSON list"""
+    # Packed results can start with the byte "[" too
+    if data[:1] == b"[" and data[-1:] == b"]":
+        try:
+            results = json.loads(data)
+        except ValueError:
+            pass
+        else:
+            return PackedResults.from_results(results, dataset)
+
+    return PackedResults.from_bytes(data, dataset)
+
+
+class SQLiteScoreboardStore(ScoreboardStore):
+    """Scoreboard kept in an SQLite database in WAL mode, so every session
+    process shares it and it survives restarts. Ranked reads walk the
+    (score, duration, date) index instead of sorting."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            migrate(connection)
+            # Databases from before the totals were kept count them once
+            if not has_table(connection, "answer_stats"):
+                count_stats(connection, replace=False)
+
+            if not has_table(connection, "game_count"):
+                count_games(connection)
+
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    @staticmethod
+    def _to_row(log: GameLog) -> tuple:
+        return (
+            log.date.isoformat(),
+            log.score,
+            log.total_questions,
+            log.duration,
+            log.results.to_bytes(),
+            log.dataset,
+            log.challenge_id,
+            log.player,
+            log.results.timings_to_bytes() if log.results.timed else None,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> GameLog:
+        (
+            date,
+            score,
+            total_questions,
+            duration,
+            results,
+            dataset,
+            challenge_id,
+            player,
+            timings,
+        ) = row
+        packed = load_results(results, dataset)
+        if timings:
+            packed.set_timings_from_bytes(timings)
+
+        return GameLog(
+            date=datetime.fromisoformat(date),
+            score=score,
+            total_questions=total_questions,
+            duration=duration,
+            dataset=dataset,
+            challenge_id=challenge_id,
+            player=player,
+            results=packed,
+        )
+
+    def add(self, log: GameLog) -> None:
+        self.add_many([log])
+
+    def add_many(self, logs: Iterable[GameLog]) -> None:
+        logs = list(logs)
+        stats = AccuracyStats()
+        stats.record_many(logs)
+        # The games and their totals are committed together
+        with self.connection as connection:
+            connection.executemany(INSERT, [self._to_row(log) for log in logs])
+            connection.execute(ADD_TO_COUNT, (len(logs),))
+            add_stats(connection, stats)
+
+    def count(self) -> int:
+        (count,) = self.connection.execute(SELECT_COUNT).fetchone()
+        return count
+
+    def top(self, limit: int, offset: int = 0) -> List[GameLog]:
+        rows = self.connection.execute(SELECT_TOP, (limit, offset)).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def challenge_top(
+        self, challenge_id: str, limit: int, offset: int = 0
+    ) -> List[GameLog]:
+        rows = self.connection.execute(
+            SELECT_CHALLENGE_TOP, (challenge_id, limit, offset)
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _rank_parameters(log: GameLog) -> Dict[str, object]:
+        return {
+            "score": log.score,
+            "duration": log.duration,
+            "date": log.date.isoformat(),
+        }
+
+    def challenge_rank(self, log: GameLog) -> int:
+        # Counted on the challenge's index, stopping at the game's place
+        (ahead,) = self.connection.execute(
+            COUNT_CHALLENGE_AHEAD,
+            {"challenge_id": log.challenge_id, **self._rank_parameters(log)},
+        ).fetchone()
+        return ahead + 1
+
+    def player_results(self, player: str, dataset: str) -> Iterator[PackedResults]:
+        rows = self.connection.execute(SELECT_PLAYER_RESULTS, (player, dataset))
+        for (results,) in rows:
+            yield load_results(results, dataset)
+
+    def window_top(
+        self, dataset: str, first_day: Optional[date], limit: int
+    ) -> List[GameLog]:
+        if first_day is None:
+            rows = self.connection.execute(
+                SELECT_WINDOW_TOP, {"dataset": dataset, "limit": limit}
+            ).fetchall()
+            return [self._from_row(row) for row in rows]
+
+        # The best of each day, read from the day's part of the index
+        days = [
+            [
+                self._from_row(row)
+                for row in self.connection.execute(
+                    SELECT_DAY_TOP,
+                    {"dataset": dataset, "day": day.isoformat(), "limit": limit},
+                )
+            ]
+            for day in window_days(first_day)
+        ]
+        return list(islice(merge(*days, key=rank_key), limit))
+
+    def window_rank(self, log: GameLog, first_day: Optional[date]) -> int:
+        # Counted on the window index, stopping at the game's place, one day
+        # at a time so only the window's games are read
+        parameters = {"dataset": log.dataset, **self._rank_parameters(log)}
+        if first_day is None:
+            (ahead,) = self.connection.execute(
+                COUNT_WINDOW_AHEAD, parameters
+            ).fetchone()
+            return ahead + 1
+
+        ahead = 0
+        for day in window_days(first_day):
+            (count,) = self.connection.execute(
+                COUNT_DAY_AHEAD, {"day": day.isoformat(), **parameters}
+            ).fetchone()
+            ahead += count
+
+        return ahead + 1
+
+    def accuracy_stats(self, dataset: Optional[str] = None) -> AccuracyStats:
+        # One row per term, however many games were played
+        if dataset is None:
+            rows = self.connection.execute(SELECT_STATS)
+        else:
+            rows = self.connection.execute(SELECT_STATS + " WHERE dataset = ?", (dataset,))
+
+        stats = AccuracyStats()
+        for dataset_name, term, *counts in rows:
+            stats.counts[(dataset_name, term)] = counts
+
+        return stats
+
+    def rebuild_accuracy_stats(self) -> AccuracyStats:
+        return count_stats(self.connection, replace=True)
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+            self._connections.clear()
+
+        self._local = threading.local()
@@ -0,0 +1,260 @@
+"""Loads term datasets from CSV or JSON files into TermTables.
+
+CSV files have a header with name, start and end columns and optionally an
+ordinal_number column. JSON files hold a list of objects with the same keys,
+or an object with a "title" and the list as "terms".
+
+Parsing is only done once per file. The table is then written beside it in
+a binary sidecar, `<file>.terms`, that later startups read instead:
+
+    header   b"PTTT", version (u8), source mtime in ns (i64), source size
+             (i64), row count (u32), title length (u16) and UTF-8 title
+    columns  start, end and ordinal number of every row (i32 each)
+    names    length (u32) then the UTF-8 names joined by NUL characters
+
+A sidecar whose recorded mtime or size no longer matches the source is
+ignored and rewritten.
+"""
+
+import csv
+import json
+import logging
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from models import TermTable, TermTableError
+
+log = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = ".terms"
+SIDECAR_MAGIC = b"PTTT"
+SIDECAR_VERSION = 1
+SIDECAR_HEADER = struct.Struct("<4sBqqIH")
+NAMES_LENGTH = struct.Struct("<I")
+DATASET_SUFFIXES = (".json", ".csv")
+DEFAULT_TITLE = "Leader"
+
+Columns = Tuple[str, List[str], List[Any], List[Any], Optional[List[Any]]]
+
+
+def int_column(dataset: str, column: str, values: List[Any]) -> array:
+    """Convert a column in one go, only looking for the bad rows on failure"""
+    try:
+        return array("i", map(int, values))
+    except (TypeError, ValueError, OverflowError):
+        pass
+
+    errors = []
+    for row, value in enumerate(values):
+        try:
+            array("i", [int(value)])
+        except (TypeError, ValueError, OverflowError):
+            errors.append(f"row {row + 1}: {column} {value!r} is not a year")
+
+    reported = "\n  ".join(errors[:10])
+    raise TermTableError(f"{dataset}: invalid terms\n  {reported}")
+
+
+def read_csv(path: Path) -> Columns:
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [column.strip() for column in next(reader, [])]
+        missing = {"name", "start", "end"}.difference(header)
+        if missing:
+            raise TermTableError(
+                f"{path}: missing column {', '.join(sorted(missing))}"
+            )
+
+        rows = [row for row in reader if row]
+
+    short = [
+        f"row {row + 1}: expected {len(header)} columns"
+        for row, values in enumerate(rows)
+        if len(values) != len(header)
+    ]
+    if short:
+        reported = "\n  ".join(short[:10])
+        raise TermTableError(f"{path}: invalid terms\n  {reported}")
+
+    # Transpose once rather than building a record per row
+    columns = dict(zip(header, map(list, zip(*rows)))) if rows else {}
+    return (
+        DEFAULT_TITLE,
+        columns.get("name", []),
+        columns.get("start", []),
+        columns.get("end", []),
+        columns.get("ordinal_number"),
+    )
+
+
+def read_json(path: Path) -> Columns:
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    title = DEFAULT_TITLE
+    if isinstance(data, dict):
+        title = data.get("title", title)
+        data = data.get("terms")
+
+    if not isinstance(data, list) or not all(isinstance(term, dict) for term in data):
+        raise TermTableError(f"{path}: expected a list of terms")
+
+    try:
+        names = [term["name"] for term in data]
+        starts = [term["start"] for term in data]
+        ends = [term["end"] for term in data]
+    except KeyError as error:
+        raise TermTableError(f"{path}: a term is missing {error}") from None
+
+    ordinals = None
+    if data and all("ordinal_number" in term for term in data):
+        ordinals = [term["ordinal_number"] for term in data]
+
+    return title, names, starts, ends, ordinals
+
+
+def parse_table(name: str, path: Path) -> TermTable:
+    """Read and validate a CSV or JSON term file"""
+    if ".csv" == path.suffix:
+        title, names, starts, ends, ordinals = read_csv(path)
+    else:
+        title, names, starts, ends, ordinals = read_json(path)
+
+    return TermTable.from_columns(
+        name,
+        title,
+        names,
+        int_column(name, "start", starts),
+        int_column(name, "end", ends),
+        None if ordinals is None else int_column(name, "ordinal_number", ordinals),
+    )
+
+
+def sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _little_endian(column: array) -> bytes:
+    if "big" == sys.byteorder:
+        column = array(column.typecode, column)
+        column.byteswap()
+
+    return column.tobytes()
+
+
+def write_sidecar(table: TermTable, path: Path) -> None:
+    """Save a parsed table beside its source file"""
+    stat = path.stat()
+    title = table.title.encode("utf-8")
+    names = "\x00".join(table.names).encode("utf-8")
+
+    sidecar = sidecar_path(path)
+    partial = sidecar.with_name(f"{sidecar.name}.{os.getpid()}")
+    with open(partial, "wb") as file:
+        file.write(
+            SIDECAR_HEADER.pack(
+                SIDECAR_MAGIC,
+                SIDECAR_VERSION,
+                stat.st_mtime_ns,
+                stat.st_size,
+                len(table),
+                len(title),
+            )
+        )
+        file.write(title)
+        for column in (table.starts, table.ends, table.ordinals):
+            file.write(_little_endian(column))
+
+        file.write(NAMES_LENGTH.pack(len(names)))
+        file.write(names)
+
+    # Readers never see a half written sidecar
+    os.replace(partial, sidecar)
+
+
+def read_sidecar(name: str, path: Path) -> Optional[TermTable]:
+    """The table saved beside a source file, if it is still up to date"""
+    try:
+        data = sidecar_path(path).read_bytes()
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < SIDECAR_HEADER.size:
+        return None
+
+    magic, version, mtime_ns, size, count, title_length = SIDECAR_HEADER.unpack_from(
+        data
+    )
+    if (
+        SIDECAR_MAGIC != magic
+        or SIDECAR_VERSION != version
+        or stat.st_mtime_ns != mtime_ns
+        or stat.st_size != size
+    ):
+        return None
+
+    position = SIDECAR_HEADER.size
+    title = data[position : position + title_length].decode("utf-8")
+    position += title_length
+
+    columns = []
+    for _ in range(3):
+        column = array("i")
+        column.frombytes(data[position : position + count * column.itemsize])
+        if "big" == sys.byteorder:
+            column.byteswap()
+
+        columns.append(column)
+        position += count * column.itemsize
+
+    (names_length,) = NAMES_LENGTH.unpack_from(data, position)
+    position += NAMES_LENGTH.size
+    names = data[position : position + names_length].decode("utf-8").split("\x00")
+
+    # Validated before the sidecar was written
+    starts, ends, ordinals = columns
+    return TermTable(name, title, names, starts, ends, ordinals)
+
+
+def load_table(path: Union[str, Path], name: Optional[str] = None) -> TermTable:
+    """Load a term file, from its sidecar when the file hasn't changed"""
+    path = Path(path)
+    name = path.stem if name is None else name
+
+    table = read_sidecar(name, path)
+    if table is not None:
+        return table
+
+    table = parse_table(name, path)
+    try:
+        write_sidecar(table, path)
+    except OSError:
+        log.warning("Couldn't cache %s, it will be parsed again next time", path)
+
+    return table
+
+
+def find_dataset(name: str, directories: Iterable[Path]) -> Path:
+    """The file for a dataset name, or the name itself when it is a path"""
+    path = Path(name)
+    if path.suffix in DATASET_SUFFIXES and path.is_file():
+        return path
+
+    for directory in directories:
+        for suffix in DATASET_SUFFIXES:
+            path = Path(directory, name + suffix)
+            if path.is_file():
+                return path
+
+    raise TermTableError(f"No dataset named {name!r}")
+
+
+def load_dataset(name: str, directories: Iterable[Path]) -> TermTable:
+    """Load a dataset by name, as the table loader for get_table"""
+    return load_table(find_dataset(name, directories), name)
+
@@ -0,0 +1,165 @@
+import logging
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from statistics import mean
+from time import monotonic, perf_counter
+from typing import ClassVar, Deque, Dict, List, Optional
+
+from models import GameLog
+from storage.base import ScoreboardStore
+
+log = logging.getLogger(__name__)
+
+# Tells the writer thread to commit what it has and stop
+_STOP = object()
+
+
+@dataclass
+class WriterMetrics:
+    """Counters describing the background game log writer"""
+
+    # What each value of the snapshot measures
+    HELP: ClassVar[Dict[str, str]] = {
+        "queue_depth": "Game logs waiting to be written",
+        "queue_full_total": "Game logs that found the queue full",
+        "logs_total": "Game logs written",
+        "batches_total": "Transactions committed",
+        "failed_batches_total": "Transactions that failed",
+        "batch_size_avg": "Mean game logs per transaction, of recent ones",
+        "batch_size_max": "Most game logs in a recent transaction",
+        "commit_seconds_avg": "Mean time to commit, of recent transactions",
+        "commit_seconds_max": "Longest recent commit",
+    }
+
+    queue_depth: int = 0
+    queue_full_total: int = 0
+    logs_total: int = 0
+    batches_total: int = 0
+    failed_batches_total: int = 0
+    batch_sizes: Deque[int] = field(default_factory=lambda: deque(maxlen=1024))
+    commit_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the counters and recent batches"""
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_full_total": self.queue_full_total,
+            "logs_total": self.logs_total,
+            "batches_total": self.batches_total,
+            "failed_batches_total": self.failed_batches_total,
+            "batch_size_avg": mean(self.batch_sizes) if self.batch_sizes else 0.0,
+            "batch_size_max": max(self.batch_sizes, default=0),
+            "commit_seconds_avg": mean(self.commit_seconds) if self.commit_seconds else 0.0,
+            "commit_seconds_max": max(self.commit_seconds, default=0.0),
+        }
+
+
+class GameLogWriter:
+    """Records game logs from a background thread so the UI never waits on
+    the store. Logs that arrive close together, from any session in the
+    process, are committed in one transaction."""
+
+    def __init__(
+        self,
+        store: ScoreboardStore,
+        max_queue: int = 1024,
+        max_batch: int = 256,
+        max_delay: float = 0.05,
+    ) -> None:
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.metrics = WriterMetrics()
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, log: GameLog) -> None:
+        """Queue a game log to be recorded."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(log)
+        except queue.Full:
+            # Apply back pressure rather than dropping a player's game
+            self.metrics.queue_full_total += 1
+            self._queue.put(log)
+
+        self.metrics.queue_depth = self._queue.qsize()
+
+    def flush(self) -> None:
+        """Wait until every queued game log has been committed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Commit everything still queued and stop the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="game-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Collect queued logs into batches and commit them."""
+        stopping = False
+        while not stopping:
+            batch: List[GameLog] = []
+            item = self._queue.get()
+            deadline = monotonic() + self.max_delay
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+
+                timeout = deadline - monotonic()
+                if timeout <= 0:
+                    break
+
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            self._commit(batch)
+
+            # One task per queued item, including the stop marker
+            for _ in range(len(batch) + int(stopping)):
+                self._queue.task_done()
+
+    def _commit(self, batch: List[GameLog]) -> None:
+        """Write one batch to the store in a single transaction."""
+        if not batch:
+            return
+
+        start_time = perf_counter()
+        try:
+            self.store.add_many(batch)
+        except Exception:
+            # Keep the thread alive so later games and flush() still work
+            self.metrics.failed_batches_total += 1
+            log.exception("Failed to record %d game logs", len(batch))
+            return
+        finally:
+            self.metrics.queue_depth = self._queue.qsize()
+
+        self.metrics.commit_seconds.append(perf_counter() - start_time)
+        self.metrics.batch_sizes.append(len(batch))
+        self.metrics.batches_total += 1
+        self.metrics.logs_total += len(batch)
@@ -0,0 +1,131 @@
+from array import array
+from datetime import datetime
+from io import BytesIO
+
+from models import (
+    PRESIDENTS,
+    GameLog,
+    PackedResults,
+    TermTable,
+    get_table,
+)
+from models.results import pack_result
+from models.term_table import register_table
+from storage.history import (
+    HistoryFormatError,
+    HistoryWriter,
+    decode_game,
+    encode_game,
+    history_terms,
+    read_history,
+)
+
+
+def make_log(**fields) -> GameLog:
+    packed = array("I", [pack_result(0, 1790, True), pack_result(15, 1850, False)])
+    return GameLog(
+        date=datetime(2026, 10, 18, 9, 30, 15, 250000),
+        score=1,
+        total_questions=2,
+        duration=12.345,
+        results=PackedResults(
+            packed,
+            think_us=array("I", [900000, 2500000]),
+            handle_us=array("I", [1200, 800]),
+        ),
+        **fields,
+    )
+
+
+def test_round_trip_keeps_challenge_and_player():
+    logs = [
+        make_log(challenge_id="presidents@2026-10-18", player="ada"),
+        make_log(player="Zoë"),
+        make_log(challenge_id="presidents@2026-10-17", player=""),
+        make_log(),
+    ]
+    file = BytesIO()
+    with HistoryWriter(file) as writer:
+        writer.write_all(logs)
+
+    file.seek(0)
+    read = list(read_history(file))
+    assert [(log.challenge_id, log.player) for log in read] == [
+        ("presidents@2026-10-18", "ada"),
+        (None, "Zoë"),
+        ("presidents@2026-10-17", ""),
+        (None, None),
+    ]
+    for original, copy in zip(logs, read):
+        assert copy.date == original.date
+        assert copy.duration == original.duration
+        assert copy.results == original.results
+
+
+def test_version_3_games_have_no_challenge_or_player():
+    log = make_log(challenge_id="presidents@2026-10-18", player="ada")
+    table = get_table(PRESIDENTS)
+    payload = encode_game(log, table)
+    # Version 3 games end after the times
+    payload = payload[: -len(b"\x16presidents@2026-10-18\x04ada")]
+
+    copy, position = decode_game(payload, 0, history_terms(table), version=3)
+    assert position == len(payload)
+    assert (copy.challenge_id, copy.player) == (None, None)
+    assert copy.results == log.results
+
+
+def test_reads_into_the_rows_of_the_loaded_dataset():
+    presidents = get_table(PRESIDENTS)
+    # Written by a copy of the dataset with its terms in another order
+    order = list(reversed(range(len(presidents))))
+    written = TermTable(
+        PRESIDENTS,
+        presidents.title,
+        [presidents.names[row] for row in order],
+        array("i", (presidents.starts[row] for row in order)),
+        array("i", (presidents.ends[row] for row in order)),
+        array("i", (presidents.ordinals[row] for row in order)),
+    )
+    log = make_log()
+    log.results = PackedResults(
+        array("I", [pack_result(0, 2022, True), pack_result(46, 1790, False)])
+    )
+    file = BytesIO()
+    with HistoryWriter(file, written) as writer:
+        writer.write(log)
+
+    file.seek(0)
+    (copy,) = read_history(file)
+    assert [result.president.name for result in copy.results] == [
+        written.names[0],
+        written.names[46],
+    ]
+    assert [result.selected_year for result in copy.results] == [2022, 1790]
+
+
+def test_terms_missing_from_the_loaded_dataset_are_reported():
+    register_table(
+        TermTable(
+            "history-kings", "King", ["A", "B"], [1800, 1820], [1820, 1830], [1, 2]
+        )
+    )
+    written = TermTable(
+        "history-kings", "King", ["A", "Nobody"], [1800, 1700], [1820, 1704], [1, 2]
+    )
+    log = make_log()
+    log.dataset = written.name
+    log.results = PackedResults(
+        array("I", [pack_result(1, 1702, True)]), written.name
+    )
+    file = BytesIO()
+    with HistoryWriter(file, written) as writer:
+        writer.write(log)
+
+    file.seek(0)
+    try:
+        list(read_history(file))
+    except HistoryFormatError as error:
+        assert "Nobody" in str(error)
+    else:
+        raise AssertionError("Read a game of a term the dataset doesn't have")
@@ -0,0 +1,22 @@
+from serving.metrics import render_metrics
+from storage import MetricsRecorder, collect_metrics
+
+
+def test_renders_the_help_of_source_values(tmp_path):
+    recorder = MetricsRecorder()
+    recorder.add_source(
+        "pool",
+        lambda: {"idle": 2, "spawned_total": 5, "unexplained": 1},
+        {"idle": "Workers ready", "spawned_total": "Workers started"},
+    )
+    recorder.enable(tmp_path)
+    recorder.dump()
+
+    totals, live = collect_metrics(tmp_path)
+    text = render_metrics(totals, live)
+    recorder.close()
+
+    assert "# HELP president_quiz_pool_idle Workers ready\n" in text
+    assert "# HELP president_quiz_pool_spawned_total Workers started\n" in text
+    assert "# HELP president_quiz_pool_unexplained pool_unexplained\n" in text
+    assert "president_quiz_pool_spawned_total 5\n" in text
@@ -0,0 +1,54 @@
+import os
+
+from textual.css.stylesheet import Stylesheet
+
+from screens.stylesheet import (
+    KEY_FILE,
+    cache_file,
+    read_rules,
+    signing_key,
+    write_rules,
+)
+
+
+def parse(css):
+    stylesheet = Stylesheet()
+    stylesheet.add_source(css, read_from=("test.tcss", ""))
+    stylesheet.parse()
+    return stylesheet.rules
+
+
+def test_reads_back_signed_rules(tmp_path):
+    key = signing_key(tmp_path)
+    path = cache_file(tmp_path, ("Label { color: red; }",))
+    write_rules(path, parse("Label { color: red; }"), key)
+
+    rules = read_rules(path, key)
+    assert [rule.selectors for rule in rules] == ["Label"]
+    assert (tmp_path / KEY_FILE).stat().st_mode & 0o777 == 0o600
+
+
+def test_ignores_rules_not_signed_with_the_key(tmp_path):
+    key = signing_key(tmp_path)
+    path = cache_file(tmp_path, ("Label { color: red; }",))
+    write_rules(path, parse("Label { color: red; }"), key)
+
+    data = bytearray(path.read_bytes())
+    data[-2] ^= 1
+    path.write_bytes(data)
+    assert read_rules(path, key) is None
+    assert read_rules(path, os.urandom(len(key))) is None
+
+
+def test_refuses_directories_others_can_write(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    assert signing_key(shared) is None
+    assert not (shared / KEY_FILE).exists()
+
+
+def test_refuses_keys_others_can_read(tmp_path):
+    (tmp_path / KEY_FILE).write_bytes(os.urandom(32))
+    (tmp_path / KEY_FILE).chmod(0o644)
+    assert signing_key(tmp_path) is None
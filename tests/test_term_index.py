@@ -0,0 +1,42 @@
+from array import array
+
+from models import PRESIDENTS, TermTable, get_table, term_index
+
+
+def names(table, rows):
+    return [table.names[row] for row in rows]
+
+
+def test_in_office_shares_boundary_years():
+    table = get_table(PRESIDENTS)
+    index = term_index(table)
+    assert names(table, index.in_office(1850)) == ["Zachary Taylor", "Millard Fillmore"]
+    assert names(table, index.in_office(1797)) == ["George Washington", "John Adams"]
+    assert index.in_office(1700) == []
+
+
+def test_overlapping_range():
+    table = get_table(PRESIDENTS)
+    found = names(table, term_index(table).overlapping(1880, 1890))
+    assert found[0] == "Rutherford B. Hayes"
+    assert found[-1] == "Benjamin Harrison"
+
+
+def test_built_from_the_table_given():
+    # Out of order, with one term inside another
+    table = TermTable.from_columns(
+        "kings", "King", ["C", "A", "B"], [1900, 1800, 1820], [1950, 1900, 1830]
+    )
+    index = term_index(table)
+    assert index.in_office(1825) == [1, 2]
+    assert index.in_office(1900) == [1, 0]
+    assert index.overlapping(1831, 1899) == [1]
+    assert index.in_office(1960) == []
+
+
+def test_in_office_many_matches_single_lookups():
+    table = get_table(PRESIDENTS)
+    index = term_index(table)
+    years = list(range(2040, 1780, -1)) + [1850, 1797, 1850]
+    assert index.in_office_many(years) == [index.in_office(year) for year in years]
+    assert index.count_in_office([1850, 1851, 1700]) == array("i", [2, 1, 0])